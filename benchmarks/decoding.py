@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+'''
+Compares the makeradmin response decoding against the generic decoders it replaced,
+using the recorded responses in src/test/makeradmin_mock.py.
+
+    python -m benchmarks.decoding
+'''
+
+import argparse
+import datetime
+import timeit
+from typing import Any, Callable
+import dateutil.parser
+import serde
+
+from src.backend import label_data
+from src.backend.decoding import parse_iso_date
+from src.backend.makeradmin import UploadedLabel, decode_uploaded_label
+from src.backend.member import Member
+from src.test.makeradmin_mock import label_response, response
+
+member_response: dict[str, Any] = response  # type: ignore
+
+
+def dateutil_datify(makeradmin_date: str | None) -> datetime.datetime | None:
+    if makeradmin_date is None:
+        return None
+    return datetime.datetime.combine(dateutil.parser.parse(makeradmin_date).date(), datetime.time(23, 59, 59))
+
+
+def iso_datify(makeradmin_date: str | None) -> datetime.datetime | None:
+    if makeradmin_date is None:
+        return None
+    return datetime.datetime.combine(parse_iso_date(makeradmin_date), datetime.time(23, 59, 59))
+
+
+def decode_membership_dates(datify: Callable[[str | None], datetime.datetime | None]) -> Callable[[], Any]:
+    membership_data = member_response["data"]["membership_data"]
+    keys = ["membership_end", "labaccess_end", "special_labaccess_end", "effective_labaccess_end"]
+    return lambda: [datify(membership_data[key]) for key in keys]
+
+
+def uploaded_label_responses() -> dict[str, dict[str, Any]]:
+    '''
+    The recorded label response, plus one response for each of the other label types
+    created from the recorded member.
+    '''
+    member = Member.from_response(member_response)
+    assert member is not None
+    expires_at = datetime.date(2025, 6, 30)
+    labels: list[label_data.LabelType] = [
+        label_data.BoxLabel.from_member(member),
+        label_data.FireSafetyLabel.from_member(member, expires_at),
+        label_data.Printer3DLabel.from_member(member),
+        label_data.NameTag.from_member(member),
+        label_data.MeetupNameTag.from_member(member),
+        label_data.DryingLabel.from_member(member, 4),
+        label_data.WarningLabel.from_member(member, "Abandoned project", expires_at),
+        label_data.RotatingStorageLabel.from_member(member, "Plywood"),
+    ]
+    uploaded: dict[str, Any] = label_response["data"]  # type: ignore
+    responses = {"TemporaryStorageLabel": uploaded}
+    for label in labels:
+        uploaded_label = UploadedLabel(uploaded["public_url"], uploaded["public_observation_url"], label)
+        responses[type(label).__name__] = serde.to_dict(uploaded_label)
+    return responses
+
+
+def bench(name: str, f: Callable[[], Any], number: int) -> float:
+    seconds = min(timeit.repeat(f, number=number, repeat=5)) / number
+    print(f"{name:<40} {seconds * 1e6:8.1f} µs")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=2000, help="Calls per measurement")
+    ns = parser.parse_args()
+
+    responses = uploaded_label_responses()
+    for data in responses.values():
+        assert decode_uploaded_label(data) == serde.from_dict(UploadedLabel, data)
+
+    print("Membership dates")
+    slow = bench("  dateutil.parser.parse", decode_membership_dates(dateutil_datify), ns.number)
+    fast = bench("  parse_iso_date", decode_membership_dates(iso_datify), ns.number)
+    print(f"  speedup {slow / fast:.1f}x")
+
+    bench("Member.from_response", lambda: Member.from_response(member_response), ns.number)
+
+    for label_type, data in responses.items():
+        print(f"Uploaded {label_type}")
+        slow = bench("  serde.from_dict(UploadedLabel)", lambda: serde.from_dict(UploadedLabel, data), ns.number)
+        fast = bench("  decode_uploaded_label", lambda: decode_uploaded_label(data), ns.number)
+        print(f"  speedup {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
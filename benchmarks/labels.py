@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+'''
+Times every label builder in creator.create_label with short and long names and
+descriptions. Font fitting, layout, image generation, the resize to the printer
+width and the raster conversion are timed separately. Layout is the rest of
+create_label: building the label objects, with their fonts, images and QR codes.
+
+    python -m benchmarks.labels run                   # Print the timings
+    python -m benchmarks.labels run --save-baseline   # Store them in benchmarks/baselines/labels.json
+    python -m benchmarks.labels compare               # Run again and flag stages slower than the baseline
+    python -m benchmarks.labels compare results.json  # Compare results saved with run --output
+'''
+
+import argparse
+import dataclasses
+import json
+import platform
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable
+from unittest import mock
+
+import PIL
+
+from src.backend import label_data
+from src.backend.makeradmin import UploadedLabel
+from src.backend.member import Member
+from src.label import creator as label_creator
+from src.label import printer as label_printer
+from src.test.makeradmin_mock import label_response, response as member_response
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "labels.json"
+STAGES = ["fit_text", "layout", "generate", "create_label", "resize", "raster"]
+PRINTER_MODEL = "QL-800"
+DEFAULT_THRESHOLD = 0.25  # A stage is a regression if it is this much slower than the baseline
+NOISE_FLOOR_MS = 0.5  # Differences smaller than this are never regressions
+
+NAMES = {
+    "short": "Ada Li",
+    "medium": "Firstname Lastname",
+    "long": "Maximiliana Wilhelmina von Hohenzollern-Sigmaringen",
+}
+DESCRIPTIONS = {
+    "short": "Plywood",
+    "long": "Half finished CNC router table with spare aluminium extrusions, please do not move the electronics box",
+}
+EXPIRES_AT = date(2030, 6, 30)
+
+Results = dict[str, dict[str, float]]
+
+
+def member_with_name(name: str) -> Member:
+    member = Member.from_response(member_response)
+    assert member is not None
+    first_name, _, last_name = name.partition(" ")
+    return dataclasses.replace(member, first_name=first_name, last_name=last_name)
+
+
+def benchmark_labels() -> dict[str, label_data.LabelType]:
+    '''
+    One label per builder and name length, and per description length for the labels with descriptions
+    '''
+    labels: dict[str, label_data.LabelType] = {}
+    for name_length, name in NAMES.items():
+        member = member_with_name(name)
+        for label in [label_data.BoxLabel.from_member(member),
+                      label_data.FireSafetyLabel.from_member(member, EXPIRES_AT),
+                      label_data.Printer3DLabel.from_member(member),
+                      label_data.NameTag.from_member(member),
+                      label_data.MeetupNameTag.from_member(member),
+                      label_data.DryingLabel.from_member(member, 4)]:
+            labels[f"{type(label).__name__}/name={name_length}"] = label
+        for description_length, description in DESCRIPTIONS.items():
+            for label in [label_data.TemporaryStorageLabel.from_member(member, description, EXPIRES_AT),
+                          label_data.RotatingStorageLabel.from_member(member, description),
+                          label_data.WarningLabel.from_member(member, description, EXPIRES_AT)]:
+                labels[f"{type(label).__name__}/name={name_length}/description={description_length}"] = label
+    return labels
+
+
+def timed(times: dict[str, float], stage: str, fun: Callable[..., Any]) -> Callable[..., Any]:
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return fun(*args, **kwargs)
+        finally:
+            times[stage] += time.perf_counter() - start
+    return wrapper
+
+
+def measure_once(uploaded_label: UploadedLabel) -> dict[str, float]:
+    '''
+    Seconds spent in each stage of rendering and converting one label. Text is
+    fitted without the cache, so that every run measures the fitting.
+    '''
+    times: dict[str, float] = defaultdict(float)
+    with mock.patch.object(label_creator, "fit_text", timed(times, "fit_text", label_creator.fit_text.__wrapped__)), \
+            mock.patch.object(label_creator.Label, "generate_label", timed(times, "generate", label_creator.Label.generate_label)):
+        start = time.perf_counter()
+        label = label_creator.create_label(uploaded_label)
+        times["create_label"] = time.perf_counter() - start
+    times["layout"] = max(times["create_label"] - times["fit_text"] - times["generate"], 0.0)
+
+    start = time.perf_counter()
+    resized = label_printer.resize_for_printer(label.label)
+    times["resize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    label_printer.convert_label(resized, PRINTER_MODEL)
+    times["raster"] = time.perf_counter() - start
+    return times
+
+
+def run(number: int, only: str | None = None) -> Results:
+    label_creator.preload_assets()
+    uploaded: dict[str, Any] = label_response["data"]  # type: ignore
+    results: Results = {}
+    for case, label in benchmark_labels().items():
+        if only is not None and only not in case:
+            continue
+        uploaded_label = UploadedLabel(uploaded["public_url"], uploaded["public_observation_url"], label)
+        measure_once(uploaded_label)  # Warm up
+        runs = [measure_once(uploaded_label) for _ in range(number)]
+        # The fastest run is the one least disturbed by other processes
+        results[case] = {stage: round(min(r[stage] for r in runs) * 1000, 3) for stage in STAGES}
+        print_row(case, results[case])
+    return results
+
+
+def environment() -> dict[str, str]:
+    return dict(python=platform.python_version(), pillow=PIL.__version__, machine=platform.machine(),
+                processor=platform.processor(), system=platform.system())
+
+
+def print_header() -> None:
+    print(f"{'label (fastest of n, ms)':<62}" + "".join(f"{stage:>13}" for stage in STAGES))
+
+
+def print_row(case: str, stages: dict[str, float]) -> None:
+    print(f"{case:<62}" + "".join(f"{stages[stage]:>13.2f}" for stage in STAGES))
+
+
+def save(path: Path, results: Results, number: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(dict(created=datetime.now().isoformat(timespec="seconds"), number=number,
+                       environment=environment(), results=results), f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Saved to {path}")
+
+
+def load(path: Path) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict[str, Any], results: Results, threshold: float) -> list[str]:
+    '''
+    Returns a line for every stage that is slower than the baseline by more than threshold
+    '''
+    regressions = []
+    for case, stages in sorted(results.items()):
+        base_stages = baseline["results"].get(case)
+        if base_stages is None:
+            continue
+        for stage, ms in stages.items():
+            base_ms = base_stages.get(stage)
+            if base_ms is None or ms - base_ms < NOISE_FLOOR_MS:
+                continue
+            if ms > base_ms * (1 + threshold):
+                regressions.append(f"{case} {stage}: {base_ms:.2f} ms -> {ms:.2f} ms (+{(ms / base_ms - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Time all labels")
+    run_parser.add_argument("--output", type=Path, help="Also save the results to this file")
+    run_parser.add_argument("--save-baseline", action="store_true", help=f"Save the results as the baseline in {BASELINE_PATH}")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag stages that are slower than the baseline")
+    compare_parser.add_argument("results", type=Path, nargs="?", help="Results saved with run --output. Runs the benchmark if left out.")
+    compare_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="Flag stages that are more than this fraction slower than the baseline")
+
+    for p in (run_parser, compare_parser):
+        p.add_argument("-n", "--number", type=int, default=5, help="Runs per label. The fastest is reported.")
+        p.add_argument("--only", help="Only run the labels whose name contains this, e.g. NameTag")
+
+    ns = parser.parse_args()
+
+    if ns.command == "compare" and ns.results is not None:
+        results = load(ns.results)["results"]
+    else:
+        print_header()
+        results = run(ns.number, ns.only)
+
+    if ns.command == "run":
+        if ns.output is not None:
+            save(ns.output, results, ns.number)
+        if ns.save_baseline:
+            save(BASELINE_PATH, results, ns.number)
+        return
+
+    baseline = load(ns.baseline)
+    if baseline["environment"] != environment():
+        print(f"Warning: the baseline was made in another environment: {baseline['environment']}", file=sys.stderr)
+    regressions = compare(baseline, results, ns.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} stages are more than {ns.threshold * 100:.0f}% slower than {ns.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo stage is more than {ns.threshold * 100:.0f}% slower than {ns.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,19 @@ development: bool = False
 makeradmin_token_filename: str = ".makeradmin_token"
 slack_token_filename: str = ".slack_token"
 slack_timeout: int = 10
+slack_min_post_interval: float = 1.0  # Slack allows about one message per second and channel
+slack_error_window: int = 10 * 60  # Identical errors within this many seconds are posted once, with a count
+slack_digest_interval: int = 60 * 60  # Seconds between digests of printed labels
+login_timeout: int = 15  # Seconds before a login that is waiting for the backend is given up
+print_timeout: int = 60  # Seconds before uploading, rendering and printing a label is given up
+stall_threshold: float = 1.0  # Seconds the Tk main loop may be blocked before it is reported as a stall
+stall_alert_interval: int = 10 * 60  # Seconds between Slack alerts about stalls. All stalls are logged.
 logger_name: str = 'memberbooth'
+flight_recorder_capacity: int = 5000  # Entries kept in memory and written to a file when an exception is logged
+flight_recorder_min_dump_interval: float = 60  # Seconds. Exceptions that come faster only get one dump.
+flight_recorder_max_dumps: int = 20  # Older dump files are deleted
 maker_admin_base_url: str = 'https://api.makerspace.se'
+metrics_host: str = '127.0.0.1'  # The metrics endpoint is only meant for a scraper on the same machine
 
 # Nice to have constants
 _DIR = Path(__file__).parent.absolute()
@@ -20,4 +31,3 @@ SMS_LOGOTYPE_PATH = str(RESOURCES_PATH.joinpath('sms_logotype_label.png'))
 FLAMMABLE_ICON_PATH = str(RESOURCES_PATH.joinpath('flammable_icon.png'))
 ROTATING_ICON_PATH = str(RESOURCES_PATH.joinpath('rotating_icon.png'))
 FONT_PATH = str(RESOURCES_PATH.joinpath('BebasNeue-Regular.ttf'))
-LIST_ARDUINO_SERIAL_DEVICES_PATH = str(_DIR.joinpath("list_arduino_serial_devices.sh"))
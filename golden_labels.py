@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from pathlib import Path
+from src.label import golden
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare rendered labels with the golden images in tests/golden, or accept new golden images")
+    parser.add_argument("command", choices=["check", "accept"],
+                        help="check: render all labels and compare them with the goldens. accept: store the rendered labels as the new goldens.")
+    parser.add_argument("names", nargs="*",
+                        help=f"Labels to check or accept. Defaults to all of: {', '.join(golden.golden_labels())}")
+    parser.add_argument("--golden-dir", type=Path, default=golden.GOLDEN_DIR)
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="Where to write the rendered and diff images of labels that do not match. Defaults to the golden directory.")
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="Color channels that differ by at most this much (0-255) count as equal")
+    parser.add_argument("--max-diff-fraction", type=float, default=0.0,
+                        help="Fraction of the pixels that may differ")
+    parser.add_argument("--reference", action="store_true",
+                        help="Render without caches, the slow reference path")
+    ns = parser.parse_args()
+
+    labels = golden.golden_labels()
+    unknown = set(ns.names) - labels.keys()
+    if unknown:
+        parser.error(f"Unknown labels: {', '.join(sorted(unknown))}")
+    names = ns.names or list(labels)
+
+    if ns.command == "accept":
+        for name in names:
+            path = golden.accept(name, golden.render(labels[name], reference=ns.reference), ns.golden_dir)
+            print(f"Accepted {path}")
+        return
+
+    mismatch = golden.environment_mismatch(ns.golden_dir)
+    if mismatch is not None:
+        print(f"Warning: {mismatch}. Expect differences.", file=sys.stderr)
+
+    failed = False
+    for name in names:
+        if not golden.golden_path(name, ns.golden_dir).exists():
+            failed = True
+            print(f"{name:<36} FAILED: no golden image, run '{sys.argv[0]} accept {name}'")
+            continue
+        image = golden.render(labels[name], reference=ns.reference)
+        diff = golden.check(name, image, ns.golden_dir, ns.output_dir, ns.tolerance, ns.max_diff_fraction)
+        if diff.matches(ns.max_diff_fraction):
+            print(f"{name:<36} ok")
+        else:
+            failed = True
+            print(f"{name:<36} FAILED: {diff}. See {(ns.output_dir or ns.golden_dir) / (name + '.diff.png')}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import time
+
+import requests
+
+from src.test.fault_injection import FaultProfile
+from src.test.makeradmin_standin import STATS_PATH, MakerAdminStandin, MemberDatabase, SoakTest
+from src.util.logger import LOG_FORMATS, init_logger, stop_listeners
+
+
+def print_summary(soak: SoakTest) -> None:
+    print(f"{'operation':<16} {'count':>8} {'errors':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in soak.summary():
+        print(f"{row['operation']:<16} {row['count']:>8} {row['errors']:>8} "
+              f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+    for (operation, error), count in sorted(soak.errors.items()):
+        print(f"  {operation}: {count} x {error}")
+    sys.stdout.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the makeradmin endpoints used by the memberbooth locally, "
+                                                 "and soak test the real makeradmin client against them")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Run the stand-in until interrupted")
+    soak_parser = subparsers.add_parser("soak", help="Call the stand-in with the real client and report the latencies")
+    soak_parser.add_argument("--url", help="Soak test a stand-in that is already running, instead of starting one")
+    soak_parser.add_argument("--duration", type=float, default=60, help="Seconds to run for")
+    soak_parser.add_argument("--threads", type=int, default=4, help="Clients calling at the same time")
+    soak_parser.add_argument("--invalid-rate", type=float, default=0.1,
+                             help="Fraction of calls with an unknown tag, member number or a wrong pin code")
+    soak_parser.add_argument("--report-interval", type=float, default=None, help="Also print the latencies this often")
+
+    for p in (serve_parser, soak_parser):
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8010)
+        p.add_argument("--token", default="standin-token", help="The makeradmin token that is accepted")
+        p.add_argument("--members", type=int, default=1000, help="Members in the generated database")
+        p.add_argument("--seed", type=int, default=1, help="Seed of the generated database and of the soak test")
+        p.add_argument("--fault-profile", help="Latency and failures of the stand-in. The 'makeradmin' part of the profile is used.")
+        p.add_argument("--max-rate", type=float, default=None, help="Requests per second the stand-in answers at most")
+        p.add_argument("--max-concurrent", type=int, default=None, help="Requests the stand-in works on at the same time at most")
+        p.add_argument("--request-log", help="Write every request as a JSON line to this file")
+        p.add_argument("--log-format", choices=LOG_FORMATS, default="plain")
+    ns = parser.parse_args()
+
+    # The client logs every failed request with its traceback, which would bury the soak reports
+    init_logger("makeradmin_standin", log_format=ns.log_format, stderr_level="CRITICAL" if ns.command == "soak" else "WARNING")
+    database = MemberDatabase(ns.members, ns.seed)
+    standin: MakerAdminStandin | None = None
+    try:
+        if ns.command == "serve" or ns.url is None:
+            faults = FaultProfile.load(ns.fault_profile).injector("makeradmin") if ns.fault_profile else None
+            standin = MakerAdminStandin(ns.port, ns.host, ns.token, database, faults, ns.max_rate, ns.max_concurrent,
+                                        ns.request_log).start()
+            print(f"Serving makeradmin at {standin.base_url} with token '{ns.token}'")
+
+        if ns.command == "serve":
+            assert standin is not None
+            print(f"Run the memberbooth with -u {standin.base_url}. Stop with Ctrl-C.")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
+            print(json.dumps(standin.stats.to_dict(), indent=2))
+            return
+
+        base_url = ns.url or standin.base_url  # type: ignore
+        soak = SoakTest(base_url, ns.token, database, ns.threads, ns.seed, ns.invalid_rate)
+        soak.run(ns.duration, ns.report_interval, print_summary)
+        print_summary(soak)
+        # Requests per connection shows whether the client reuses connections
+        print(json.dumps(requests.get(base_url + STATS_PATH, timeout=5).json(), indent=2))
+    finally:
+        if standin is not None:
+            standin.stop()
+        stop_listeners()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,25 @@
 #!/usr/bin/env python3
 
 import os
-from src.util.logger import init_logger, get_logger
+from src.util.logger import LOG_FORMATS, LOG_LEVELS, init_logger, get_logger, stop_listeners
+from src.util.tracing import init_tracing
+from src.util.flight_recorder import init_flight_recorder
+from src.util import metrics
 from src.backend.makeradmin import MakerAdminClient
 from src.test.makeradmin_mock import MakerAdminClient as MockedMakerAdminClient
 from src.util.slack_client import SlackClient
+from src.util.slack_aggregator import SlackAggregator
 from src.test.slack_client_mock import MockSlackClient
+from src.test.fault_injection import FaultProfile
 import src.util.parser as parser_util
 import argparse
 import config
 from src.gui.states import Application
+from src.util.key_reader import EM4100, KeyReader, KeyReaderMonitor, InputMethods, NoReaderFound, KeyReaderNeedsRebootError
 import sys
-import traceback
 import zipfile
 import urllib.request
 
-init_logger("memberbooth")
 logger = get_logger()
 start_command = " ".join(sys.argv)
 
@@ -29,7 +33,6 @@ def download_and_extract_font(font_url: str, font_zip: str, font_dir: str, font_
     logger.info(f"Font downloaded and extracted to {font_path}")
 
 def main() -> None:
-    logger.info(f"Starting {sys.argv[0]} as \n\t{start_command}")
     development_override_action = parser_util.DevelopmentOverrideActionFactory([
         ("maker_admin_base_url", "http://localhost:8010"),
         ("printer", False),
@@ -50,9 +53,27 @@ def main() -> None:
                         help="Whether to use real label printer or save label to file instead")
 
     parser.add_argument("--slack-channel-id", help="Channel id for Slack channel")
+    parser.add_argument("--key-reader", type=InputMethods.from_string, choices=list(InputMethods), default=None,
+                        help="Read RFID tags with this kind of reader")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help=f"Serve metrics in the Prometheus text format at http://{config.metrics_host}:<port>/metrics")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, default="plain",
+                        help="Write the log file as plain text or as one JSON object per line")
+    parser.add_argument("--log-file-level", choices=LOG_LEVELS, default="INFO",
+                        help="Lowest level of messages written to the log file. Debug messages are always kept in the flight recorder.")
+    parser.add_argument("--log-stderr-level", choices=LOG_LEVELS, default="WARNING",
+                        help="Lowest level of messages written to stderr")
+    parser.add_argument("--fault-profile", default=None,
+                        help="Add the latency and failures in this JSON file to the mocked makeradmin and Slack clients, "
+                             "e.g. src/test/fault_profiles/slow_evening.json")
 
     ns = parser.parse_args()
 
+    init_logger("memberbooth", log_format=ns.log_format, file_level=ns.log_file_level, stderr_level=ns.log_stderr_level)
+    init_tracing()
+    init_flight_recorder()
+    logger.info(f"Starting {sys.argv[0]} as \n\t{start_command}")
+
     config.no_backend = no_backend = not ns.backend
     config.no_printer = not ns.printer
     config.development = ns.development
@@ -68,29 +89,58 @@ def main() -> None:
         )
         assert os.path.isfile(config.FONT_PATH), f"Font file {config.FONT_PATH} not found after download."
 
+    fault_profile = FaultProfile.load(ns.fault_profile) if ns.fault_profile is not None else None
+    makeradmin_faults = fault_profile.injector("makeradmin") if fault_profile is not None else None
+    slack_faults = fault_profile.injector("slack") if fault_profile is not None else None
+
     if no_backend:
         makeradmin_client: MockedMakerAdminClient | MakerAdminClient = MockedMakerAdminClient(base_url=config.maker_admin_base_url,
-                                                   token_path=config.makeradmin_token_filename)
+                                                                                              token_path=config.makeradmin_token_filename,
+                                                                                              faults=makeradmin_faults)
     else:
         makeradmin_client = MakerAdminClient(base_url=ns.maker_admin_base_url, token_path=config.makeradmin_token_filename)
 
     if no_slack:
-        slack_client: MockSlackClient | SlackClient = MockSlackClient(token_path=config.slack_token_filename, channel_id=ns.slack_channel_id)
+        slack_client: MockSlackClient | SlackClient = MockSlackClient(token_path=config.slack_token_filename, channel_id=ns.slack_channel_id,
+                                                                      faults=slack_faults)
     elif ns.slack_channel_id is None:
         print("The Slack channel ID must be specified to use slack logging. Skipping Slack login")
-        slack_client = MockSlackClient(token_path=config.slack_token_filename, channel_id=ns.slack_channel_id)
+        slack_client = MockSlackClient(token_path=config.slack_token_filename, channel_id=ns.slack_channel_id, faults=slack_faults)
     else:
         slack_client = SlackClient(token_path=config.slack_token_filename, channel_id=ns.slack_channel_id, timeout=config.slack_timeout)
 
-    app = Application(makeradmin_client, slack_client)
+    key_reader_monitor: KeyReaderMonitor | None = None
+    if ns.key_reader == InputMethods.EM4100:
+        key_reader: KeyReader | None = None
+        try:
+            key_reader = EM4100.get_reader()
+        except (NoReaderFound, KeyReaderNeedsRebootError) as e:
+            logger.error(f"Could not connect to the key reader, retrying in the background: {e!r}")
+        key_reader_monitor = KeyReaderMonitor(EM4100.get_reader, key_reader)
+
+    slack = SlackAggregator(slack_client)
+    metrics.SLACK_QUEUE_DEPTH.set_function(slack_client.dispatcher.qsize)
+    metrics_server: metrics.MetricsServer | None = None
+    if ns.metrics_port is not None:
+        metrics_server = metrics.MetricsServer(ns.metrics_port).start()
+
+    app = Application(makeradmin_client, slack, key_reader_monitor)
     try:
         app.run()
     except KeyboardInterrupt:
         app.master.destroy()
     except Exception:
-        logger.error(traceback.format_exc())
+        logger.exception("Unexpected exception in the application")
     finally:
         logger.info("Exiting application")
+        app.tasks.shutdown()
+        app.tag_index.stop()
+        slack.close(timeout=config.slack_timeout)
+        if key_reader_monitor is not None:
+            key_reader_monitor.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        stop_listeners()
 
 
 if __name__ == "__main__":
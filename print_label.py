@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 
 import argparse
-from datetime import datetime, timedelta
+import sys
+from typing import Callable, Iterable
 from colors import color
-from src.backend.label_data import BoxLabel, FireSafetyLabel, MeetupNameTag, NameTag, Printer3DLabel, RotatingStorageLabel, TemporaryStorageLabel, WarningLabel
+from PIL import Image
 from src.label import creator as label_creator
 from src.label import printer as label_printer
+from src.label import batch_input
+from src.label.batch_input import RejectWriter
+from src.label import render_farm
+from src.label.pipeline import LABEL_TYPES, Checkpoint, LabelJob, LabelJobError, LabelPipeline, create_label_data, render_label
 from src.backend import makeradmin
-from src.backend.member import Member
+from src.backend.makeradmin import UploadedLabel
+from src.backend.member import Member, MemberCache
 from src.backend.member import NoMatchingMemberNumber
 from time import time
 from src.util.logger import init_logger, get_logger
@@ -17,42 +23,27 @@ import config
 init_logger("print_label")
 logger = get_logger()
 
+def confirm_warning_label_paper() -> bool:
+    maybe_y = input(color(
+        "Make sure that the yellow label printer paper roll is currently in use.", bg='yellow', fg='black')
+        + "\nSee https://wiki.makerspace.se/Memberbooth for info on how to change the printer paper.\n"
+        "         Type 'y' to continue, or anything else to exit. ")
+    if maybe_y.lower() != 'y':
+        print("Exiting")
+        return False
+    return True
+
+
 def print_label(member: Member, makeradmin_client: makeradmin.MakerAdminClient | makeradmin_mock.MakerAdminClient, type: str, no_printer: bool = False, description: str | None = None) -> None:
-    match type:
-        case "box":
-            label_data = BoxLabel.from_member(member)
-        case "temp":
-            if description is None:
-                logger.error("You must provide a description for temporary storage labels using --description")
-                return
-            label_data = TemporaryStorageLabel.from_member(member,
-                                                            description=description,
-                                                            expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_STORAGE_LENGTH))).date()
-                                                            )
-        case "fire":
-            label_data = FireSafetyLabel.from_member(member, expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_STORAGE_LENGTH))).date())
-        case "3d":
-            label_data = Printer3DLabel.from_member(member)
-        case "name":
-            label_data = NameTag.from_member(member)
-        case "meetup":
-            label_data = MeetupNameTag.from_member(member)
-        case "rotating":
-            if description is None:
-                logger.error("You must provide a description for rotating storage labels using --description")
-                return
-            label_data = RotatingStorageLabel.from_member(member, description=description)
-        case "warning":
-            maybe_y = input(color(
-                "Make sure that the yellow label printer paper roll is currently in use.", bg='yellow', fg='black')
-                + "\nSee https://wiki.makerspace.se/Memberbooth for info on how to change the printer paper.\n"
-                "         Type 'y' to continue, or anything else to exit. ")
-            if maybe_y.lower() != 'y':
-                print("Exiting")
-                return
+    if type == "warning" and not confirm_warning_label_paper():
+        return
 
-            # TODO: Use logged in member
-            label_data = WarningLabel.from_member(member, description=description, expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_WARNING_STORAGE_LENGTH))).date())
+    try:
+        # TODO: Use logged in member for warning labels
+        label_data = create_label_data(member, type, description)
+    except LabelJobError as e:
+        logger.error(f"{e}. Provide it using --description")
+        return
 
     uploaded_label = makeradmin_client.post_label(label_data)
     label = label_creator.create_label(uploaded_label)
@@ -67,11 +58,82 @@ def print_label(member: Member, makeradmin_client: makeradmin.MakerAdminClient |
     else:
         label_printer.print_label(label.label)
 
+
+def print_labels_pipelined(jobs: Iterable[LabelJob], makeradmin_client: makeradmin.MakerAdminClient | makeradmin_mock.MakerAdminClient, member_cache: MemberCache,
+                           ns: argparse.Namespace, rejects: RejectWriter | None = None) -> None:
+    render: Callable[[UploadedLabel], tuple[Image.Image | str, float]] = render_label
+    if ns.render_only:
+        render = render_farm.file_renderer(ns.output_dir, ns.render_format, ns.printer_model)
+
+    def output(job: LabelJob, rendered_label: Image.Image | str) -> None:
+        if ns.render_only:
+            logger.debug(f"Rendered {rendered_label}")
+        elif ns.no_printer:
+            assert isinstance(rendered_label, Image.Image)
+            file_name = f'{job.member_number}_{job.label_type}_{job.index}_{str(int(time()))}.png'
+            logger.info(f'Program run with --no-printer, storing label image to {file_name} instead of printing it.')
+            rendered_label.save(file_name)
+        else:
+            assert isinstance(rendered_label, Image.Image)
+            for _ in range(job.copies):
+                label_printer.print_label(rendered_label)
+
+    pipeline = LabelPipeline(makeradmin_client, member_cache, output,
+                             upload_workers=ns.workers,
+                             render_processes=ns.render_processes,
+                             checkpoint=Checkpoint(ns.checkpoint) if ns.checkpoint else None,
+                             progress_stream=sys.stderr if sys.stderr.isatty() else None,
+                             on_failure=rejects.reject_job if rejects is not None else None,
+                             render=render)
+    result = pipeline.run(jobs)
+    print(result.summary())
+    if ns.render_only:
+        render_stats = result.stages["render"]
+        per_core = render_stats.count / result.elapsed / result.render_processes if result.elapsed > 0 else 0.0
+        per_cpu_second = render_stats.count / render_stats.busy_seconds if render_stats.busy_seconds > 0 else 0.0
+        print(f"Rendered {render_stats.count} labels to {ns.output_dir} with {result.render_processes} processes: "
+              f"{per_core:.2f} labels/s per core ({per_cpu_second:.2f} labels per busy render second)")
+
+
+def print_labels_from_input(makeradmin_client: makeradmin.MakerAdminClient | makeradmin_mock.MakerAdminClient, member_cache: MemberCache, ns: argparse.Namespace) -> None:
+    from_stdin = ns.input == "-"
+    if ns.input_format is not None:
+        input_format = ns.input_format
+    elif from_stdin:
+        print(color("--input-format is required when reading from stdin", fg='red'))
+        return
+    else:
+        try:
+            input_format = batch_input.guess_input_format(ns.input)
+        except ValueError as e:
+            print(color(str(e), fg='red'))
+            return
+
+    try:
+        stream = sys.stdin if from_stdin else open(ns.input, newline='')
+    except OSError as e:
+        print(color(f"Cannot read --input {ns.input}: {e.strerror}", fg='red'))
+        return
+    rejects = batch_input.RejectWriter(ns.rejects)
+    try:
+        jobs = batch_input.read_label_jobs(stream, input_format, rejects,
+                                           default_type=ns.type,
+                                           default_description=ns.description,
+                                           allow_warning_labels=ns.warning_paper_loaded)
+        print_labels_pipelined(jobs, makeradmin_client, member_cache, ns, rejects=rejects)
+    finally:
+        if not from_stdin:
+            stream.close()
+        rejects.close()
+    if rejects.count > 0:
+        print(color(f"{rejects.count} rows were rejected, see {ns.rejects}", fg='red'))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group()
     group2 = parser.add_mutually_exclusive_group()
-    parser.add_argument("--type", choices=["box", "temp", "3d", "warning", "name", "meetup", "fire", "rotating"], default="name")
+    parser.add_argument("--type", choices=LABEL_TYPES, default="name")
     group.add_argument("-t", "--token_path", help="Path to Makeradmin token.", default=config.makeradmin_token_filename)
     group.add_argument("--development", action="store_true", help="Mock events")
     parser.add_argument("--no-backend", action="store_true", help="Mock backend (fake requests)")
@@ -85,10 +147,41 @@ def main() -> None:
                         nargs='*',
                         help='The member number(s) of the member(s) you want to print a label for')
     group2.add_argument('--interactive', action='store_true', help='Ask before printing each label')
+    group2.add_argument('--input', type=str, default=None,
+                        help='CSV or JSONL file (or - for stdin) with the columns member_number, type, description and copies. Rows are printed with the pipeline.')
 
     parser.add_argument('--description', type=str, help='Description to put on temporary storage labels', default=None)
+    parser.add_argument('--member-cache-ttl', type=float, default=300,
+                        help='Seconds to reuse a looked up member before asking the backend again')
+
+    pipeline_group = parser.add_argument_group("Pipelined bulk printing")
+    pipeline_group.add_argument('--pipeline', action='store_true',
+                                help='Look up, upload, render and print the member numbers concurrently')
+    pipeline_group.add_argument('--workers', type=int, default=4, help='Number of concurrent lookups and uploads')
+    pipeline_group.add_argument('--render-processes', type=int, default=None, help='Number of render processes (default: one per core)')
+    pipeline_group.add_argument('--checkpoint', type=str, default=None,
+                                help='File recording finished labels. Rerunning with the same arguments skips them.')
+
+    render_group = parser.add_argument_group("Rendering label files without printing")
+    render_group.add_argument('--render-only', action='store_true',
+                              help='Render the labels with the pipeline and write them to --output-dir. Implies --pipeline. Requires --no-backend.')
+    render_group.add_argument('--output-dir', type=str, default='rendered_labels', help='Directory for rendered labels')
+    render_group.add_argument('--render-format', choices=render_farm.RENDER_FORMATS, default='png',
+                              help='Write PNG images or the raw raster data sent to the printer')
+    render_group.add_argument('--printer-model', type=str, default=render_farm.DEFAULT_PRINTER_MODEL,
+                              help='Printer model to create raster data for')
+
+    input_group = parser.add_argument_group("Printing from a file (--input)")
+    input_group.add_argument('--input-format', choices=batch_input.INPUT_FORMATS, default=None,
+                             help='Format of the input (default: guessed from the file extension)')
+    input_group.add_argument('--rejects', type=str, default='rejected_labels.jsonl',
+                             help='File where rows that could not be printed are written')
+    input_group.add_argument('--warning-paper-loaded', action='store_true',
+                             help='Allow warning labels in the input. The yellow paper roll must be in use.')
 
     ns = parser.parse_args()
+    if ns.render_only and not ns.no_backend:
+        parser.error("--render-only would upload labels to makeradmin that are never printed. Add --no-backend.")
     config.no_backend = ns.no_backend
     config.no_printer = ns.no_printer
     config.makeradmin_token_filename = ns.token_path
@@ -103,7 +196,11 @@ def main() -> None:
         logger.warning("The makeradmin client is not logged in")
         makeradmin_client.login()
 
-    if ns.interactive:
+    member_cache = MemberCache(makeradmin_client, ttl=ns.member_cache_ttl)
+
+    if ns.input is not None:
+        print_labels_from_input(makeradmin_client, member_cache, ns)
+    elif ns.interactive:
         while True:
             try:
                 input_str = input(color("Enter member number: ", fg='orange'))
@@ -116,7 +213,7 @@ def main() -> None:
                 continue
 
             try:
-                member = Member.from_member_number(makeradmin_client, member_number)
+                member = member_cache.get(member_number)
             except NoMatchingMemberNumber:
                 print(color(f"Member number {member_number} did not match any known member", fg='red'))
                 continue
@@ -128,13 +225,24 @@ def main() -> None:
         if not ns.member_numbers:
             print(color("No member numbers provided. Use --interactive to enter member numbers one by one, or provide member numbers as arguments.", fg='red'))
 
+        if ns.pipeline or ns.render_only:
+            if not ns.render_only and ns.type == "warning" and not confirm_warning_label_paper():
+                return
+            jobs = (LabelJob(index, member_number, ns.type, ns.description) for index, member_number in enumerate(ns.member_numbers))
+            print_labels_pipelined(jobs, makeradmin_client, member_cache, ns)
+            return
+
+        member_cache.prefetch(ns.member_numbers)
         for member_number in ns.member_numbers:
             try:
-                member = Member.from_member_number(makeradmin_client, member_number)
+                member = member_cache.get(member_number)
             except NoMatchingMemberNumber:
                 logger.error(f"Member number {member_number} did not match any known member")
+                continue
             print_label(member, makeradmin_client, ns.type, ns.no_printer, ns.description)
 
+    logger.info(f"Member cache stats: {member_cache.stats()}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+
+from src.test.fault_injection import FaultProfile
+from src.test.session_driver import SCENARIOS, SessionDriver, create_driver, load_scripts, memory_growth
+from src.util.logger import init_logger, stop_listeners
+
+
+def print_memory(driver: SessionDriver) -> None:
+    sample = driver.memory[-1]
+    traced = f", traced {sample.traced / 2**20:.1f} MB" if sample.traced is not None else ""
+    print(f"{sample.sessions} sessions: rss {sample.rss / 2**20:.1f} MB{traced}, {sample.objects} objects, "
+          f"{sample.threads} threads, {sample.pending_callbacks} pending callbacks")
+    sys.stdout.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run scripted sessions through the states of the memberbooth without a display, "
+                                                 "against the mocked makeradmin and Slack clients, and report the latency of "
+                                                 "every state transition and how the memory grows")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--scripts", help="JSON file of scripts by name. Defaults to the built in scenarios: " + ", ".join(SCENARIOS))
+    parser.add_argument("--only", action="append", help="Only run this script. Can be given several times.")
+    parser.add_argument("--seed", type=int, default=None, help="Pick scripts at random with this seed, instead of in turn")
+    parser.add_argument("--sample-every", type=int, default=100, help="Sessions between memory samples")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also trace Python allocations, and show where the memory grew. Slows everything down.")
+    parser.add_argument("--print-seconds", type=float, default=0.0, help="Seconds the pretend printer takes per label")
+    parser.add_argument("--fault-profile", help="Latency and failures of the mocked makeradmin and Slack clients")
+    ns = parser.parse_args()
+
+    init_logger("replay_sessions")
+    scripts = load_scripts(ns.scripts) if ns.scripts else SCENARIOS
+    if ns.only:
+        scripts = {name: scripts[name] for name in ns.only}
+
+    profile = FaultProfile.load(ns.fault_profile) if ns.fault_profile else None
+    driver = create_driver(profile.injector("makeradmin") if profile else None, profile.injector("slack") if profile else None,
+                           print_seconds=ns.print_seconds)
+    snapshot = None
+    try:
+        def progress(driver: SessionDriver) -> None:
+            nonlocal snapshot
+            print_memory(driver)
+            if ns.tracemalloc and snapshot is None:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+
+        driver.run(scripts, ns.sessions, ns.seed, ns.sample_every, ns.tracemalloc, progress)
+
+        print(f"\n{'transition':<70} {'count':>7} {'stuck':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for row in driver.summary():
+            print(f"{row['transition']:<70} {row['count']:>7} {row['stuck']:>6} "
+                  f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+        if driver.abandoned:
+            print(f"\n{driver.abandoned} of {driver.sessions} sessions were back at the login screen before the script ended")
+        if driver.error_messages:
+            print("\nErrors shown to members:")
+            for message, count in driver.error_messages.most_common():
+                print(f"  {count:>6} x {message}")
+
+        growth = list(memory_growth(driver.memory))
+        if growth:
+            print("\nGrowth per 1000 sessions after the first sample: " + ", ".join(f"{name} {value:+.1f}" for name, value in growth))
+        if snapshot is not None:
+            import tracemalloc
+            print("\nLargest growth of allocations since the first sample:")
+            for stat in tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:10]:
+                print(f"  {stat}")
+    finally:
+        driver.close()
+        stop_listeners()
+
+
+if __name__ == "__main__":
+    main()
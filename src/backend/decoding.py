@@ -0,0 +1,42 @@
+import datetime
+import typing
+from typing import Any, Generic, TypeVar
+import dateutil.parser
+import serde
+
+T = TypeVar("T")
+
+
+def parse_iso_date(value: str) -> datetime.date:
+    '''
+    Parses the dates sent by makeradmin. They are always ISO dates, which the
+    standard library parses much faster than dateutil. dateutil is only used if
+    the fast path fails, so that unexpected formats still work.
+    '''
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).date()
+    except ValueError:
+        return dateutil.parser.parse(value).date()
+
+
+class TaggedUnionDecoder(Generic[T]):
+    '''
+    Decodes internally tagged dicts into one of the classes in a union, using the
+    tag to pick the class directly. pyserde would otherwise try to deserialize the
+    dict as each class of the union in turn until one succeeds.
+    '''
+
+    def __init__(self, union: Any, tag: str = "type") -> None:
+        self.tag = tag
+        self.classes: dict[str, type] = {cls.__name__: cls for cls in typing.get_args(union)}
+
+    def decode(self, data: dict[str, Any]) -> T:
+        try:
+            cls = self.classes[data[self.tag]]
+        except KeyError:
+            raise ValueError(f"Unknown or missing '{self.tag}' in {data}")
+        return serde.from_dict(cls, data)
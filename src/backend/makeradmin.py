@@ -1,10 +1,15 @@
 from typing import Any
 import requests
-from serde import InternalTagging, from_dict
+import time
+from serde import InternalTagging
 from serde.json import to_json, to_dict
 import serde
+import re
+from src.backend.decoding import TaggedUnionDecoder
 from src.backend.label_data import LabelType
 from src.util.logger import get_logger
+from src.util import metrics
+from src.util.tracing import traced
 from src.util.token_config import TokenConfiguredClient, TokenExpiredError
 from pathlib import Path
 from urllib.parse import urlparse
@@ -31,6 +36,32 @@ class UploadedLabel():
     public_observation_url: str
     label: LabelType
 
+
+_label_decoder: TaggedUnionDecoder[LabelType] = TaggedUnionDecoder(LabelType, tag="type")
+
+
+def decode_uploaded_label(data: dict[str, Any]) -> UploadedLabel:
+    '''
+    Equivalent to serde.from_dict(UploadedLabel, data), but picks the label class
+    from its "type" field instead of trying every class in LabelType.
+    '''
+    unknown_fields = data.keys() - {"public_url", "public_observation_url", "label"}
+    if unknown_fields:
+        raise ValueError(f"Unknown fields in uploaded label: {unknown_fields}")
+    return UploadedLabel(
+        public_url=data["public_url"],
+        public_observation_url=data["public_observation_url"],
+        label=_label_decoder.decode(data["label"]),
+    )
+
+def metrics_endpoint(subpage: str) -> str:
+    '''
+    The endpoint of a request, without ids, so that there is one metric per endpoint
+    instead of one per tag or member
+    '''
+    return re.sub(r"/\d+$", "/{id}", subpage)
+
+
 class MakerAdminClient(TokenConfiguredClient):
     TAG_URL = "/multiaccess/memberbooth/tag"
     PERMISSIONS_URL = "/permission/authenticated"
@@ -62,11 +93,15 @@ class MakerAdminClient(TokenConfiguredClient):
     def _request(self, subpage: str, data: dict[str, Any] = {}, method="GET") -> requests.Response:
         assert self.token is not None
         url = self.base_url + subpage
+        endpoint = metrics_endpoint(subpage)
+        start = time.perf_counter()
         try:
             r = requests.request(method, url, headers={'Authorization': 'Bearer ' + self.token}, json=data, timeout=1)
         except requests.exceptions.RequestException:
+            metrics.BACKEND_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status="network_error")
             logger.exception("An exception was raised while trying to send request to makeradmin")
             raise NetworkError()
+        metrics.BACKEND_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status=str(r.status_code))
         return r
 
     @TokenConfiguredClient.require_configured_factory(default_retval=dict(ok=False))
@@ -92,18 +127,23 @@ class MakerAdminClient(TokenConfiguredClient):
 
         return True
 
-    def get_tag_info(self, tagid: int):
+    @traced("makeradmin.get_tag_info")
+    def get_tag_info(self, tagid: int | str):
         r = self.request(f"{self.TAG_URL}/{tagid}")
+        if r.status_code == 404:
+            return dict(data=None)
         if not r.ok:
             raise Exception("Could not get a response... from server")
         return r.json()
 
+    @traced("makeradmin.get_member_number_info")
     def get_member_number_info(self, member_number: int):
         r = self.request(f"{self.MEMBER_NUMBER_URL}/{member_number}")
         if not r.ok:
             raise Exception("Could not get a response... from server")
         return r.json()
 
+    @traced("makeradmin.get_member_with_pin")
     def get_member_with_pin(self, member_number: int, pin_code: str):
         r = self.request(self.PIN_CODE_LOGIN_URL, {"member_number": member_number, "pin_code": pin_code}, method="POST")
         if r.status_code == 404:
@@ -113,13 +153,14 @@ class MakerAdminClient(TokenConfiguredClient):
             raise Exception("Bad response from backend")
         return r.json()
 
+    @traced("makeradmin.post_label")
     def post_label(self, label: LabelType) -> UploadedLabel:
         json_data = to_dict(label, InternalTagging("type", LabelType))
         r = self.request("/multiaccess/memberbooth/label", data=json_data, method="POST")
         if not r.ok:
             logger.error(f"Failed to upload label: {r.text}")
             raise NetworkError("Could not upload label to makeradmin")
-        return from_dict(UploadedLabel, r.json()["data"])
+        return decode_uploaded_label(r.json()["data"])
 
     def login(self):
         print("Login to Makeradmin")
@@ -1,10 +1,14 @@
-from typing import Any
-import dateutil.parser
+from typing import Any, Iterable
 import datetime
+import threading
+import time
 import typing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 from logging import getLogger
+from src.backend.decoding import parse_iso_date
 
 if typing.TYPE_CHECKING:
     from src.backend.makeradmin import MakerAdminClient
@@ -41,6 +45,7 @@ class Member(object):
     special_labaccess: EndDate
     effective_labaccess: EndDate
     permissions: list[str]
+    rfid_tags: tuple[str, ...] = ()
 
     def get_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
@@ -59,7 +64,7 @@ class Member(object):
         def datify(makeradmin_date: str | None) -> datetime.datetime | None:
             if makeradmin_date is None:
                 return None
-            return datetime.datetime.combine(dateutil.parser.parse(makeradmin_date).date(), datetime.time(23, 59, 59))
+            return datetime.datetime.combine(parse_iso_date(makeradmin_date), datetime.time(23, 59, 59))
 
         try:
             data = response_data["data"]
@@ -75,6 +80,7 @@ class Member(object):
                 effective_labaccess=EndDate(membership_data["effective_labaccess_active"],
                                             datify(membership_data["effective_labaccess_end"])),
                 permissions=data["permissions"],
+                rfid_tags=tuple(str(key["rfid_tag"]) for key in data.get("keys") or []),
             )
         except Exception as e:
             raise BackendParseError(str(e))
@@ -85,6 +91,10 @@ class Member(object):
     def from_member_number_and_pin(cls, client: 'MakerAdminClient | MockedMakerAdminClient', member_number: int, pin_code: str) -> 'Member | None':
         return cls.from_response(client.get_member_with_pin(member_number, pin_code))
 
+    @classmethod
+    def from_tag(cls, client: 'MakerAdminClient | MockedMakerAdminClient', tag_id: str) -> 'Member | None':
+        return cls.from_response(client.get_tag_info(tag_id))
+
     @classmethod
     def from_member_number(cls, client: 'MakerAdminClient | MockedMakerAdminClient', member_number: int) -> 'Member':
         member = cls.from_response(client.get_member_number_info(member_number))
@@ -92,3 +102,96 @@ class Member(object):
             raise NoMatchingMemberNumber(member_number)
 
         return member
+
+
+class MemberCache(object):
+    '''
+    Caches members by member number, so that repeated lookups of the same member
+    (e.g. re-running a batch after a printer jam) do not hit the backend again.
+    Entries expire after ttl seconds and the least recently used entry is evicted
+    when the cache holds more than max_size members.
+    '''
+
+    def __init__(self, client: 'MakerAdminClient | MockedMakerAdminClient', ttl: float = 300, max_size: int = 1024, max_workers: int = 4) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[float, Member]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, member_number: int) -> Member | None:
+        with self._lock:
+            entry = self._entries.get(member_number)
+            if entry is None:
+                self.misses += 1
+                return None
+            fetched_at, member = entry
+            if time.monotonic() - fetched_at > self.ttl:
+                del self._entries[member_number]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(member_number)
+            self.hits += 1
+            return member
+
+    def _store(self, member_number: int, member: Member) -> None:
+        with self._lock:
+            self._entries[member_number] = (time.monotonic(), member)
+            self._entries.move_to_end(member_number)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, member_number: int) -> Member:
+        member = self._lookup(member_number)
+        if member is None:
+            member = Member.from_member_number(self.client, member_number)
+            # Under the number that was asked for, which is what the next get() looks up
+            self._store(member_number, member)
+        return member
+
+    def put(self, member: Member) -> None:
+        self._store(member.member_number, member)
+
+    def invalidate(self, member_number: int | None = None) -> None:
+        with self._lock:
+            if member_number is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(member_number, None)
+
+    def prefetch(self, member_numbers: Iterable[int]) -> dict[int, Member]:
+        '''
+        Fetches all given member numbers concurrently, using at most max_workers
+        simultaneous backend requests. Members that could not be fetched are logged
+        and left out of the returned dict.
+        '''
+        unique_numbers = list(dict.fromkeys(member_numbers))
+        members: dict[int, Member] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="member-prefetch") as executor:
+            for member_number, result in zip(unique_numbers, executor.map(self._try_get, unique_numbers)):
+                if isinstance(result, Member):
+                    members[member_number] = result
+                else:
+                    logger.warning(f"Could not prefetch member number {member_number}: {result}")
+        return members
+
+    def _try_get(self, member_number: int) -> Member | Exception:
+        try:
+            return self.get(member_number)
+        except Exception as e:
+            return e
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return dict(
+            size=len(self._entries),
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+        )
@@ -0,0 +1,105 @@
+import threading
+import time
+import typing
+
+from src.backend.member import Member
+from src.util.logger import get_logger
+
+if typing.TYPE_CHECKING:
+    from src.backend.makeradmin import MakerAdminClient
+    from src.test.makeradmin_mock import MakerAdminClient as MockedMakerAdminClient
+
+logger = get_logger()
+
+
+class TagIndex(object):
+    '''
+    Local index from RFID tag id to member, so that a badge swipe can be resolved
+    without waiting for the backend. The index is filled with the tags of every
+    member that logs in or is looked up, and entries older than ttl seconds are
+    checked against the backend again in the background, one at a time.
+    The index can be stale, so the tag must be verified with verify() before
+    anything is done on the member's behalf.
+    '''
+
+    def __init__(self, client: 'MakerAdminClient | MockedMakerAdminClient', ttl: float = 60 * 60, refresh_period: float = 10) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.refresh_period = refresh_period
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, tuple[float, Member]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add_member(self, member: Member) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Tags the member no longer has are removed
+            for tag_id in [tag_id for tag_id, (_, m) in self._entries.items() if m.member_number == member.member_number and tag_id not in member.rfid_tags]:
+                del self._entries[tag_id]
+            for tag_id in member.rfid_tags:
+                self._entries[tag_id] = (now, member)
+
+    def remove(self, tag_id: str) -> None:
+        with self._lock:
+            self._entries.pop(tag_id, None)
+
+    def lookup(self, tag_id: str) -> Member | None:
+        '''
+        Returns the member for the tag from the local index, without asking the backend
+        '''
+        with self._lock:
+            entry = self._entries.get(tag_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def verify(self, tag_id: str) -> Member | None:
+        '''
+        Asks the backend who the tag belongs to and updates the index.
+        Returns None if the tag does not belong to any member.
+        '''
+        member = Member.from_tag(self.client, tag_id)
+        if member is None:
+            self.remove(tag_id)
+        else:
+            self.add_member(member)
+            if tag_id not in member.rfid_tags:
+                # The backend response does not list the tags. Trust the lookup itself.
+                with self._lock:
+                    self._entries[tag_id] = (time.monotonic(), member)
+        return member
+
+    def refresh_stale(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stale = [tag_id for tag_id, (updated_at, _) in self._entries.items() if now - updated_at > self.ttl]
+        for tag_id in stale:
+            if self._stop.is_set():
+                return
+            try:
+                self.verify(tag_id)
+            except Exception as e:
+                logger.warning(f"Could not refresh tag index entry: {e!r}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_period):
+            self.refresh_stale()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="tag-index-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,4 +1,4 @@
-from tkinter import LEFT, X, NORMAL, DISABLED, Frame, Button, Label, Entry, Text, StringVar, END, DoubleVar, Spinbox
+from tkinter import LEFT, X, NORMAL, DISABLED, Frame, Button, Label, Entry, Text, StringVar, END, Spinbox
 import tkinter
 from tkinter import font, ttk, messagebox
 from PIL import Image, ImageTk
@@ -6,7 +6,7 @@ from src.backend.member import Member
 from src.label.creator import FIRE_BOX_STORAGE_LENGTH, TEMP_STORAGE_LENGTH
 from src.util.logger import get_logger
 import config
-from typing import Any, Callable, Union
+from typing import Any, Callable, TypeVar, Union
 from datetime import datetime, timedelta
 from .event import GuiEvent, MemberLoginData
 from src.backend import label_data
@@ -19,10 +19,15 @@ MS_PER_SECOND = 1000
 TIMEOUT_TIMER_PERIOD_MS = 60 * MS_PER_SECOND
 TEMPORARY_STORAGE_LABEL_DEFAULT_TEXT = 'Describe what you want to store here...'
 MEMBER_NUMBER_LENGTH = 4
+PREVIEW_DEBOUNCE_MS = 400
 
 logger = get_logger()
 
 
+def _ignore_gui_event(gui_event: GuiEvent) -> None:
+    logger.warning(f"{gui_event} on a hidden screen")
+
+
 class GuiTemplate:
 
     def add_print_button(self, master: tkinter.Frame, label: str, callback: Callable[[], Any], takefocus: bool = True) -> Button:
@@ -45,13 +50,30 @@ class GuiTemplate:
         entry.config(state=DISABLED)
         return entry
 
-    def create_label_with_status_indicator(self, master, label_text, dt: Union[datetime, None]):
+    def set_entry_text(self, entry: Entry, text: str) -> None:
+        state = entry['state']
+        entry.config(state=NORMAL)
+        entry.delete(0, END)
+        entry.insert(END, text)
+        entry.config(state=state)
+
+    def create_label_with_status_indicator(self, master, label_text):
 
         holder = Frame(master, background='')
 
         label = self.create_label(master, label_text)
         label.pack(fill=X, pady=5)
 
+        holder.status_label = self.create_label(holder, '')  # type: ignore
+        holder.status_label.pack(side=LEFT, padx=5)  # type: ignore
+
+        holder.expiration_entry = self.create_entry(holder, '', border=False)  # type: ignore
+        holder.expiration_entry.pack(fill=X)  # type: ignore
+
+        return holder
+
+    def set_status_indicator(self, holder, dt: Union[datetime, None]) -> None:
+
         expiration_text = str(dt)
         if dt is None:
             text = "?"
@@ -64,63 +86,73 @@ class GuiTemplate:
             text = "✓"
             color = "green"
 
-        status_label = self.create_label(holder, text)
-        status_label.configure(fg=color)
-        status_label.pack(side=LEFT, padx=5)
-
-        tag_expiration_text = self.create_entry(holder, expiration_text, border=False)
-        tag_expiration_text.pack(fill=X)
+        holder.status_label.configure(text=text, fg=color)
+        self.set_entry_text(holder.expiration_entry, expiration_text)
 
-        return holder
-
-    def add_basic_information(self, master: tkinter.Frame, member_number: int, name: str, tag_expiration_date: datetime | None, membership_expiration_date: datetime | None):
+    def add_basic_information(self, master: tkinter.Frame):
 
         member_id_label = self.create_label(master, 'Member number:')
         member_id_label.pack(fill=X, pady=5)
 
-        member_id_text = self.create_entry(master, str(member_number), border=False)
-        member_id_text.pack(fill=X)
+        self.member_id_text = self.create_entry(master, '', border=False)
+        self.member_id_text.pack(fill=X)
 
         name_label = self.create_label(master, 'Name:')
         name_label.pack(fill=X, pady=5)
 
-        name_id_text = self.create_entry(master, name, border=False)
-        name_id_text.pack(fill=X)
+        self.name_id_text = self.create_entry(master, '', border=False)
+        self.name_id_text.pack(fill=X)
+
+        self.membership_status = self.create_label_with_status_indicator(master, "Organization membership expires:")
+        self.membership_status.pack(fill=X, pady=5)
+        self.lab_membership_status = self.create_label_with_status_indicator(master, 'Lab membership expires:')
+        self.lab_membership_status.pack(fill=X, pady=5)
 
-        membership_status = self.create_label_with_status_indicator(master, "Organization membership expires:",
-                                                                    membership_expiration_date)
-        membership_status.pack(fill=X, pady=5)
-        lab_membership_status = self.create_label_with_status_indicator(master, 'Lab membership expires:',
-                                                                        tag_expiration_date)
-        lab_membership_status.pack(fill=X, pady=5)
+    def set_basic_information(self, member_number: int, name: str, tag_expiration_date: datetime | None, membership_expiration_date: datetime | None):
+        self.set_entry_text(self.member_id_text, str(member_number))
+        self.set_entry_text(self.name_id_text, name)
+        self.set_status_indicator(self.membership_status, membership_expiration_date)
+        self.set_status_indicator(self.lab_membership_status, tag_expiration_date)
 
-    def __init__(self, master: tkinter.Tk, gui_callback: Callable[[GuiEvent], None]):
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager'):
 
         self.master = master
-        self.gui_callback = gui_callback
+        self.gui_callback: Callable[[GuiEvent], None] = _ignore_gui_event
         self.timer: str | None = None
-        self.timeout_timer_start()
+        self.member: Member | None = None
 
-        for widget in self.master.winfo_children():
-            widget.destroy()
+        self.label_font = screens.label_font
+        self.text_font = screens.text_font
 
-        self.label_font = font.Font(family='Arial', size=25, weight='bold')
-        self.text_font = font.Font(family='Arial', size=25)
+        self.frame = Frame(self.master, bg='', bd=0, width=screens.logotype_img.size[0], height=screens.window_height)
+        self.frame.pack_propagate(False)
 
-        self.logotype_img = Image.open(config.LOGOTYPE_PATH)
-        self.window_width, self.window_height = self.master.winfo_screenwidth(), self.master.winfo_screenheight()
+    def set_member(self, member: Member) -> None:
+        self.member = member
 
-        if config.development:
-            dev_title = Label(self.master, text="Development mode", font=self.label_font)
-            dev_title.pack(pady=25)
-        else:
-            self.logotype = ImageTk.PhotoImage(self.logotype_img)
-            self.logotype_label = Label(self.master, image=self.logotype, bd=0)
-            self.logotype_label.pack(pady=25)
+    def get_member(self) -> Member:
+        assert self.member is not None
+        return self.member
 
-        self.frame = Frame(self.master, bg='', bd=0, width=self.logotype_img.size[0], height=self.window_height)
-        self.frame.pack_propagate(False)
-        self.frame.pack()
+    def reset(self) -> None:
+        '''
+        Clears what the previous user entered. Called every time the screen is shown.
+        '''
+        pass
+
+    def show(self, gui_callback: Callable[[GuiEvent], None]) -> None:
+        self.gui_callback = gui_callback
+        self.reset()
+        if isinstance(self, ButtonsGuiMixin):
+            self.activate_buttons()
+        self.frame.pack(pady=25)
+        self.timeout_timer_start()
+
+    def hide(self) -> None:
+        if self.timer is not None:
+            self.timeout_timer_cancel()
+        self.gui_callback = _ignore_gui_event
+        self.frame.pack_forget()
 
     def timeout_timer_reset(self) -> None:
 
@@ -134,6 +166,7 @@ class GuiTemplate:
     def timeout_timer_cancel(self) -> None:
         assert self.timer is not None
         self.master.after_cancel(self.timer)
+        self.timer = None
 
     def timeout_timer_start(self) -> None:
         self.timer = self.master.after(TIMEOUT_TIMER_PERIOD_MS, self.timeout_timer_expired)
@@ -143,7 +176,78 @@ class GuiTemplate:
         self.timeout_timer_start()
 
 
-class StartGui(GuiTemplate):
+S = TypeVar('S', bound=GuiTemplate)
+
+
+class ScreenManager(object):
+    '''
+    Owns the parts of the window that are shared by all screens (fonts, logotype)
+    and builds each screen once. Changing state hides the current screen and shows
+    the next one, instead of destroying and building all widgets again.
+    '''
+
+    def __init__(self, master: tkinter.Tk) -> None:
+        self.master = master
+        self.label_font = font.Font(family='Arial', size=25, weight='bold')
+        self.text_font = font.Font(family='Arial', size=25)
+
+        self.logotype_img = Image.open(config.LOGOTYPE_PATH)
+        self.window_width, self.window_height = self.master.winfo_screenwidth(), self.master.winfo_screenheight()
+
+        if config.development:
+            dev_title = Label(self.master, text="Development mode", font=self.label_font)
+            dev_title.pack(pady=25)
+        else:
+            self.logotype = ImageTk.PhotoImage(self.logotype_img)
+            self.logotype_label = Label(self.master, image=self.logotype, bd=0)
+            self.logotype_label.pack(pady=25)
+
+        self.screens: dict[type[GuiTemplate], GuiTemplate] = {}
+        self.current: GuiTemplate | None = None
+
+    def show(self, screen_type: type[S], gui_callback: Callable[[GuiEvent], None], member: Member | None = None) -> S:
+        if self.current is not None:
+            self.current.hide()
+
+        screen = self.screens.get(screen_type)
+        if screen is None:
+            logger.info(f"Building screen {screen_type.__name__}")
+            screen = self.build(screen_type)
+            self.screens[screen_type] = screen
+
+        if member is not None:
+            screen.set_member(member)
+        screen.show(gui_callback)
+        self.current = screen
+        return screen  # type: ignore
+
+    def build(self, screen_type: type[S]) -> S:
+        return screen_type(self.master, self)
+
+
+class InlineErrorGui(GuiTemplate):
+    '''
+    Shows error messages in a label on the screen for a while, instead of in a dialog.
+    Subclasses create self.error_message_label.
+    '''
+    error_message_label: Label
+    error_message_debouncer: str | None = None
+
+    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
+        logger.error(f"GUI error: {error_message}")
+        if self.error_message_debouncer is not None:
+            self.frame.after_cancel(self.error_message_debouncer)
+        self.error_message_label.config(text=error_message)
+        self.error_message_debouncer = self.frame.after(5000, self.clear_error_message)
+
+    def clear_error_message(self) -> None:
+        if self.error_message_debouncer is not None:
+            self.frame.after_cancel(self.error_message_debouncer)
+            self.error_message_debouncer = None
+        self.error_message_label.config(text='')
+
+
+class StartGui(InlineErrorGui):
 
     def _is_login_entry_complete(self) -> None:
         if len(self.member_number_entry.get()) >= MEMBER_NUMBER_LENGTH:
@@ -159,8 +263,8 @@ class StartGui(GuiTemplate):
         else:
             return False
 
-    def __init__(self, master: tkinter.Tk, gui_callback: Callable[[GuiEvent], None]):
-        super().__init__(master, gui_callback)
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager'):
+        super().__init__(master, screens)
 
         self.entry_debouncer: str | None = None
 
@@ -172,7 +276,6 @@ class StartGui(GuiTemplate):
         self.member_number_entry = self.create_entry(self.frame, '')
         self.member_number_entry.config(state=NORMAL, validate='key', validatecommand=(member_number_validation, '%P'))
         self.member_number_entry.pack(fill=X, pady=5)
-        self.member_number_entry.focus_force()
         self.member_number_entry.bind("<KeyRelease>", self.keyup)
 
         self.member_pin_code_label = self.create_label(self.frame, 'PIN code:')
@@ -183,39 +286,52 @@ class StartGui(GuiTemplate):
         self.member_pin_code_entry.pack(fill=X, pady=5)
         self.member_pin_code_entry.bind("<KeyRelease>", self.keyup)
 
-        def login(*args):
-            return gui_callback(GuiEvent(GuiEvent.LOGIN, MemberLoginData(self.member_number_entry.get(), self.member_pin_code_entry.get())))
-
         self.login_button = self.add_print_button(
             self.frame,
             'Login',
-            login
+            self.login
         )
         self.login_button.config(state='disabled')
 
-        self.master.bind("<KP_Enter>", login)
-        self.master.bind("<Return>", login)
-
         self.help_label = self.create_label(self.frame, 'Use your member number and PIN code to login.\nYou can find and change your PIN code on https://medlem.makerspace.se.')
         self.help_label.config(fg='grey', font=("Arial", 12))
         self.help_label.pack(fill=X, pady=5)
 
-        self.progress_value = DoubleVar()
-        self.progress_bar = ttk.Progressbar(self.frame, variable=self.progress_value, mode='determinate', maximum=100)
+        self.progress_bar = ttk.Progressbar(self.frame, mode='indeterminate')
 
-        self.error_message_debouncer: str | None = None
         self.error_message_label = self.create_label(self.frame, '')
         self.error_message_label.config(fg='red')
         self.error_message_label.pack(fill=X, pady=5)
 
-        self.frame.pack(pady=25)
+        self.key_reader_status_label = self.create_label(self.frame, '')
+        self.key_reader_status_label.config(fg='red', font=("Arial", 12))
+        self.key_reader_status_label.pack(fill=X, pady=5)
 
-    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
-        logger.error(f"GUI error: {error_message}")
-        if self.error_message_debouncer is not None:
-            self.frame.after_cancel(self.error_message_debouncer)
-        self.error_message_label.config(text=error_message)
-        self.error_message_debouncer = self.frame.after(5000, lambda: self.error_message_label.config(text=''))
+    def login(self, *args: Any) -> None:
+        self.gui_callback(GuiEvent(GuiEvent.LOGIN, MemberLoginData(self.member_number_entry.get(), self.member_pin_code_entry.get())))
+
+    def show(self, gui_callback: Callable[[GuiEvent], None]) -> None:
+        super().show(gui_callback)
+        self.master.bind("<KP_Enter>", self.login)
+        self.master.bind("<Return>", self.login)
+        self.member_number_entry.focus_force()
+
+    def hide(self) -> None:
+        self.master.unbind("<KP_Enter>")
+        self.master.unbind("<Return>")
+        super().hide()
+
+    def reset(self) -> None:
+        self.clear_error_message()
+        self.stop_progress_bar()
+        self.clear_inputs()
+
+    def set_key_reader_status(self, connected: bool | None) -> None:
+        '''
+        connected is None when the booth has no key reader
+        '''
+        text = 'The badge reader is not working. Please log in with your PIN code.' if connected is False else ''
+        self.key_reader_status_label.config(text=text)
 
     def reset_gui(self) -> None:
         self.stop_progress_bar()
@@ -224,16 +340,20 @@ class StartGui(GuiTemplate):
         self.member_number_entry.focus_force()
 
     def start_progress_bar(self) -> None:
-        self.progress_value.set(0)
+        self.progress_bar.start()
         self.progress_bar.pack(fill=X, pady=5)
 
     def stop_progress_bar(self) -> None:
-        self.progress_value.set(100)
         self.progress_bar.stop()
+        self.progress_bar.pack_forget()
 
     def clear_inputs(self) -> None:
+        if self.entry_debouncer is not None:
+            self.frame.after_cancel(self.entry_debouncer)
+            self.entry_debouncer = None
         self.member_number_entry.delete(0, 'end')
         self.member_pin_code_entry.delete(0, 'end')
+        self._is_login_entry_complete()
 
     def keyup(self, key_event: Any) -> None:
         self._is_login_entry_complete()
@@ -244,9 +364,11 @@ class StartGui(GuiTemplate):
 
 class ButtonsGuiMixin:
     '''
-    The class shall add the Tkinter buttons to the self.buttons array
+    The class shall add the Tkinter buttons to the self.buttons array.
+    The progress bar is shown below them while a label is printed.
     '''
     buttons: list[Button] = []
+    print_progress_bar: ttk.Progressbar | None = None
 
     def deactivate_buttons(self):
         for b in self.buttons:
@@ -256,15 +378,24 @@ class ButtonsGuiMixin:
         for b in self.buttons:
             b['state'] = tkinter.NORMAL
 
+    def start_progress_bar(self) -> None:
+        if self.print_progress_bar is None:
+            self.print_progress_bar = ttk.Progressbar(self.frame, mode='indeterminate')  # type: ignore
+        self.print_progress_bar.start()
+        self.print_progress_bar.pack(fill=X, pady=5)
+
+    def stop_progress_bar(self) -> None:
+        if self.print_progress_bar is not None:
+            self.print_progress_bar.stop()
+            self.print_progress_bar.pack_forget()
+
 
 class MemberInformation(GuiTemplate, ButtonsGuiMixin):
 
-    def __init__(self, master: tkinter.Tk, gui_callback: Callable[[GuiEvent], None], member: Member) -> None:
-        super().__init__(master, gui_callback)
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager') -> None:
+        super().__init__(master, screens)
 
-        self.add_basic_information(
-            self.frame, member.member_number, member.get_name(),
-            member.effective_labaccess.end_date, member.membership.end_date)
+        self.add_basic_information(self.frame)
 
         self.print_header = self.create_label(self.frame, "Print label for:")
         self.print_header.pack(fill=X, pady=(40, 0))
@@ -272,75 +403,120 @@ class MemberInformation(GuiTemplate, ButtonsGuiMixin):
         self.storage_label_button = self.add_print_button(
             self.frame,
             'Temporary storage',
-            lambda: gui_callback(GuiEvent(GuiEvent.DRAW_STORAGE_LABEL_GUI))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.DRAW_STORAGE_LABEL_GUI))
         )
 
         self.storage_label_button = self.add_print_button(
             self.frame,
             'Rotating storage (e.g. laser)',
-            lambda: gui_callback(GuiEvent(GuiEvent.DRAW_ROTATING_LABEL_GUI))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.DRAW_ROTATING_LABEL_GUI))
         )
 
         self.fire_box_label_button = self.add_print_button(
             self.frame,
             'Fire safety cabinet storage',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.FireSafetyLabel.from_member(member, (datetime.now() + timedelta(days=FIRE_BOX_STORAGE_LENGTH)).date())))
+            lambda: self.print_label(label_data.FireSafetyLabel.from_member(self.get_member(), (datetime.now() + timedelta(days=FIRE_BOX_STORAGE_LENGTH)).date()))
         )
 
         self.label_3d_printer_button = self.add_print_button(
             self.frame,
             '3D-printer marker',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.Printer3DLabel.from_member(member)))
+            lambda: self.print_label(label_data.Printer3DLabel.from_member(self.get_member()))
         )
 
         self.box_label_button = self.add_print_button(
             self.frame,
             'Storage box',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.BoxLabel.from_member(member)))
+            lambda: self.print_label(label_data.BoxLabel.from_member(self.get_member()))
         )
         # Removed due to not being used present
         '''
         self.box_label_button = self.add_print_button(
             self.frame,
             'Meetup name tag',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.MeetupNameTag.from_member(member)))
+            lambda: self.print_label(label_data.MeetupNameTag.from_member(self.get_member()))
         )
         '''
         self.box_label_button = self.add_print_button(
             self.frame,
             'Annual meeting name tag',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.NameTag.from_member(member)))
+            lambda: self.print_label(label_data.NameTag.from_member(self.get_member()))
         )
 
         self.drying_label_button = self.add_print_button(
             self.frame,
             'Drying label',
-            lambda: gui_callback(GuiEvent(GuiEvent.DRAW_DRYING_LABEL_GUI))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.DRAW_DRYING_LABEL_GUI))
         )
 
-        # Being able to send messages kinda implies someone admin-like
-        # They should be able to print warning labels
-        if member.has_permission('message_send'):
-            self.message_label_button = self.add_print_button(
-                self.frame,
-                'Print warning label',
-                lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.WarningLabel.from_member(member, None, (datetime.now() + timedelta(days=30)).date())))
-            )
-
+        # Only shown to members with the permission, see set_member
+        self.message_label_button = self.add_print_button(
+            self.frame,
+            'Print warning label',
+            lambda: self.print_label(label_data.WarningLabel.from_member(self.get_member(), None, (datetime.now() + timedelta(days=30)).date()))
+        )
 
         self.exit_button = self.add_print_button(
             self.frame,
             'Log out',
-            lambda: gui_callback(GuiEvent(GuiEvent.LOG_OUT))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.LOG_OUT))
         )
         self.exit_button.pack(pady=(40, 0))
 
         self.buttons = [self.storage_label_button, self.fire_box_label_button, self.box_label_button, self.exit_button]
 
+    def print_label(self, label: label_data.LabelType) -> None:
+        self.gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label))
+
+    def set_member(self, member: Member) -> None:
+        super().set_member(member)
+        self.set_basic_information(member.member_number, member.get_name(),
+                                   member.effective_labaccess.end_date, member.membership.end_date)
+
+        # Being able to send messages kinda implies someone admin-like
+        # They should be able to print warning labels
+        if member.has_permission('message_send'):
+            self.message_label_button.pack(fill=X, pady=5, before=self.exit_button)
+        else:
+            self.message_label_button.pack_forget()
+
+
+class LabelPreviewGui(InlineErrorGui):
+    '''
+    Shows a thumbnail of the label being edited. The screen calls request_preview
+    when the input changes. The state renders the label on a worker thread and
+    passes the image to show_preview.
+    '''
+    preview_debouncer: str | None = None
+    preview_image: ImageTk.PhotoImage | None = None
+
+    def create_preview(self, master: tkinter.Frame) -> None:
+        self.preview_label = Label(master, bg='white', bd=0)
+        self.preview_label.pack(pady=5)
+
+    def request_preview(self, data: Any) -> None:
+        if self.preview_debouncer is not None:
+            self.frame.after_cancel(self.preview_debouncer)
+        self.preview_debouncer = self.frame.after(PREVIEW_DEBOUNCE_MS, lambda: self.send_preview_request(data))
+
+    def send_preview_request(self, data: Any) -> None:
+        self.preview_debouncer = None
+        self.gui_callback(GuiEvent(GuiEvent.PREVIEW_LABEL, data))
+
+    def show_preview(self, image: Image.Image | None) -> None:
+        self.preview_image = ImageTk.PhotoImage(image) if image is not None else None
+        self.preview_label.config(image=self.preview_image or '')
+
+    def clear_preview(self) -> None:
+        if self.preview_debouncer is not None:
+            self.frame.after_cancel(self.preview_debouncer)
+            self.preview_debouncer = None
+        self.show_preview(None)
 
-class EditDescription(GuiTemplate, ButtonsGuiMixin):
-    def __init__(self, master: tkinter.Tk, gui_callback: Callable[[GuiEvent], None]):
-        super().__init__(master, gui_callback)
+
+class EditDescription(LabelPreviewGui, ButtonsGuiMixin):
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager'):
+        super().__init__(master, screens)
 
         self.instruction = 'Describe what you want to store here...'
         self.description_label = self.create_label(self.frame, 'Storage label')
@@ -348,31 +524,26 @@ class EditDescription(GuiTemplate, ButtonsGuiMixin):
 
         self.text_box = Text(self.frame, height=5, bg='white', fg='grey', font=self.text_font, takefocus=True)
 
-        self.text_box.insert(END, self.instruction)
-
         self.text_box.pack()
 
         self.character_label_string = StringVar()
-        self.character_label_string.set(f'0 / {MAX_DESCRIPTION_LENGTH}')
 
         self.character_label = Label(self.frame, textvariable=self.character_label_string, anchor='e', bg='white',
                                      fg='grey', font=self.text_font)
         self.character_label.pack(fill=X, pady=5)
 
-        self.text_box.bind('<FocusIn>', self.text_box_callback_focusin)
-        self.text_box.pack()
-        self.error_message_debouncer: str | None = None
+        self.create_preview(self.frame)
 
         self.print_button = self.add_print_button(
             self.frame,
             'Print',
-            lambda: gui_callback(GuiEvent(GuiEvent.ENTERED_DESCRIPTION, self.text_box.get('1.0', 'end-1c'))),
+            lambda: self.gui_callback(GuiEvent(GuiEvent.ENTERED_DESCRIPTION, self.text_box.get('1.0', 'end-1c'))),
         )
 
         self.cancel_button = self.add_print_button(
             self.frame,
             'Cancel',
-            lambda: gui_callback(GuiEvent(GuiEvent.CANCEL))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.CANCEL))
         )
 
         self.buttons = [self.print_button, self.cancel_button]
@@ -381,7 +552,16 @@ class EditDescription(GuiTemplate, ButtonsGuiMixin):
         self.error_message_label.config(fg='red')
         self.error_message_label.pack(fill=X, pady=5)
 
-        self.frame.pack(pady=25)
+    def reset(self) -> None:
+        self.clear_error_message()
+        self.clear_preview()
+        self.text_box.config(fg='grey')
+        self.text_box.delete('1.0', END)
+        self.text_box.insert(END, self.instruction)
+        self.text_box.bind('<FocusIn>', self.text_box_callback_focusin)
+        self.text_box.unbind('<KeyRelease>')
+        self.character_label.config(fg='grey')
+        self.character_label_string.set(f'0 / {MAX_DESCRIPTION_LENGTH}')
 
     def text_box_callback_key(self, event: Any) -> None:
         text_box_content = self.text_box.get('1.0', END)
@@ -395,14 +575,7 @@ class EditDescription(GuiTemplate, ButtonsGuiMixin):
             self.character_label.config(fg='grey')
 
         self.character_label_update()
-
-    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
-        logger.error(f"GUI error: {error_message}")
-        if self.error_message_debouncer is not None:
-            self.frame.after_cancel(self.error_message_debouncer)
-        self.error_message_label.config(text=error_message)
-        self.error_message_debouncer = self.frame.after(5000, lambda: self.error_message_label.config(text=''))
-        return
+        self.request_preview(self.text_box.get('1.0', 'end-1c'))
 
     def character_label_update(self) -> None:
         text_box_content = self.text_box.get('1.0', END)
@@ -416,32 +589,23 @@ class EditDescription(GuiTemplate, ButtonsGuiMixin):
         self.text_box.bind('<KeyRelease>', self.text_box_callback_key)
 
 
-class WaitForTokenGui(GuiTemplate):
+class WaitForTokenGui(InlineErrorGui):
 
-    def __init__(self, master: tkinter.Tk, gui_callback: Callable[[GuiEvent], None]):
-        super().__init__(master, gui_callback)
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager'):
+        super().__init__(master, screens)
 
         self.scan_tag_label = self.create_label(self.frame, 'Waiting for token...')
         self.scan_tag_label.pack(fill=X, pady=5)
 
         self.progress_bar = ttk.Progressbar(self.frame, mode='indeterminate')
 
-        self.error_message_debouncer: str | None = None
         self.error_message_label = self.create_label(self.frame, '')
         self.error_message_label.config(fg='red')
         self.error_message_label.pack(fill=X, pady=5)
 
-        self.frame.pack(pady=25)
-
-    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
-        logger.error(f"GUI error: {error_message}")
-        if self.error_message_debouncer is not None:
-            self.frame.after_cancel(self.error_message_debouncer)
-        self.error_message_label.config(text=error_message)
-        self.error_message_debouncer = self.error_message_label.after(
-            5000,
-            lambda: self.error_message_label.config(text='')
-        )
+    def reset(self) -> None:
+        self.clear_error_message()
+        self.stop_progress_bar()
 
     def reset_gui(self) -> None:
         self.stop_progress_bar()
@@ -455,9 +619,9 @@ class WaitForTokenGui(GuiTemplate):
         self.progress_bar.pack_forget()
 
 
-class DryingLabel(GuiTemplate, ButtonsGuiMixin):
-    def __init__(self, master: tkinter.Tk, member: Member, gui_callback: Callable[[GuiEvent], None]):
-        super().__init__(master, gui_callback)
+class DryingLabel(LabelPreviewGui, ButtonsGuiMixin):
+    def __init__(self, master: tkinter.Tk, screens: 'ScreenManager'):
+        super().__init__(master, screens)
 
         self.drying_label = self.create_label(self.frame, "Estimated drying time (h):")
         self.drying_label.pack(fill=X, pady=5)
@@ -480,34 +644,35 @@ class DryingLabel(GuiTemplate, ButtonsGuiMixin):
                                                  to=ALLOWED_DRYING_TO,
                                                  increment=ALLOWED_DRYING_INCREMENT,
                                                  validate='none',
-                                                 validatecommand=(self.drying_estimation_validator, '%P', '%S'))
+                                                 validatecommand=(self.drying_estimation_validator, '%P', '%S'),
+                                                 command=lambda: self.request_preview(int(self.drying_estimation_spinbox.get())))
         self.drying_estimation_spinbox.pack(fill=X, pady=5)
 
+        self.create_preview(self.frame)
+
         self.print_button = self.add_print_button(
             self.frame,
             'Print',
-            lambda: gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.DryingLabel.from_member(member, int(self.drying_estimation_spinbox.get()))))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, label_data.DryingLabel.from_member(self.get_member(), int(self.drying_estimation_spinbox.get()))))
         )
 
         self.cancel_button = self.add_print_button(
             self.frame,
             'Cancel',
-            lambda: gui_callback(GuiEvent(GuiEvent.CANCEL))
+            lambda: self.gui_callback(GuiEvent(GuiEvent.CANCEL))
         )
 
         self.buttons = [self.print_button, self.cancel_button]
 
-        self.error_message_debouncer: str | None = None
         self.error_message_label = self.create_label(self.frame, '')
         self.error_message_label.config(fg='red')
         self.error_message_label.pack(fill=X, pady=5)
 
-        self.frame.pack(pady=25)
-
-    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
-        logger.error(f"GUI error: {error_message}")
-        if self.error_message_debouncer is not None:
-            self.frame.after_cancel(self.error_message_debouncer)
-        self.error_message_label.config(text=error_message)
-        self.error_message_debouncer = self.frame.after(5000, lambda: self.error_message_label.config(text=''))
-        return
+    def reset(self) -> None:
+        self.clear_error_message()
+        self.drying_estimation_spinbox.config(state=NORMAL)
+        self.drying_estimation_spinbox.delete(0, END)
+        self.drying_estimation_spinbox.insert(0, str(ALLOWED_DRYING_FROM))
+        self.drying_estimation_spinbox.config(state='readonly')
+        self.clear_preview()
+        self.request_preview(ALLOWED_DRYING_FROM)
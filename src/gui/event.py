@@ -23,6 +23,10 @@ class Event(BaseEvent):
     PRINTING_FAILED = 'event_printing_failed'
     PRINTING_SUCCEEDED = 'event_printing_succeeded'
     LOGIN = 'event_login'
+    LOGIN_FINISHED = 'event_login_finished'
+    PRINT_FINISHED = 'event_print_finished'
+    PREVIEW_RENDERED = 'event_preview_rendered'
+    TAG_READ = 'event_tag_read'
 
 
 class GuiEvent(BaseEvent):
@@ -35,6 +39,7 @@ class GuiEvent(BaseEvent):
     LOGIN = 'gui_event_login'
     PRINT_LABEL = 'gui_event_print_label'
     ENTERED_DESCRIPTION = "gui_event_entered_description"
+    PREVIEW_LABEL = "gui_event_preview_label"
 
 @dataclass
 class MemberLoginData:
@@ -0,0 +1,194 @@
+import heapq
+import itertools
+import sys
+import time
+from types import TracebackType
+from typing import Any, Callable
+
+from src.util.logger import get_logger
+from .design import TEMPORARY_STORAGE_LABEL_DEFAULT_TEXT, GuiTemplate, S, ScreenManager, _ignore_gui_event
+from .event import GuiEvent
+
+logger = get_logger()
+
+
+class HeadlessMaster(object):
+    '''
+    Stands in for tkinter.Tk where the states and the application use it: after()
+    callbacks run in order when update() or run_until() is called, on the thread
+    that calls them, like the Tk main loop. Everything about windows does nothing.
+    '''
+
+    def __init__(self) -> None:
+        self._queue: list[tuple[float, int, str]] = []
+        self._callbacks: dict[str, Callable[[], Any]] = {}
+        self._ids = itertools.count()
+        self.callback_errors = 0
+        self.quit_requested = False
+
+    def after(self, ms: int, func: Callable[..., Any], *args: Any) -> str:
+        n = next(self._ids)
+        after_id = f"after#{n}"
+        self._callbacks[after_id] = lambda: func(*args)
+        heapq.heappush(self._queue, (time.monotonic() + ms / 1000, n, after_id))
+        return after_id
+
+    def after_idle(self, func: Callable[..., Any], *args: Any) -> str:
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id: str) -> None:
+        self._callbacks.pop(after_id, None)
+
+    def report_callback_exception(self, exc_type: type[BaseException], exc: BaseException, tb: TracebackType | None) -> None:
+        # Replaced by the application, like on tkinter.Tk
+        logger.error("Exception in a callback", exc_info=(exc_type, exc, tb))
+
+    def update(self) -> None:
+        '''
+        Runs the callbacks that are due
+        '''
+        now = time.monotonic()
+        while self._queue and self._queue[0][0] <= now:
+            _, _, after_id = heapq.heappop(self._queue)
+            callback = self._callbacks.pop(after_id, None)
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception:
+                self.callback_errors += 1
+                self.report_callback_exception(*sys.exc_info())  # type: ignore
+
+    def run_until(self, condition: Callable[[], bool], timeout: float) -> bool:
+        '''
+        Runs callbacks until condition is true. Returns False if it is still false after timeout seconds.
+        '''
+        deadline = time.monotonic() + timeout
+        while True:
+            self.update()
+            if condition():
+                return True
+            now = time.monotonic()
+            if now >= deadline:
+                return False
+            next_due = self._queue[0][0] if self._queue else deadline
+            # Wake up now and then anyway, since the condition can depend on other threads
+            time.sleep(max(0.0, min(next_due, deadline, now + 0.005) - now))
+
+    def due(self) -> bool:
+        '''
+        Whether a callback is waiting to run
+        '''
+        while self._queue and self._queue[0][2] not in self._callbacks:
+            heapq.heappop(self._queue)
+        return bool(self._queue) and self._queue[0][0] <= time.monotonic()
+
+    def pending(self) -> int:
+        return len(self._callbacks)
+
+    def title(self, *args: Any) -> None:
+        pass
+
+    def config(self, **kwargs: Any) -> None:
+        pass
+
+    configure = config
+
+    def attributes(self, *args: Any) -> None:
+        pass
+
+    def bind(self, *args: Any) -> None:
+        pass
+
+    def unbind(self, *args: Any) -> None:
+        pass
+
+    def quit(self) -> None:
+        self.quit_requested = True
+
+    def destroy(self) -> None:
+        self._queue.clear()
+        self._callbacks.clear()
+
+
+class HeadlessScreen(object):
+    '''
+    Mixed in before a screen class, so that the states see a screen of the type
+    they expect, without any widgets. Remembers what the states asked it to show.
+    '''
+
+    def __init__(self, master: Any, screens: ScreenManager) -> None:
+        self.master = master
+        self.gui_callback: Callable[[GuiEvent], None] = _ignore_gui_event
+        self.timer: str | None = None
+        self.member = None
+        self.instruction = TEMPORARY_STORAGE_LABEL_DEFAULT_TEXT
+        self.error_messages: list[str] = []
+        self.previews = 0
+        self.buttons_active = True
+        self.progress_bar = False
+        self.key_reader_connected: bool | None = None
+
+    def show(self, gui_callback: Callable[[GuiEvent], None]) -> None:
+        # No timeout timer. Drivers send GuiEvent.TIMEOUT_TIMER_EXPIRED when they want one.
+        self.gui_callback = gui_callback
+        self.reset()
+
+    def hide(self) -> None:
+        self.gui_callback = _ignore_gui_event
+
+    def set_member(self, member: Any) -> None:
+        self.member = member
+
+    def reset(self) -> None:
+        self.error_messages = []
+        self.buttons_active = True
+        self.progress_bar = False
+
+    def reset_gui(self) -> None:
+        self.progress_bar = False
+
+    def show_error_message(self, error_message: str, error_title: str = 'Error') -> None:
+        logger.info(f"GUI error: {error_message}")
+        self.error_messages.append(error_message)
+
+    def clear_error_message(self) -> None:
+        pass
+
+    def set_key_reader_status(self, connected: bool | None) -> None:
+        self.key_reader_connected = connected
+
+    def start_progress_bar(self) -> None:
+        self.progress_bar = True
+
+    def stop_progress_bar(self) -> None:
+        self.progress_bar = False
+
+    def show_preview(self, image: Any) -> None:
+        if image is not None:
+            self.previews += 1
+
+    def clear_preview(self) -> None:
+        pass
+
+    def activate_buttons(self) -> None:
+        self.buttons_active = True
+
+    def deactivate_buttons(self) -> None:
+        self.buttons_active = False
+
+
+class HeadlessScreenManager(ScreenManager):
+    '''
+    Builds each screen as a HeadlessScreen subclass of the real screen type, so
+    that the isinstance checks of the states still work
+    '''
+
+    def __init__(self, master: Any) -> None:
+        self.master = master
+        self.screens: dict[type[GuiTemplate], GuiTemplate] = {}
+        self.current: GuiTemplate | None = None
+
+    def build(self, screen_type: type[S]) -> S:
+        headless_type = type(f"Headless{screen_type.__name__}", (HeadlessScreen, screen_type), {})
+        return headless_type(self.master, self)  # type: ignore
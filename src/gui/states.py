@@ -1,29 +1,42 @@
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import queue
 import tkinter
-from time import time
-from typing import Callable
+from time import monotonic, time
+from types import TracebackType
+from typing import Any, Callable
 import config
 from src.backend.makeradmin import MakerAdminClient, MakerAdminTokenExpiredError, NetworkError, IncorrectPinCode, UploadedLabel
 from src.test.makeradmin_mock import MakerAdminClient as MockedMakerAdminClient
 from src.backend.member import Member, NoMatchingMemberNumber
+from src.backend.tag_index import TagIndex
 from src.label import creator as label_creator
 from src.label import printer as label_printer
+from src.label.prerender import LabelPrerenderer, render_preview
 from src.label.printer import PrinterNotFoundError
+from src.util.key_reader import KeyReader, KeyReaderMonitor, ReaderState, TagRead
 from src.util.logger import get_logger
-from src.util.slack_client import SlackClient
-from .design import GuiEvent, GuiTemplate, StartGui, MemberInformation, EditDescription, WaitForTokenGui, DryingLabel
+from src.util.slack_aggregator import SlackAggregator
+from src.util import flight_recorder, metrics
+from src.util.tracing import end_session, new_session, set_trace_attributes, traced
+from .design import ButtonsGuiMixin, GuiEvent, GuiTemplate, LabelPreviewGui, ScreenManager, StartGui, MemberInformation, EditDescription, WaitForTokenGui, DryingLabel
 from .event import Event, MemberLoginData
+from .task_runner import TASK_POLL_PERIOD_MS, Task, TaskResult, TaskRunner, TaskTimeout
+from .watchdog import Stall, StallWatchdog
 from src.backend import label_data
 
 
 logger = get_logger()
 
+KEY_READER_POLL_PERIOD_MS = 50
+
 
 class State(object):
 
     def __init__(self, application: 'Application', master: tkinter.Tk, member: Member | None = None):
         logger.info(f'Processing current state: {self}')
+        flight_recorder.record("state", type(self).__name__, member.member_number if member is not None else None)
         self.application = application
         self.master = master
         self.master.title('memberbooth')
@@ -31,11 +44,11 @@ class State(object):
         self.gui: GuiTemplate | None = None
 
     def change_state(self) -> None:
-        if self.gui:
-            self.gui.timeout_timer_cancel()
+        # The next state has already replaced the screen
         self.gui = None
 
     def gui_callback(self, gui_event: GuiEvent) -> None:
+        flight_recorder.record("gui", gui_event.event)
         # Fix to not let the timer expired event fill the logs in production when it is not relevant..
         if (not config.development and type(self) in [WaitingForTokenState, WaitingState] and gui_event.event == GuiEvent.TIMEOUT_TIMER_EXPIRED):
             return
@@ -44,56 +57,91 @@ class State(object):
 
     def on_event(self, event: Event) -> 'State | None':
         logger.info(event)
+        flight_recorder.record("event", event.event, type(self).__name__)
+        if event.event == Event.PRINT_FINISHED:
+            self.finish_print(event.data)  # type: ignore
+        elif event.event == Event.PREVIEW_RENDERED:
+            self.show_preview(event.data)  # type: ignore
         return None
 
-    def gui_print(self, label: label_creator.Label) -> None:
-
+    def show_preview(self, result: TaskResult) -> None:
+        if not isinstance(self.gui, LabelPreviewGui):
+            return
+        try:
+            self.gui.show_preview(result.get())
+        except Exception:
+            logger.exception("Could not render label preview")
+            self.gui.show_preview(None)
+
+    @traced("gui.finish_print")
+    def finish_print(self, result: TaskResult) -> None:
+        '''
+        Reports the outcome of a print task started by print_label_handler
+        '''
         event = Event(Event.PRINTING_FAILED)
         assert self.gui is not None
-        assert self.member is not None
-
-        if config.no_printer:
-            file_name = f'{self.member.member_number}_{str(int(time()))}.png'
-            logger.info(f'Program run with --no-printer, storing image to {file_name} instead of printing it.')
-            label.save(file_name)
-            label.show()
-            event = Event(Event.PRINTING_SUCCEEDED)
-            self.application.on_event(event)
-            return
 
         try:
-
-            print_status = label_printer.print_label(label.label)
-
-            logger.info(f'Printer status: {print_status}')
-
-            if print_status['did_print']:
+            printed: PrintedLabel = result.get()
+            self.application.unverified_tag = None
+            self.application.last_printed_label = printed.uploaded_label
+
+            if printed.print_status is None:
+                logger.info(f'Program run with --no-printer, stored image to {printed.file_name} instead of printing it.')
+                printed.label.show()
+                metrics.PRINTS.inc(label_type=printed.label_type)
+                event = Event(Event.PRINTING_SUCCEEDED)
+            elif printed.print_status['did_print']:
                 logger.info('Printed label successfully')
-                self.application.slack_client.post_message_info(
-                    "success!")
+                self.application.slack_client.post_label_printed(printed.label_type)
+                metrics.PRINTS.inc(label_type=printed.label_type)
                 event = Event(Event.PRINTING_SUCCEEDED)
             else:
-                errors = print_status['printer_state']['errors']
+                metrics.PRINT_ERRORS.inc(reason="printer_error")
+                errors = printed.print_status['printer_state']['errors']
                 error_string = ', '.join(errors)
                 self.application.slack_client.post_message_error(
                     f"printer reported back the following error: {error_string}")
                 self.gui.show_error_message(f'Printer reported back the following error: {error_string}', error_title='Printer error!')
 
+        except TagVerificationError as e:
+            logger.warning(str(e))
+            metrics.PRINT_ERRORS.inc(reason="tag_not_verified")
+            event = Event(Event.LOG_OUT)
+
         except PrinterNotFoundError:
+            metrics.PRINT_ERRORS.inc(reason="printer_not_found")
             self.gui.show_error_message(
                 'Printer not found, ensure that printer is connected and turned on. Also ensure that the \"Editor Lite\" function is disabled.',
                 error_title='Printer error!')
             self.application.slack_client.post_message_error(
                 "printer not found")
 
+        except NetworkError:
+            metrics.PRINT_ERRORS.inc(reason="network_error")
+            self.gui.show_error_message("Network error, please try again")
+
+        except TaskTimeout:
+            metrics.PRINT_ERRORS.inc(reason="timeout")
+            self.application.slack_client.post_message_error("printing a label timed out")
+            self.gui.show_error_message('Printing took too long, please try again', error_title='Printer error!')
+
         except Exception as e:
+            metrics.PRINT_ERRORS.inc(reason="unexpected")
             logger.exception('This error should not occur')
             self.application.slack_client.post_message_error(
                 f"This printer error should not occur: {e}")
             self.gui.show_error_message('Unknown printer error occured!', error_title='Printer error!')
 
         finally:
+            self.application.notbusy()
+            gui = self.gui
+            if isinstance(gui, ButtonsGuiMixin):
+                gui.stop_progress_bar()
+                self.master.after(100, gui.activate_buttons)
             self.application.on_event(event)
+            if event.event == Event.LOG_OUT and self.application.state.gui is not None:
+                self.application.state.gui.show_error_message("Your tag could not be verified. Please log in with your member number and PIN code.")
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -102,40 +150,160 @@ class State(object):
         return self.__class__.__name__
 
 
-def print_label_handler(state: State, event: label_data.LabelType) -> None:
-    state.gui.deactivate_buttons() # type: ignore
-    state.application.busy()
+class TagVerificationError(Exception):
+    pass
 
-    try:
-        # If the user is printing an identical label again, don't upload it again. Just print multiple copies of the same label.
-        # This avoid cluttering the backend with identical labels. And the member will not receive multiple identical nags when the labels are expiring.
-        if state.application.last_printed_label is not None and state.application.last_printed_label.label.approximately_equal(event):
-            uploaded_label = deepcopy(state.application.last_printed_label)
-        else:
-            uploaded_label = state.application.makeradmin_client.post_label(event)
 
-        label_image = label_creator.create_label(uploaded_label)
+class UnknownTagError(LookupError):
+    pass
+
+
+@dataclass
+class PrintedLabel:
+    uploaded_label: UploadedLabel
+    label: label_creator.Label
+    label_type: str
+    print_status: dict[str, Any] | None  # None if the label was saved to a file instead of printed
+    file_name: str | None = None
+
+
+def verify_tag_login(application: 'Application', member: Member) -> None:
+    '''
+    A member that logged in with a tag found in the local index has not been
+    checked with the backend yet. Do that before printing anything for them.
+    '''
+    tag_id = application.unverified_tag
+    if tag_id is None:
+        return
+
+    tag_member = application.tag_index.verify(tag_id)
+    if tag_member is None or tag_member.member_number != member.member_number:
+        raise TagVerificationError(f"Tag no longer belongs to member #{member.member_number}")
+
+
+@traced("print")
+def upload_and_print(application: 'Application', member: Member, label: label_data.LabelType, task: Task) -> PrintedLabel:
+    '''
+    Runs on a worker thread, so it must not touch the GUI
+    '''
+    set_trace_attributes(label_type=type(label).__name__)
+    verify_tag_login(application, member)
+    task.check()
+
+    # If the user is printing an identical label again, don't upload it again. Just print multiple copies of the same label.
+    # This avoid cluttering the backend with identical labels. And the member will not receive multiple identical nags when the labels are expiring.
+    last_printed_label = application.last_printed_label
+    if last_printed_label is not None and last_printed_label.label.approximately_equal(label):
+        uploaded_label = deepcopy(last_printed_label)
+    else:
+        uploaded_label = application.makeradmin_client.post_label(label)
+    task.check()
+
+    label_image = application.prerenderer.create_label(uploaded_label)
+    task.check()
+
+    label_type = type(uploaded_label.label).__name__
+    logger.info(f"#{uploaded_label.label.base.member_number} - {uploaded_label.label.base.member_name} tried to print a {label_type} label.")
+
+    if config.no_printer:
+        file_name = f'{member.member_number}_{str(int(time()))}.png'
+        label_image.save(file_name)
+        return PrintedLabel(uploaded_label, label_image, label_type, None, file_name)
+
+    print_status = label_printer.print_label(label_image.label)
+    logger.info(f'Printer status: {print_status}')
+    return PrintedLabel(uploaded_label, label_image, label_type, print_status)
 
-        print(uploaded_label)
-        state.application.slack_client.post_message_info(
-            f"*#{uploaded_label.label.base.member_number} - {uploaded_label.label.base.member_name}* tried to print a {type(uploaded_label.label).__name__} label.")
 
-        state.gui_print(label_image)
+def preview_label_handler(state: State, label: label_data.LabelType) -> None:
+    # Only the latest preview is interesting
+    state.application.tasks.submit("preview", lambda task: render_preview(label), Event.PREVIEW_RENDERED, timeout=config.print_timeout,
+                                   replace=True)
 
-        state.application.last_printed_label = uploaded_label
-    finally:
-        state.application.notbusy()
 
-        def activate_buttons():
-            if state.gui:
-                state.gui.activate_buttons() # type: ignore
-        state.master.after(100, activate_buttons)
+def print_label_handler(state: State, label: label_data.LabelType) -> None:
+    assert state.member is not None
+    application = state.application
+    member = state.member
+    task = application.tasks.submit("print", lambda task: upload_and_print(application, member, label, task),
+                                    Event.PRINT_FINISHED, timeout=config.print_timeout)
+    if task is None:
+        return
+    state.gui.deactivate_buttons() # type: ignore
+    state.gui.start_progress_bar()  # type: ignore
+    application.busy()
 
 class WaitingState(State):
     def __init__(self, application: 'Application', master: tkinter.Tk, member: Member | None = None):
         super().__init__(application, master, member)
 
-        self.gui: StartGui = StartGui(self.master, self.gui_callback)
+        self.gui: StartGui = self.application.screens.show(StartGui, self.gui_callback)
+        self.login_method = "pin"
+        self.gui.set_key_reader_status(self.application.key_reader_connected)
+        self.application.unverified_tag = None
+        # Nothing that was started for the previous member should finish after they logged out
+        self.application.tasks.cancel_all()
+        self.application.prerenderer.cancel()
+        end_session()
+        self.application.notbusy()
+
+    def reset_with_error_message(self, msg: str) -> None:
+        self.gui.reset_gui()
+        self.gui.show_error_message(msg)
+
+    def submit_login(self, method: str, login: Callable[[Task], Member]) -> None:
+        new_session()
+        self.login_method = method
+        task = self.application.tasks.submit("login", login, Event.LOGIN_FINISHED, timeout=config.login_timeout)
+        if task is not None:
+            self.gui.start_progress_bar()
+
+    @traced("login.pin")
+    def login_with_pin(self, member_number: int, pin_code: str, task: Task) -> Member:
+        member = Member.from_member_number_and_pin(self.application.makeradmin_client, member_number, pin_code)
+        assert member is not None
+        self.application.tag_index.add_member(member)
+        return member
+
+    @traced("login.tag")
+    def login_with_tag(self, tag_id: str, task: Task) -> Member:
+        member = self.application.tag_index.verify(tag_id)
+        if member is None:
+            raise UnknownTagError(tag_id)
+        return member
+
+    def finish_login(self, result: TaskResult) -> State | None:
+        method = self.login_method
+        try:
+            member: Member = result.get()
+        except NoMatchingMemberNumber:
+            metrics.LOGINS.inc(method=method, outcome="incorrect")
+            self.reset_with_error_message("Login incorrect")
+        except IncorrectPinCode:
+            metrics.LOGINS.inc(method=method, outcome="incorrect")
+            self.reset_with_error_message("Login incorrect")
+        except UnknownTagError:
+            metrics.LOGINS.inc(method=method, outcome="unknown_tag")
+            self.reset_with_error_message("Unknown tag. Log in with your member number and PIN code.")
+        except MakerAdminTokenExpiredError:
+            metrics.LOGINS.inc(method=method, outcome="token_expired")
+            return WaitingForTokenState(self.application, self.master, self.member)
+        except NetworkError:
+            metrics.LOGINS.inc(method=method, outcome="network_error")
+            self.reset_with_error_message("Network error, please try again")
+        except TaskTimeout:
+            metrics.LOGINS.inc(method=method, outcome="timeout")
+            self.reset_with_error_message("Network error, please try again")
+        except Exception as e:
+            metrics.LOGINS.inc(method=method, outcome="unexpected")
+            logger.exception("Unexpected exception")
+            self.application.slack_client.post_message_error(f"Unexpected exception when logging in: {e}")
+            self.reset_with_error_message(f"Error... \n{e}")
+        else:
+            metrics.LOGINS.inc(method=method, outcome="ok")
+            logger.info(f"Logged in as member #{member.member_number}")
+            return MemberIdentified(self.application, self.master, member)
+        return None
 
     def gui_callback(self, gui_event: GuiEvent) -> None:
         super().gui_callback(gui_event)
@@ -152,40 +320,34 @@ class WaitingState(State):
         super().on_event(event)
 
         event_type = event.event
-        if event_type == Event.LOGIN:
-            self.gui.start_progress_bar()
-            self.master.update()
-
-            def reset_with_error_message(msg: str):
-                self.gui.reset_gui()
-                self.gui.show_error_message(msg)
+        if event_type == Event.TAG_READ:
+            tag: TagRead = event.data
+            tag_id = tag.aptus_tag_id
+            member = self.application.tag_index.lookup(tag_id)
+            if member is not None:
+                logger.info(f"Tag login as member #{member.member_number} from the local index")
+                new_session()
+                metrics.LOGINS.inc(method="tag_index", outcome="ok")
+                self.application.unverified_tag = tag_id
+                return MemberIdentified(self.application, self.master, member)
+            self.submit_login("tag", lambda task: self.login_with_tag(tag_id, task))
 
+        elif event_type == Event.LOGIN:
             try:
                 login_data: MemberLoginData = event.data
             except AttributeError:
                 logger.exception("Programming error: Missing 'data' for the event")
-                return reset_with_error_message("Programming error: Missing 'data' for the event")
+                return self.reset_with_error_message("Programming error: Missing 'data' for the event")
 
             if not login_data.member_number.isnumeric():
-                return reset_with_error_message("The member number should be a number")
+                return self.reset_with_error_message("The member number should be a number")
 
-            try:
-                member = Member.from_member_number_and_pin(self.application.makeradmin_client, int(login_data.member_number), login_data.pin_code)
-                assert member is not None
-                logger.debug(f"Login requested with member_numer = {login_data.member_number}")
-                return MemberIdentified(self.application, self.master, member)
-            except NoMatchingMemberNumber:
-                return reset_with_error_message("Login incorrect")
-            except IncorrectPinCode:
-                return reset_with_error_message("Login incorrect")
-            except MakerAdminTokenExpiredError:
-                return WaitingForTokenState(self.application, self.master, self.member)
-            except NetworkError:
-                return reset_with_error_message("Network error, please try again")
-            except Exception as e:
-                logger.exception("Unexpected exception")
-                self.application.slack_client.post_message_error(f"Unexpected exception when logging in: {e}")
-                return reset_with_error_message(f"Error... \n{e}")
+            logger.debug(f"Login requested with member_numer = {login_data.member_number}")
+            self.submit_login("pin", lambda task: self.login_with_pin(int(login_data.member_number), login_data.pin_code, task))
+
+        elif event_type == Event.LOGIN_FINISHED:
+            return self.finish_login(event.data)
+        return None
 
 
 class EditTemporaryStorageLabel(State):
@@ -194,7 +356,7 @@ class EditTemporaryStorageLabel(State):
         assert self.member is not None
 
         self.create_label = create_label
-        self.gui: EditDescription = EditDescription(self.master, self.gui_callback)
+        self.gui: EditDescription = self.application.screens.show(EditDescription, self.gui_callback)
 
     def gui_callback(self, gui_event: GuiEvent) -> None:
         super().gui_callback(gui_event)
@@ -219,6 +381,13 @@ class EditTemporaryStorageLabel(State):
             label = self.create_label(description)
             print_label_handler(self, label)
 
+        elif event == GuiEvent.PREVIEW_LABEL:
+            assert isinstance(data, str)
+            if len(data.strip()) == 0:
+                self.gui.show_preview(None)
+                return
+            preview_label_handler(self, self.create_label(data))
+
     def on_event(self, event: Event) -> State | None:
         super().on_event(event)
 
@@ -235,7 +404,7 @@ class EditDryingLabel(State):
     def __init__(self, application: 'Application', master: tkinter.Tk, member: Member):
         super().__init__(application, master, member)
         assert self.member is not None
-        self.gui: DryingLabel = DryingLabel(self.master, self.member, self.gui_callback)
+        self.gui: DryingLabel = self.application.screens.show(DryingLabel, self.gui_callback, self.member)
 
     def gui_callback(self, gui_event: GuiEvent) -> None:
         super().gui_callback(gui_event)
@@ -253,6 +422,11 @@ class EditDryingLabel(State):
             assert isinstance(data, label_data.DryingLabel)
             print_label_handler(self, data)
 
+        elif event == GuiEvent.PREVIEW_LABEL:
+            assert isinstance(data, int)
+            assert self.member is not None
+            preview_label_handler(self, label_data.DryingLabel.from_member(self.member, data))
+
     def on_event(self, event):
         super().on_event(event)
 
@@ -269,7 +443,8 @@ class MemberIdentified(State):
         super().__init__(application, master, member)
         assert self.member is not None
 
-        self.gui: MemberInformation = MemberInformation(self.master, self.gui_callback, self.member)
+        self.gui: MemberInformation = self.application.screens.show(MemberInformation, self.gui_callback, self.member)
+        self.application.prerenderer.start(self.member)
 
         # TODO Implement this
         # self.member_information = member_information
@@ -322,7 +497,7 @@ class MemberIdentified(State):
 class WaitingForTokenState(State):
     def __init__(self, application: 'Application', master: tkinter.Tk, member: Member | None = None):
         super().__init__(application, master, member)
-        self.gui: WaitForTokenGui = WaitForTokenGui(self.master, self.gui_callback)
+        self.gui: WaitForTokenGui = self.application.screens.show(WaitForTokenGui, self.gui_callback)
         self.token_reader_timer: str | None = None
         self.token_reader_timer_start()
 
@@ -358,15 +533,33 @@ class WaitingForTokenState(State):
 
 
 class Application(object):
-    def __init__(self, makeradmin_client: MakerAdminClient | MockedMakerAdminClient, slack_client: SlackClient):
+    def __init__(self, makeradmin_client: MakerAdminClient | MockedMakerAdminClient, slack_client: SlackAggregator, key_reader_monitor: KeyReaderMonitor | None = None,
+                 master: tkinter.Tk | None = None, screens: ScreenManager | None = None, task_poll_period_ms: int = TASK_POLL_PERIOD_MS):
+        '''
+        master and screens replace the Tk window and its screens, e.g. with the
+        stand-ins in headless.py that run the states without a display.
+        task_poll_period_ms is how often finished tasks are looked for.
+        '''
         self.makeradmin_client = makeradmin_client
         self.slack_client = slack_client
+        self.key_reader_monitor = key_reader_monitor
+        self.tag_queue: queue.Queue[TagRead] = key_reader_monitor.tag_queue if key_reader_monitor is not None else queue.Queue()
+        self.key_reader_state_queue: queue.Queue[tuple[ReaderState, KeyReader | None]] = queue.Queue()
+        self.tag_index = TagIndex(makeradmin_client)
+        self.unverified_tag: str | None = None
+
+        if master is None:
+            master = tkinter.Tk()
+            master.attributes('-fullscreen', not config.development)
+            master.configure(background='white')
+        master.report_callback_exception = self.report_callback_exception  # type: ignore
 
-        tk = tkinter.Tk()
-        tk.attributes('-fullscreen', not config.development)
-        tk.configure(background='white')
-
-        self.master = tk
+        self.master = master
+        self.screens = screens or ScreenManager(self.master)
+        self.tasks = TaskRunner(self.on_event, self.master.after, poll_period_ms=task_poll_period_ms)
+        self.prerenderer = LabelPrerenderer()
+        self.watchdog = StallWatchdog(self.master.after, self.on_stall, lambda: str(self.state))
+        self.last_stall_alert = float("-inf")
         self.state: State = WaitingForTokenState(self, self.master)
         self.last_printed_label: UploadedLabel | None = None
 
@@ -377,6 +570,54 @@ class Application(object):
             self.master.bind('<A>', lambda e: self.on_event(Event(Event.LOGIN, MemberLoginData("1000", "0000"))))
         self.master.bind('<Alt-q>', lambda e: self.force_stop_application())
 
+        if self.key_reader_monitor is not None:
+            self.tag_index.start()
+            self.key_reader_monitor.start(lambda state, key_reader: self.key_reader_state_queue.put((state, key_reader)))
+            self.master.after(KEY_READER_POLL_PERIOD_MS, self.poll_tag_queue)
+
+    @property
+    def key_reader_connected(self) -> bool | None:
+        if self.key_reader_monitor is None:
+            return None
+        return self.key_reader_monitor.state == ReaderState.CONNECTED
+
+    def poll_tag_queue(self) -> None:
+        # The key reader threads must not touch Tk, so tags and state changes are handed over through queues
+        try:
+            while True:
+                state, key_reader = self.key_reader_state_queue.get_nowait()
+                self.on_key_reader_state_change(state, key_reader)
+        except queue.Empty:
+            pass
+        try:
+            while True:
+                tag = self.tag_queue.get_nowait()
+                self.on_event(Event(Event.TAG_READ, tag))
+        except queue.Empty:
+            pass
+        self.master.after(KEY_READER_POLL_PERIOD_MS, self.poll_tag_queue)
+
+    def on_key_reader_state_change(self, state: ReaderState, key_reader: KeyReader | None) -> None:
+        if state == ReaderState.CONNECTED:
+            self.slack_client.post_message_info(f"Key reader is connected again: {key_reader}")
+        else:
+            self.slack_client.post_message_alert("Key reader was disconnected. Members have to log in with their PIN code.")
+        if isinstance(self.state, WaitingState):
+            self.state.gui.set_key_reader_status(state == ReaderState.CONNECTED)
+
+    def report_callback_exception(self, exc_type: type[BaseException], exc: BaseException, tb: TracebackType | None) -> None:
+        # Tk would only print exceptions in callbacks to stderr. Logging them also dumps the flight recorder.
+        logger.error("Exception in a Tk callback", exc_info=(exc_type, exc, tb))
+
+    def on_stall(self, stall: Stall) -> None:
+        metrics.GUI_STALL_SECONDS.observe(stall.duration)
+        logger.warning(f"The GUI was blocked for {stall.duration:.1f} s in {stall.context}. The Tk thread was at:\n{stall.stack}")
+        now = monotonic()
+        if now - self.last_stall_alert >= config.stall_alert_interval:
+            self.last_stall_alert = now
+            self.slack_client.post_message_error(
+                f"The GUI was blocked for {stall.duration:.1f} s in {stall.context}, at {stall.location}")
+
     def force_stop_application(self) -> None:
         logger.warning("User is force-stopping application")
         self.slack_client.post_message_alert("User is force-stopping the application")
@@ -397,4 +638,8 @@ class Application(object):
 
     def run(self) -> None:
         self.slack_client.post_message_alert("Application was started!")
-        self.master.mainloop()
+        self.watchdog.start()
+        try:
+            self.master.mainloop()
+        finally:
+            self.watchdog.stop()
@@ -0,0 +1,177 @@
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from src.util.logger import get_logger
+from .event import Event
+
+logger = get_logger()
+
+TASK_POLL_PERIOD_MS = 50
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskTimeout(TimeoutError):
+    pass
+
+
+@dataclass
+class TaskResult:
+    name: str
+    value: Any = None
+    error: BaseException | None = None
+
+    def get(self) -> Any:
+        '''
+        Returns the value of the task, or raises the exception it failed with
+        '''
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Task(object):
+    def __init__(self, name: str, timeout: float | None) -> None:
+        self.name = name
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def timed_out(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        '''
+        Called by the task between steps, so that a cancelled or timed out task
+        stops as soon as possible. Work that has started can not be interrupted.
+        '''
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+        if self.timed_out:
+            raise TaskTimeout(self.name)
+
+
+class TaskRunner(object):
+    '''
+    Runs slow work (network requests, rendering and printing) on worker threads,
+    so that the Tk main loop keeps drawing and handling input meanwhile.
+    When a task is done, its done_event is posted to on_event on the Tk thread,
+    with a TaskResult as data. Only one task with a given name can run at a time.
+    Cancelled tasks post nothing. Tasks that time out post a TaskTimeout error
+    right away, and whatever they return later is thrown away. Cancelled and
+    timed out tasks keep their name until the worker returns, so that e.g. a
+    print that is still in the printer driver is not started a second time.
+    '''
+
+    def __init__(self, on_event: Callable[[Event], Any], schedule: Callable[[int, Callable[[], None]], Any],
+                 workers: int = 2, poll_period_ms: int = TASK_POLL_PERIOD_MS) -> None:
+        self.on_event = on_event
+        self.schedule = schedule
+        self.poll_period_ms = poll_period_ms
+        self.running: dict[str, tuple[Task, str]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gui-task")
+        self._finished: queue.Queue[tuple[Task, TaskResult]] = queue.Queue()
+        self._polling = False
+
+    def submit(self, name: str, fn: Callable[[Task], Any], done_event: str, timeout: float | None = None,
+               replace: bool = False) -> Task | None:
+        '''
+        Runs fn(task) on a worker thread. Returns None, and does nothing, if a task
+        with the same name is already running, e.g. when a button is tapped twice.
+        With replace, the running task is cancelled instead and the new one runs
+        alongside it. Only for work that is safe to run twice at once, like previews.
+        '''
+        if replace and name in self.running:
+            logger.info(f"Replacing task {name}")
+            self.running[name][0].cancel()
+        elif name in self.running:
+            logger.info(f"Task {name} is already running. Ignoring the new one.")
+            return None
+
+        task = Task(name, timeout)
+        self.running[name] = (task, done_event)
+        # Run in a copy of the caller's context, so that spans are traced in the right session
+        self._executor.submit(contextvars.copy_context().run, self._run, task, fn)
+        if not self._polling:
+            self._polling = True
+            self.schedule(self.poll_period_ms, self.poll)
+        return task
+
+    def _run(self, task: Task, fn: Callable[[Task], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            task.check()
+            result = TaskResult(task.name, value=fn(task))
+        except BaseException as e:
+            result = TaskResult(task.name, error=e)
+        logger.debug(f"Task {task.name} finished in {time.perf_counter() - start:.2f} s")
+        self._finished.put((task, result))
+
+    def is_running(self, name: str) -> bool:
+        return name in self.running
+
+    def cancel(self, name: str) -> None:
+        '''
+        The task posts nothing, but its name stays taken until the worker returns
+        '''
+        entry = self.running.get(name)
+        if entry is None or entry[0].cancelled:
+            return
+        logger.info(f"Cancelling task {name}")
+        entry[0].cancel()
+
+    def cancel_all(self) -> None:
+        for name in list(self.running):
+            self.cancel(name)
+
+    def poll(self) -> None:
+        '''
+        Posts the events of finished and timed out tasks. Must run on the Tk thread.
+        '''
+        events = []
+        try:
+            while True:
+                task, result = self._finished.get_nowait()
+                entry = self.running.get(task.name)
+                if entry is None or entry[0] is not task:
+                    # Replaced by a newer task with the same name
+                    continue
+                del self.running[task.name]
+                if task.cancelled:
+                    # Cancelled, or timed out and already reported
+                    continue
+                events.append(Event(entry[1], result))
+        except queue.Empty:
+            pass
+
+        for name, (task, done_event) in list(self.running.items()):
+            if task.timed_out and not task.cancelled:
+                logger.warning(f"Task {name} timed out")
+                task.cancel()
+                events.append(Event(done_event, TaskResult(name, error=TaskTimeout(name))))
+
+        for event in events:
+            self.on_event(event)
+
+        if self.running:
+            self.schedule(self.poll_period_ms, self.poll)
+        else:
+            self._polling = False
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,99 @@
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import config
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+HEARTBEAT_PERIOD_MS = 100
+
+
+@dataclass
+class Stall:
+    duration: float  # Seconds the heartbeat was late
+    stack: str  # Stack of the Tk thread while it was stalled
+    context: str  # E.g. the state of the application when the stall was noticed
+
+    @property
+    def location(self) -> str:
+        '''
+        The innermost frame of the stack, which is usually the call that blocked
+        '''
+        lines = [line for line in self.stack.splitlines() if line.strip().startswith("File ")]
+        return lines[-1].strip() if lines else "unknown location"
+
+
+class StallWatchdog(object):
+    '''
+    Finds out when the Tk main loop is blocked, e.g. by a network call on the Tk
+    thread. A heartbeat is scheduled with schedule (master.after) every heartbeat
+    period. A separate thread checks how late it is, and takes the stack of the Tk
+    thread when it is more than threshold seconds late. When the heartbeat comes
+    through again, on_stall is called on the Tk thread with the duration and stack.
+    '''
+
+    def __init__(self, schedule: Callable[[int, Callable[[], None]], Any], on_stall: Callable[[Stall], None],
+                 context: Callable[[], str] = lambda: "", threshold: float = config.stall_threshold,
+                 heartbeat_period_ms: int = HEARTBEAT_PERIOD_MS) -> None:
+        self.schedule = schedule
+        self.on_stall = on_stall
+        self.context = context
+        self.threshold = threshold
+        self.heartbeat_period_ms = heartbeat_period_ms
+        self._expected = time.monotonic()
+        self._sample: Stall | None = None
+        self._tk_thread_id: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        '''
+        Must be called on the Tk thread
+        '''
+        self._tk_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._schedule_heartbeat()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _schedule_heartbeat(self) -> None:
+        self._expected = time.monotonic() + self.heartbeat_period_ms / 1000
+        self.schedule(self.heartbeat_period_ms, self._heartbeat)
+
+    def _heartbeat(self) -> None:
+        late = time.monotonic() - self._expected
+        sample, self._sample = self._sample, None
+        if not self._stop.is_set():
+            self._schedule_heartbeat()
+        if late > self.threshold:
+            if sample is None:
+                # Too short for the watchdog thread to notice
+                sample = Stall(late, "", self.context())
+            sample.duration = late
+            self.on_stall(sample)
+
+    def tk_thread_stack(self) -> str:
+        frame = sys._current_frames().get(self._tk_thread_id) if self._tk_thread_id is not None else None
+        return "".join(traceback.format_stack(frame)) if frame is not None else ""
+
+    def _run(self) -> None:
+        check_period = min(self.threshold / 2, self.heartbeat_period_ms / 1000)
+        while not self._stop.wait(check_period):
+            late = time.monotonic() - self._expected
+            if late > self.threshold and self._sample is None:
+                sample = Stall(late, self.tk_thread_stack(), self.context())
+                self._sample = sample
+                # Logged right away as well, in case the main loop never recovers
+                logger.warning(f"The GUI has not responded for {late:.1f} s in {sample.context}. "
+                               f"The Tk thread is at:\n{sample.stack}")
@@ -0,0 +1,121 @@
+import csv
+import json
+import threading
+from typing import Any, Iterator, TextIO
+
+from src.label.pipeline import LABEL_TYPES, LabelJob
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+INPUT_FORMATS = ["csv", "jsonl"]
+DESCRIPTION_REQUIRED = ["temp", "rotating"]
+
+
+class BadRowError(ValueError):
+    pass
+
+
+class RejectWriter(object):
+    '''
+    Writes rows that could not be printed as JSON lines, together with the reason,
+    so that they can be fixed and fed to print_label.py again.
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.count = 0
+        self._file: TextIO | None = None
+        self._lock = threading.Lock()
+
+    def reject(self, line: int | None, row: Any, error: str) -> None:
+        logger.warning(f"Rejected row on line {line}: {error}")
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self.count += 1
+            self._file.write(json.dumps(dict(line=line, row=row, error=error), default=str) + "\n")
+            self._file.flush()
+
+    def reject_job(self, job: LabelJob, error: Exception) -> None:
+        row = dict(member_number=job.member_number, type=job.label_type, description=job.description, copies=job.copies)
+        self.reject(job.line, row, str(error))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def guess_input_format(path: str) -> str:
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path}. Use --input-format.")
+
+
+def _read_csv(stream: TextIO) -> Iterator[tuple[int, Any]]:
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _read_jsonl(stream: TextIO) -> Iterator[tuple[int, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, BadRowError(f"Invalid JSON: {e}")
+
+
+def row_to_job(index: int, line: int | None, row: Any, default_type: str, default_description: str | None, allow_warning_labels: bool) -> LabelJob:
+    if not isinstance(row, dict):
+        raise BadRowError("Row is not an object")
+
+    try:
+        member_number = int(str(row.get("member_number", "")).strip())
+    except ValueError:
+        raise BadRowError(f"Invalid member number: {row.get('member_number')!r}")
+
+    label_type = str(row.get("type") or default_type).strip()
+    if label_type not in LABEL_TYPES:
+        raise BadRowError(f"Unknown label type: {label_type!r}")
+    if label_type == "warning" and not allow_warning_labels:
+        raise BadRowError("Warning labels need the yellow paper roll. Rerun with --warning-paper-loaded.")
+
+    description = row.get("description") or default_description
+    if description is not None:
+        description = str(description)
+    if label_type in DESCRIPTION_REQUIRED and not description:
+        raise BadRowError(f"Label type {label_type!r} requires a description")
+
+    copies_value = row.get("copies")
+    try:
+        copies = int(copies_value) if copies_value not in (None, "") else 1
+    except (TypeError, ValueError):
+        raise BadRowError(f"Invalid number of copies: {copies_value!r}")
+    if copies < 1:
+        raise BadRowError(f"Invalid number of copies: {copies}")
+
+    return LabelJob(index, member_number, label_type, description, copies, line=line)
+
+
+def read_label_jobs(stream: TextIO, input_format: str, rejects: RejectWriter, default_type: str = "name",
+                    default_description: str | None = None, allow_warning_labels: bool = False) -> Iterator[LabelJob]:
+    '''
+    Lazily turns rows with the columns member_number, type, description and copies
+    into label jobs. Missing type and description columns fall back to the defaults.
+    Rows that cannot be parsed are written to the reject file and skipped.
+    '''
+    rows = _read_csv(stream) if input_format == "csv" else _read_jsonl(stream)
+    for index, (line, row) in enumerate(rows):
+        try:
+            if isinstance(row, BadRowError):
+                raise row
+            yield row_to_job(index, line, row, default_type, default_description, allow_warning_labels)
+        except BadRowError as e:
+            rejects.reject(line, row if not isinstance(row, BadRowError) else None, str(e))
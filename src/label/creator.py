@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Sequence
 import qrcode
 from datetime import datetime, timedelta
@@ -6,6 +8,7 @@ from time import time
 from src.backend import label_data
 from src.backend.makeradmin import UploadedLabel
 from src.util.logger import get_logger
+from src.util import metrics
 import math
 import os
 from PIL import Image, ImageDraw, ImageFont
@@ -37,6 +40,26 @@ FIRE_BOX_STORAGE_LENGTH = int(os.environ.get("MEMBERBOOTH_FIRE_BOX_STORAGE_LENGT
 CANVAS_WIDTH = 569
 MULTILINE_STRING_LIMIT = 40
 
+@lru_cache(maxsize=512)
+def get_font(font_path: str, size: int) -> ImageFont.FreeTypeFont:
+    # Fitting text tries many font sizes, and loading a font from disk is slow.
+    # Fonts are never modified, so they can be shared between labels.
+    return ImageFont.truetype(font_path, size)
+
+
+@lru_cache(maxsize=16)
+def load_image(path: str) -> Image.Image:
+    # Shared between labels. Copy the image before drawing on it.
+    image = Image.open(path)
+    image.load()
+    return image
+
+
+def preload_assets() -> None:
+    for path in [config.SMS_LOGOTYPE_PATH, config.FLAMMABLE_ICON_PATH, config.ROTATING_ICON_PATH]:
+        load_image(path)
+
+
 class LabelObject(object):
     def __init__(self) -> None:
         self.width: float = 0
@@ -53,6 +76,64 @@ def size_from_bbox(bbox: tuple[float, float, float, float]) -> tuple[float, floa
 def offset_from_bbox(bbox: tuple[float, float, float, float]) -> tuple[float, float]:
     return bbox[0], bbox[1]
 
+@dataclass(frozen=True)
+class FittedText:
+    text: str
+    font_size: int
+    width: float
+    height: float
+
+
+@lru_cache(maxsize=1024)
+def fit_text(text: str, font_path: str, multiline: bool, label_width: float, replace_whitespace: bool, max_font_size: int | None) -> FittedText:
+    # Finding the font size that fills the label is the slow part of creating a label.
+    # The same strings (member names and numbers, headers) are fitted over and over again.
+
+    # Decide starting point for label fitting
+    if max_font_size is not None:
+        font_size = max_font_size
+    elif multiline is False:
+        font_size = get_font_size_estimation(text)
+    else:
+        font_size = get_font_size_estimation_from_lookup_table(MULTILINE_STRING_LIMIT) \
+            if (len(text) > MULTILINE_STRING_LIMIT) else get_font_size_estimation(text)
+
+    font = get_font(font_path, font_size)
+
+    if not multiline:
+
+        while font.getlength(text) > label_width:
+            font_size -= 1
+            font = get_font(font_path, font_size)
+
+        size = size_from_bbox(font.getbbox(text))
+
+    else:
+        text = textwrap.fill(text, MULTILINE_STRING_LIMIT, break_on_hyphens=True, break_long_words=True,
+                             replace_whitespace=replace_whitespace)
+        tmp_img = Image.new('RGB', (1, 1))
+        tmp_canvas = ImageDraw.Draw(tmp_img)
+
+        while size_from_bbox(tmp_canvas.textbbox((0,0), text, font=font))[0] < label_width:
+            font_size += 1
+            font = get_font(font_path, font_size)
+        while size_from_bbox(tmp_canvas.textbbox((0,0), text, font=font))[0] >= label_width:
+            font_size -= 1
+            font = get_font(font_path, font_size)
+
+        size = size_from_bbox(tmp_canvas.textbbox((0,0), text, font=font))
+
+    return FittedText(text, font_size, size[0], size[1])
+
+
+def _fit_text_cache_metrics() -> dict[tuple[str, ...], float]:
+    info = fit_text.cache_info()
+    return {("hit",): info.hits, ("miss",): info.misses}
+
+
+metrics.TEXT_FIT_CACHE.set_function(_fit_text_cache_metrics)
+
+
 class LabelString(LabelObject):
     def __init__(self, text, font_path=config.FONT_PATH, multiline=False, label_width=CANVAS_WIDTH,
                  replace_whitespace: bool = True, max_font_size=None, align: str = 'center', margin_top: float | None = None, margin_bottom: float | None = None) -> None:
@@ -66,42 +147,12 @@ class LabelString(LabelObject):
         self.margin_top = margin_top
         self.margin_bottom = margin_bottom
 
-        # Decide starting point for label fitting
-        if max_font_size is not None:
-            self.font_size = self.max_font_size
-        elif self.multiline is False:
-            self.font_size = get_font_size_estimation(self.text)
-        elif self.multiline is True:
-            self.font_size = get_font_size_estimation_from_lookup_table(MULTILINE_STRING_LIMIT) \
-                if (len(text) > MULTILINE_STRING_LIMIT) else get_font_size_estimation(self.text)
-
-        self.font = ImageFont.truetype(font_path, self.font_size)
-
-        if not self.multiline:
-
-            while self.font.getlength(self.text) > label_width:
-                self.font_size -= 1
-                self.font = ImageFont.truetype(font_path, self.font_size)
-
-            size = size_from_bbox(self.font.getbbox(self.text))
-
-        else:
-            self.text = textwrap.fill(text, MULTILINE_STRING_LIMIT, break_on_hyphens=True, break_long_words=True,
-                                      replace_whitespace=replace_whitespace)
-            tmp_img = Image.new('RGB', (1, 1))
-            tmp_canvas = ImageDraw.Draw(tmp_img)
-
-            while size_from_bbox(tmp_canvas.textbbox((0,0), self.text, font=self.font))[0] < label_width:
-                self.font_size += 1
-                self.font = ImageFont.truetype(font_path, self.font_size)
-            while size_from_bbox(tmp_canvas.textbbox((0,0), self.text, font=self.font))[0] >= label_width:
-                self.font_size -= 1
-                self.font = ImageFont.truetype(font_path, self.font_size)
-
-            size = size_from_bbox(tmp_canvas.textbbox((0,0), self.text, font=self.font))
-
-        self.height = size[1]
-        self.width = size[0]
+        fitted = fit_text(text, font_path, multiline, label_width, replace_whitespace, max_font_size)
+        self.text = fitted.text
+        self.font_size = fitted.font_size
+        self.font = get_font(font_path, fitted.font_size)
+        self.width = fitted.width
+        self.height = fitted.height
 
     def __str__(self):
         return f'text = {self.text}, size = {self.width}x{self.height}'
@@ -112,7 +163,7 @@ class LabelImage(LabelObject):
         super().__init__()
 
         if isinstance(image, str):
-            img: Image.Image = Image.open(image)
+            img: Image.Image = load_image(image)
         else:
             img = image
         width, height = img.size
@@ -258,11 +309,11 @@ assert qr_size == 2, f"QR code size is {qr_size}, expected 2"
 
 
 def get_font_size(estimated_size: int, text: str) -> int:
-    font = ImageFont.truetype(config.FONT_PATH, estimated_size)
+    font = get_font(config.FONT_PATH, estimated_size)
 
     while font.getlength(text) > CANVAS_WIDTH:
         estimated_size -= 1
-        font = ImageFont.truetype(config.FONT_PATH, estimated_size)
+        font = get_font(config.FONT_PATH, estimated_size)
 
     return estimated_size
 
@@ -376,7 +427,7 @@ def create_rotating_storage_label(public_url: str, label: label_data.RotatingSto
 
     qr_size = 200
     qr_code_img = qr_code_img.resize((qr_size, qr_size))
-    im = Image.open(config.ROTATING_ICON_PATH)
+    im = load_image(config.ROTATING_ICON_PATH).copy()
     offset = ((im.width - qr_size)//2, (im.height - qr_size)//2)
     im.paste(qr_code_img, offset)
     
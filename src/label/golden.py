@@ -0,0 +1,184 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import PIL
+from PIL import Image, ImageChops
+
+import config
+from src.backend import label_data
+from src.backend.makeradmin import UploadedLabel
+from src.label import creator as label_creator
+
+GOLDEN_DIR = Path(config.__file__).parent / "tests" / "golden"
+MANIFEST_NAME = "manifest.json"
+
+# Fixed ids, urls and dates, so that a label renders to the same pixels every time
+LABEL_ID = 1234567890123
+MEMBER_NUMBER = 1234
+MEMBER_NAME = "Firstname Lastname"
+CREATED_AT = datetime(2025, 1, 2, 13, 0, 0)
+EXPIRES_AT = date(2025, 3, 3)
+PUBLIC_URL = "HTTP://API.MAKERSPACE.SE/L/1234567890123"
+
+
+def _base() -> label_data.LabelBase:
+    return label_data.LabelBase(id=LABEL_ID, created_by_member_number=MEMBER_NUMBER, member_number=MEMBER_NUMBER,
+                                member_name=MEMBER_NAME, created_at=CREATED_AT, version=3)
+
+
+def golden_labels() -> dict[str, UploadedLabel]:
+    '''
+    One fixture per label type in creator.create_label
+    '''
+    labels: dict[str, label_data.LabelType] = {
+        "box_label": label_data.BoxLabel(base=_base()),
+        "temp_storage_label": label_data.TemporaryStorageLabel(base=_base(), description="Half finished bookshelf", expires_at=EXPIRES_AT),
+        "rotating_storage_label": label_data.RotatingStorageLabel(base=_base(), description="Plywood offcuts"),
+        "warning_label": label_data.WarningLabel(base=_base(), description="Abandoned project", expires_at=EXPIRES_AT),
+        "warning_label_without_description": label_data.WarningLabel(base=_base(), description=None, expires_at=EXPIRES_AT),
+        "fire_safety_label": label_data.FireSafetyLabel(base=_base(), expires_at=EXPIRES_AT),
+        "3d_printer_filament_label": label_data.Printer3DLabel(base=_base()),
+        # Far in the future, since the name tag compares the date with today
+        "name_tag": label_data.NameTag(base=_base(), membership_expires_at=date(2099, 12, 31)),
+        "name_tag_without_membership": label_data.NameTag(base=_base(), membership_expires_at=None),
+        "meetup_label": label_data.MeetupNameTag(base=_base()),
+        "drying_label": label_data.DryingLabel(base=_base(), expires_at=datetime(2025, 1, 2, 17, 0, 0)),
+    }
+    return {name: UploadedLabel(PUBLIC_URL, PUBLIC_URL, label) for name, label in labels.items()}
+
+
+def render(uploaded_label: UploadedLabel, reference: bool = False) -> Image.Image:
+    '''
+    Renders a label. With reference, the text fitting cache is bypassed, so that
+    the fast path can be compared against the path that does all the work.
+    '''
+    if not reference:
+        return label_creator.create_label(uploaded_label).label
+    with mock.patch.object(label_creator, "fit_text", label_creator.fit_text.__wrapped__):
+        return label_creator.create_label(uploaded_label).label
+
+
+@dataclass
+class ImageDiff:
+    size_mismatch: bool
+    differing_pixels: int  # Pixels where some channel differs by more than the tolerance
+    total_pixels: int
+    max_difference: int  # Largest difference of any channel, 0-255
+    mask: Image.Image | None  # White where the pixels differ by more than the tolerance
+
+    @property
+    def differing_fraction(self) -> float:
+        return self.differing_pixels / self.total_pixels if self.total_pixels else 0.0
+
+    def matches(self, max_differing_fraction: float = 0.0) -> bool:
+        return not self.size_mismatch and self.differing_fraction <= max_differing_fraction
+
+    def __str__(self) -> str:
+        if self.size_mismatch:
+            return "the image sizes differ"
+        return (f"{self.differing_pixels} of {self.total_pixels} pixels differ ({self.differing_fraction:.4%}), "
+                f"by at most {self.max_difference}")
+
+
+def diff_images(expected: Image.Image, actual: Image.Image, tolerance: int = 0) -> ImageDiff:
+    '''
+    Compares two images pixel by pixel. Channels that differ by at most tolerance
+    count as equal, to allow for e.g. other versions of FreeType.
+    '''
+    total_pixels = expected.size[0] * expected.size[1]
+    if expected.size != actual.size:
+        return ImageDiff(True, total_pixels, total_pixels, 255, None)
+
+    difference = ImageChops.difference(expected.convert("RGB"), actual.convert("RGB"))
+    r, g, b = difference.split()
+    largest = ImageChops.lighter(ImageChops.lighter(r, g), b)
+    mask = largest.point(lambda value: 255 if value > tolerance else 0)
+    differing_pixels = mask.histogram()[255]
+    _, max_difference = largest.getextrema()
+    return ImageDiff(False, differing_pixels, total_pixels, int(max_difference), mask)  # type: ignore
+
+
+def diff_image(expected: Image.Image, actual: Image.Image, diff: ImageDiff) -> Image.Image:
+    '''
+    The expected image faded, with the differing pixels in red
+    '''
+    if diff.mask is None:
+        # Different sizes. Show them side by side instead.
+        side_by_side = Image.new("RGB", (expected.width + actual.width, max(expected.height, actual.height)), "red")
+        side_by_side.paste(expected.convert("RGB"), (0, 0))
+        side_by_side.paste(actual.convert("RGB"), (expected.width, 0))
+        return side_by_side
+    faded = Image.blend(expected.convert("RGB"), Image.new("RGB", expected.size, "white"), 0.75)
+    return Image.composite(Image.new("RGB", expected.size, "red"), faded, diff.mask)
+
+
+def font_checksum(font_path: str = config.FONT_PATH) -> str:
+    with open(font_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def environment() -> dict[str, Any]:
+    # The rendered pixels depend on the font file and the Pillow (and FreeType) version
+    return dict(font_sha256=font_checksum(), pillow=PIL.__version__)
+
+
+def read_manifest(golden_dir: Path = GOLDEN_DIR) -> dict[str, Any] | None:
+    path = golden_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def environment_mismatch(golden_dir: Path = GOLDEN_DIR) -> str | None:
+    '''
+    Why the goldens can not be compared here, or None if they can
+    '''
+    manifest = read_manifest(golden_dir)
+    if manifest is None:
+        return None
+    if not Path(config.FONT_PATH).exists():
+        return f"the font {config.FONT_PATH} is missing, run 'make init-font'"
+    if manifest["font_sha256"] != font_checksum():
+        return f"the goldens were rendered with another font file than {config.FONT_PATH}"
+    return None
+
+
+def golden_path(name: str, golden_dir: Path = GOLDEN_DIR) -> Path:
+    return golden_dir / f"{name}.png"
+
+
+def check(name: str, image: Image.Image, golden_dir: Path = GOLDEN_DIR, output_dir: Path | None = None,
+          tolerance: int = 0, max_differing_fraction: float = 0.0) -> ImageDiff:
+    '''
+    Compares image with the golden image called name. On a mismatch the rendered
+    image and a diff image are written to output_dir, next to the goldens by default.
+    '''
+    expected = Image.open(golden_path(name, golden_dir))
+    diff = diff_images(expected, image, tolerance)
+    if not diff.matches(max_differing_fraction):
+        output_dir = output_dir or golden_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        image.save(output_dir / f"{name}.actual.png")
+        diff_image(expected, image, diff).save(output_dir / f"{name}.diff.png")
+    return diff
+
+
+def accept(name: str, image: Image.Image, golden_dir: Path = GOLDEN_DIR) -> Path:
+    '''
+    Stores image as the new golden image called name
+    '''
+    golden_dir.mkdir(parents=True, exist_ok=True)
+    path = golden_path(name, golden_dir)
+    image.save(path)
+    for leftover in (golden_dir / f"{name}.actual.png", golden_dir / f"{name}.diff.png"):
+        leftover.unlink(missing_ok=True)
+    with open(golden_dir / MANIFEST_NAME, "w") as f:
+        json.dump(environment(), f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
@@ -0,0 +1,333 @@
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterable, TextIO
+from PIL import Image
+
+from src.backend import label_data
+from src.backend.makeradmin import UploadedLabel
+from src.backend.member import Member, MemberCache
+from src.label import creator as label_creator
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+LABEL_TYPES = ["box", "temp", "3d", "warning", "name", "meetup", "fire", "rotating"]
+
+# Queue marker telling the next stage that no more jobs will arrive
+_DONE = object()
+
+
+class LabelJobError(ValueError):
+    pass
+
+
+def create_label_data(member: Member, label_type: str, description: str | None = None) -> label_data.LabelType:
+    match label_type:
+        case "box":
+            return label_data.BoxLabel.from_member(member)
+        case "temp":
+            if description is None:
+                raise LabelJobError("Temporary storage labels require a description")
+            return label_data.TemporaryStorageLabel.from_member(member,
+                                                                description=description,
+                                                                expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_STORAGE_LENGTH))).date())
+        case "fire":
+            return label_data.FireSafetyLabel.from_member(member, expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_STORAGE_LENGTH))).date())
+        case "3d":
+            return label_data.Printer3DLabel.from_member(member)
+        case "name":
+            return label_data.NameTag.from_member(member)
+        case "meetup":
+            return label_data.MeetupNameTag.from_member(member)
+        case "rotating":
+            if description is None:
+                raise LabelJobError("Rotating storage labels require a description")
+            return label_data.RotatingStorageLabel.from_member(member, description=description)
+        case "warning":
+            return label_data.WarningLabel.from_member(member, description=description, expires_at=(datetime.now() + timedelta(days=int(label_creator.TEMP_WARNING_STORAGE_LENGTH))).date())
+        case _:
+            raise LabelJobError(f"Unknown label type: {label_type}")
+
+
+@dataclass(frozen=True)
+class LabelJob:
+    index: int  # Position in the run. Used for the checkpoint, so that duplicated rows are printed once each.
+    member_number: int
+    label_type: str
+    description: str | None = None
+    copies: int = 1
+    line: int | None = field(default=None, compare=False)  # Line in the input file, if read from one
+
+    @property
+    def key(self) -> str:
+        return f"{self.index}:{self.member_number}:{self.label_type}"
+
+
+class Checkpoint(object):
+    '''
+    Append-only file with one line per finished job, so that an interrupted run
+    can be started again with the same input and continue where it stopped.
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self.done: set[str] = set()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self.done.add(json.loads(line)["key"])
+            logger.info(f"Resuming from checkpoint {self.path} with {len(self.done)} finished labels")
+
+    def is_done(self, job: LabelJob) -> bool:
+        return job.key in self.done
+
+    def mark_done(self, job: LabelJob) -> None:
+        self.done.add(job.key)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(dict(key=job.key, member_number=job.member_number, type=job.label_type)) + "\n")
+
+
+class StageStats(object):
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.count += 1
+            self.busy_seconds += seconds
+
+    def rate(self, elapsed: float) -> float:
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def summary(self, elapsed: float) -> str:
+        mean = self.busy_seconds / max(self.count + self.failures, 1)
+        return f"{self.name}: {self.count} ok, {self.failures} failed, {self.rate(elapsed):.2f}/s, {mean * 1000:.0f} ms/label"
+
+
+@dataclass
+class PipelineResult:
+    printed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    render_processes: int = 1
+    stages: dict[str, StageStats] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        lines = [f"Finished {self.printed} labels in {self.elapsed:.1f} s ({self.failed} failed, {self.skipped} already done)"]
+        lines.extend("  " + stats.summary(self.elapsed) for stats in self.stages.values())
+        return "\n".join(lines)
+
+
+def render_label(uploaded_label: UploadedLabel) -> tuple[Image.Image, float]:
+    start = time.perf_counter()
+    image = label_creator.create_label(uploaded_label).label
+    return image, time.perf_counter() - start
+
+
+class LabelPipeline(object):
+    '''
+    Prints a stream of label jobs with the stages running concurrently:
+    member lookup and label upload on a thread pool, rendering on a process pool
+    and output (printing) strictly in input order on the calling thread.
+    The output callback gets whatever the render function returned, which is the
+    label image by default.
+    The stages are connected by bounded queues, so a slow printer throttles the
+    rest of the pipeline instead of letting rendered labels pile up in memory.
+    '''
+
+    def __init__(self, makeradmin_client: Any, member_cache: MemberCache, output: Callable[[LabelJob, Any], None],
+                 upload_workers: int = 4, render_processes: int | None = None, queue_size: int = 8,
+                 checkpoint: Checkpoint | None = None, progress_stream: TextIO | None = sys.stderr,
+                 on_failure: Callable[[LabelJob, Exception], None] | None = None,
+                 render: Callable[[UploadedLabel], tuple[Any, float]] = render_label) -> None:
+        self.makeradmin_client = makeradmin_client
+        self.member_cache = member_cache
+        self.output = output
+        self.upload_workers = upload_workers
+        self.render_processes = render_processes
+        self.queue_size = queue_size
+        self.checkpoint = checkpoint
+        self.progress_stream = progress_stream
+        self.on_failure = on_failure
+        self.render = render
+        self.stats = {name: StageStats(name) for name in ["lookup", "upload", "render", "print"]}
+        self._stop = threading.Event()
+        self._feed_error: BaseException | None = None
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _DONE
+
+    def _prepare(self, job: LabelJob) -> UploadedLabel:
+        start = time.perf_counter()
+        try:
+            member = self.member_cache.get(job.member_number)
+        except Exception:
+            self.stats["lookup"].add(time.perf_counter() - start, failed=True)
+            raise
+        self.stats["lookup"].add(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            uploaded_label = self.makeradmin_client.post_label(create_label_data(member, job.label_type, job.description))
+        except Exception:
+            self.stats["upload"].add(time.perf_counter() - start, failed=True)
+            raise
+        self.stats["upload"].add(time.perf_counter() - start)
+        return uploaded_label
+
+    def _feed(self, jobs: Iterable[LabelJob], upload_pool: ThreadPoolExecutor, prepared: queue.Queue, result: PipelineResult) -> None:
+        try:
+            for job in jobs:
+                if self.checkpoint is not None and self.checkpoint.is_done(job):
+                    result.skipped += 1
+                    continue
+                if not self._put(prepared, (job, upload_pool.submit(self._prepare, job))):
+                    return
+        except BaseException as e:
+            self._feed_error = e
+        self._put(prepared, _DONE)
+
+    def _dispatch_renders(self, prepared: queue.Queue, render_pool: ProcessPoolExecutor, rendered: queue.Queue) -> None:
+        # Whatever happens here, the printing stage must be told that no more jobs will arrive, or it waits forever
+        job: LabelJob | None = None
+        try:
+            while True:
+                item = self._get(prepared)
+                if item is _DONE:
+                    return
+                job, prepare_future = item
+                forwarded: tuple[LabelJob, Future | None, Exception | None]
+                try:
+                    uploaded_label = prepare_future.result()
+                except Exception as e:
+                    forwarded = (job, None, e)
+                else:
+                    forwarded = (job, render_pool.submit(self.render, uploaded_label), None)
+                if not self._put(rendered, forwarded):
+                    return
+                job = None
+        except Exception as e:
+            # E.g. a render process died and took the pool with it. The remaining jobs can not be rendered.
+            logger.error(f"Could not render labels: {e!r}")
+            if job is not None and not self._put(rendered, (job, None, e)):
+                return
+            while (item := self._get(prepared)) is not _DONE:
+                if not self._put(rendered, (item[0], None, e)):
+                    return
+        finally:
+            self._put(rendered, _DONE)
+
+    def _report_progress(self, result: PipelineResult, final: bool = False) -> None:
+        if self.progress_stream is None:
+            return
+        elapsed = time.monotonic() - self._started
+        rates = ", ".join(f"{s.name} {s.rate(elapsed):.1f}/s" for s in self.stats.values())
+        self.progress_stream.write(f"\r[{result.printed} printed, {result.failed} failed, {result.skipped} skipped] {rates}")
+        if final:
+            self.progress_stream.write("\n")
+        self.progress_stream.flush()
+
+    def _print_in_order(self, rendered: queue.Queue, result: PipelineResult) -> None:
+        while True:
+            item = self._get(rendered)
+            if item is _DONE:
+                return
+            job: LabelJob = item[0]
+            render_future: Future | None = item[1]
+            error: Exception | None = item[2]
+
+            if error is None:
+                assert render_future is not None
+                try:
+                    rendered_label, render_seconds = render_future.result()
+                    self.stats["render"].add(render_seconds)
+                except Exception as e:
+                    self.stats["render"].add(0, failed=True)
+                    error = e
+
+            if error is not None:
+                logger.error(f"Could not create {job.label_type} label for member number {job.member_number}: {error}")
+                result.failed += 1
+                if self.on_failure is not None:
+                    self.on_failure(job, error)
+                self._report_progress(result)
+                continue
+
+            start = time.perf_counter()
+            try:
+                self.output(job, rendered_label)
+            except Exception:
+                self.stats["print"].add(time.perf_counter() - start, failed=True)
+                raise
+            self.stats["print"].add(time.perf_counter() - start)
+            if self.checkpoint is not None:
+                self.checkpoint.mark_done(job)
+            result.printed += 1
+            self._report_progress(result)
+
+    def run(self, jobs: Iterable[LabelJob]) -> PipelineResult:
+        render_processes = self.render_processes or os.cpu_count() or 1
+        result = PipelineResult(stages=self.stats, render_processes=render_processes)
+        self._stop.clear()
+        self._feed_error = None
+        self._started = time.monotonic()
+        prepared: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Rendered labels are waited for in order, so the queue must be long enough to keep all render processes busy
+        rendered: queue.Queue = queue.Queue(maxsize=max(self.queue_size, 2 * render_processes))
+
+        upload_pool = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="label-upload")
+        # Fork from a clean server process, since forking this process while other threads run is unsafe
+        render_pool = ProcessPoolExecutor(max_workers=render_processes, mp_context=multiprocessing.get_context("forkserver"),
+                                          initializer=label_creator.preload_assets)
+
+        feeder = threading.Thread(target=self._feed, args=(jobs, upload_pool, prepared, result), name="label-feeder", daemon=True)
+        dispatcher = threading.Thread(target=self._dispatch_renders, args=(prepared, render_pool, rendered), name="label-render-dispatcher", daemon=True)
+        feeder.start()
+        dispatcher.start()
+        try:
+            self._print_in_order(rendered, result)
+        finally:
+            self._stop.set()
+            feeder.join(timeout=1)
+            dispatcher.join(timeout=1)
+            upload_pool.shutdown(cancel_futures=True)
+            render_pool.shutdown(cancel_futures=True)
+            result.elapsed = time.monotonic() - self._started
+            self._report_progress(result, final=True)
+
+        if self._feed_error is not None:
+            raise self._feed_error
+        return result
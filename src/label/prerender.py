@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from PIL import Image
+
+from src.backend import label_data
+from src.backend.makeradmin import UploadedLabel
+from src.backend.member import Member
+from src.label import creator as label_creator
+from src.util import metrics
+from src.util.logger import get_logger
+from src.util.tracing import span
+
+logger = get_logger()
+
+# Labels without a QR code look the same before and after they are uploaded, so they can be rendered in advance
+PRERENDERED_LABEL_TYPES = (label_data.NameTag, label_data.Printer3DLabel)
+# Used in place of the real url while warming up labels with QR codes. Same length as the real ones.
+PLACEHOLDER_URL = "HTTP://API.MAKERSPACE.SE/L/0000000000000"
+PRERENDER_NICENESS = 10
+PREVIEW_MAX_SIZE = (400, 250)
+
+
+def likely_labels(member: Member) -> list[label_data.LabelType]:
+    '''
+    The labels most members print after logging in, most popular first
+    '''
+    return [label_data.NameTag.from_member(member),
+            label_data.BoxLabel.from_member(member),
+            label_data.Printer3DLabel.from_member(member)]
+
+
+def _lower_thread_priority() -> None:
+    try:
+        # On Linux the niceness of a single thread can be changed
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PRERENDER_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+def render_preview(label: label_data.LabelType, max_size: tuple[int, int] = PREVIEW_MAX_SIZE) -> Image.Image:
+    '''
+    Renders the label the same way as when it is printed, with a placeholder QR
+    code, and scales it down to fit in max_size
+    '''
+    image = label_creator.create_label(UploadedLabel(PLACEHOLDER_URL, PLACEHOLDER_URL, label)).label
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return image
+
+
+class LabelPrerenderer(object):
+    '''
+    Renders the labels a member is likely to print on a low priority thread while
+    they look at the menu. Labels without QR codes are kept and used as they are
+    if the member prints one of them. For the others only the text fitting is done
+    in advance (see creator.fit_text), so that only the QR code is left to render
+    when the upload returns.
+    '''
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.member_number: int | None = None
+        self._labels: list[tuple[label_data.LabelType, label_creator.Label]] = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, member: Member) -> None:
+        if self.member_number == member.member_number:
+            return
+        self.cancel()
+        self.member_number = member.member_number
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(member, self._cancel), name="label-prerender", daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        '''
+        Stops rendering and forgets the labels of the current member, e.g. on logout
+        '''
+        self._cancel.set()
+        with self._lock:
+            self._labels = []
+        self.member_number = None
+
+    def _run(self, member: Member, cancel: threading.Event) -> None:
+        _lower_thread_priority()
+        start = time.perf_counter()
+        for label in likely_labels(member):
+            if cancel.is_set():
+                return
+            try:
+                if isinstance(label, PRERENDERED_LABEL_TYPES):
+                    rendered = label_creator.create_label(UploadedLabel(PLACEHOLDER_URL, PLACEHOLDER_URL, label))
+                    with self._lock:
+                        if not cancel.is_set():
+                            self._labels.append((label, rendered))
+                else:
+                    label_creator.create_label(UploadedLabel(PLACEHOLDER_URL, PLACEHOLDER_URL, label))
+            except Exception:
+                logger.exception(f"Could not pre-render {type(label).__name__} label")
+        logger.info(f"Pre-rendered labels for member #{member.member_number} in {time.perf_counter() - start:.2f} s")
+
+    def create_label(self, uploaded_label: UploadedLabel) -> label_creator.Label:
+        '''
+        Returns the pre-rendered label if there is one, or renders it. Only labels
+        that are printed are timed, not previews and pre-renders.
+        '''
+        label_type = type(uploaded_label.label).__name__
+        with span("label.create", label_type=label_type), metrics.RENDER_SECONDS.time(label_type=label_type):
+            return self._create_label(uploaded_label)
+
+    def _create_label(self, uploaded_label: UploadedLabel) -> label_creator.Label:
+        with self._lock:
+            rendered = next((r for label, r in self._labels if label.approximately_equal(uploaded_label.label)), None)
+
+        if rendered is not None:
+            self.hits += 1
+            metrics.PRERENDERED_LABELS.inc(result="hit")
+        elif isinstance(uploaded_label.label, PRERENDERED_LABEL_TYPES):
+            self.misses += 1
+            metrics.PRERENDERED_LABELS.inc(result="miss")
+        fit_info = label_creator.fit_text.cache_info()
+        logger.info(f"Pre-rendered labels used {self.hits} of {self.hits + self.misses} times. "
+                    f"Text fit cache: {fit_info.hits} hits, {fit_info.misses} misses.")
+
+        if rendered is not None:
+            return rendered
+        return label_creator.create_label(uploaded_label)
@@ -8,6 +8,7 @@ from PIL import Image
 import usb.core
 
 from src.util.logger import get_logger
+from src.util.tracing import span
 
 PRINTER_BACKEND = 'pyusb'
 LABEL_TYPE = '62'
@@ -31,11 +32,7 @@ def get_printer_config() -> Tuple[str, usb.core.Device]:
     raise PrinterNotFoundError()
 
 
-def print_label(label: Image.Image) -> dict[str, Any]:
-    printer_model, printer = get_printer_config()
-    print(printer_model, printer)
-    qlr = BrotherQLRaster(printer_model)
-
+def resize_for_printer(label: Image.Image) -> Image.Image:
     # The brother ql library has conversion functions, but they are not updated
     # to newer versions of pillow, so they will crash.
     # Therefore we resize the label ourselves to the correct width.
@@ -43,7 +40,20 @@ def print_label(label: Image.Image) -> dict[str, Any]:
     if label.size[0] != dots_printable[0]:
         hsize = int((dots_printable[0] / label.size[0]) * label.size[1])
         label = label.resize((dots_printable[0], hsize), Image.LANCZOS)
+    return label
+
 
-    qlr = convert(qlr, [label], LABEL_TYPE)
+def convert_label(label: Image.Image, printer_model: str) -> bytes:
+    qlr = BrotherQLRaster(printer_model)
+    return convert(qlr, [resize_for_printer(label)], LABEL_TYPE)
+
+
+def print_label(label: Image.Image) -> dict[str, Any]:
+    with span("printer.find"):
+        printer_model, printer = get_printer_config()
+    print(printer_model, printer)
+    with span("printer.convert", printer_model=printer_model):
+        instructions = convert_label(label, printer_model)
 
-    return send(instructions=qlr, printer_identifier=printer, backend_identifier=PRINTER_BACKEND, blocking=True)
+    with span("printer.send", printer_model=printer_model):
+        return send(instructions=instructions, printer_identifier=printer, backend_identifier=PRINTER_BACKEND, blocking=True)
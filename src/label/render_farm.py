@@ -0,0 +1,39 @@
+import os
+import time
+from functools import partial
+from typing import Callable
+
+from src.backend.makeradmin import UploadedLabel
+from src.label import creator as label_creator
+from src.label import printer as label_printer
+
+RENDER_FORMATS = ["png", "raster"]
+DEFAULT_PRINTER_MODEL = "QL-800"
+
+
+def render_to_file(output_dir: str, render_format: str, printer_model: str, uploaded_label: UploadedLabel) -> tuple[str, float]:
+    '''
+    Renders a label and writes it to output_dir, either as a PNG image or as the
+    raster instructions that would be sent to the printer. Runs in the render
+    processes, so that encoding and writing the files is also done in parallel.
+    '''
+    start = time.perf_counter()
+    image = label_creator.create_label(uploaded_label).label
+    label = uploaded_label.label
+    file_name = f"{label.base.member_number}_{type(label).__name__}_{label.base.id}"
+    if render_format == "png":
+        path = os.path.join(output_dir, file_name + ".png")
+        image.save(path)
+    else:
+        path = os.path.join(output_dir, file_name + ".bin")
+        with open(path, "wb") as f:
+            f.write(label_printer.convert_label(image, printer_model))
+    return path, time.perf_counter() - start
+
+
+def file_renderer(output_dir: str, render_format: str, printer_model: str = DEFAULT_PRINTER_MODEL) -> Callable[[UploadedLabel], tuple[str, float]]:
+    if render_format not in RENDER_FORMATS:
+        raise ValueError(f"Unknown render format: {render_format}")
+    os.makedirs(output_dir, exist_ok=True)
+    # A partial of a module level function can be sent to the render processes
+    return partial(render_to_file, output_dir, render_format, printer_model)
@@ -0,0 +1,221 @@
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from datetime import time as time_of_day
+from typing import Any, Callable
+
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+
+class InjectedNetworkError(Exception):
+    pass
+
+
+class InjectedTimeout(InjectedNetworkError):
+    pass
+
+
+@dataclass
+class Latency:
+    '''
+    Seconds. The parameters depend on the distribution:
+    constant: value. uniform: min, max. normal: mean, stddev.
+    lognormal: median, sigma. exponential: mean.
+    '''
+    distribution: str = "constant"
+    parameters: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'Latency':
+        data = dict(data)
+        distribution = data.pop("distribution", "constant")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}'. Use one of {DISTRIBUTIONS}")
+        return cls(distribution, {key: float(value) for key, value in data.items()})
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.parameters
+        match self.distribution:
+            case "constant":
+                value = p.get("value", 0.0)
+            case "uniform":
+                value = rng.uniform(p["min"], p["max"])
+            case "normal":
+                value = rng.gauss(p["mean"], p["stddev"])
+            case "lognormal":
+                value = rng.lognormvariate(math.log(p["median"]), p["sigma"])
+            case "exponential":
+                value = rng.expovariate(1 / p["mean"])
+        return max(value, 0.0)
+
+
+@dataclass
+class Faults:
+    latency: Latency = field(default_factory=Latency)
+    latency_scale: float = 1.0
+    timeout: float = 1.0  # Like the real makeradmin client
+    timeout_rate: float = 0.0
+    network_error_rate: float = 0.0
+    http_errors: dict[int, float] = field(default_factory=dict)  # Status code to probability
+
+    def updated(self, data: dict[str, Any]) -> 'Faults':
+        '''
+        A copy with the settings in data. Latency scales multiply.
+        '''
+        changes: dict[str, Any] = {}
+        for key, value in data.items():
+            if key == "latency":
+                changes["latency"] = Latency.from_dict(value)
+            elif key == "latency_scale":
+                changes["latency_scale"] = self.latency_scale * float(value)
+            elif key == "http_errors":
+                changes["http_errors"] = {**self.http_errors, **{int(code): float(rate) for code, rate in value.items()}}
+            elif key in ("timeout", "timeout_rate", "network_error_rate"):
+                changes[key] = float(value)
+            else:
+                raise ValueError(f"Unknown fault setting '{key}'")
+        return replace(self, **changes)
+
+
+@dataclass
+class Window:
+    start: time_of_day
+    end: time_of_day
+    settings: dict[str, Any]
+
+    def active(self, now: time_of_day) -> bool:
+        if self.start <= self.end:
+            return self.start <= now < self.end
+        # Over midnight
+        return now >= self.start or now < self.end
+
+
+class FaultInjector(object):
+    '''
+    Decides what happens to each request of one service. Call request() where the
+    mock would send the request: it sleeps for the latency, and then raises an
+    InjectedNetworkError or returns the HTTP status code to answer with.
+    '''
+
+    def __init__(self, settings: dict[str, Any], seed: int | None = None,
+                 clock: Callable[[], datetime] = datetime.now, monotonic: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        settings = dict(settings)
+        self.endpoints: dict[str, dict[str, Any]] = settings.pop("endpoints", {})
+        self.windows = [Window(time_of_day.fromisoformat(w["from"]), time_of_day.fromisoformat(w["to"]),
+                               {key: value for key, value in w.items() if key not in ("from", "to")})
+                        for w in settings.pop("windows", [])]
+        token = settings.pop("token", {})
+        self.token_valid_for: float | None = token.get("valid_for")
+        self.token_expired_for: float = token.get("expired_for", 0)
+        if self.token_valid_for is not None and (self.token_valid_for < 0 or self.token_expired_for < 0
+                                                 or self.token_valid_for + self.token_expired_for <= 0):
+            raise ValueError(f"The token must be valid or expired for a positive number of seconds, not {token}")
+        self.faults = Faults().updated(settings)
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.monotonic = monotonic
+        self.sleep = sleep
+        self.started = monotonic()
+        self._lock = threading.Lock()
+
+    def faults_for(self, endpoint: str) -> Faults:
+        faults = self.faults.updated(self.endpoints.get(endpoint, {}))
+        now = self.clock().time()
+        for window in self.windows:
+            if window.active(now):
+                faults = faults.updated(window.settings)
+        return faults
+
+    @property
+    def token_expired(self) -> bool:
+        '''
+        The token is valid for valid_for seconds, then expired for expired_for
+        seconds, as if someone logged in again, and so on
+        '''
+        if self.token_valid_for is None:
+            return False
+        period = self.token_valid_for + self.token_expired_for
+        return (self.monotonic() - self.started) % period >= self.token_valid_for
+
+    def request(self, endpoint: str) -> int:
+        faults = self.faults_for(endpoint)
+        with self._lock:
+            # One lock around all draws, so that a seed gives the same faults in the same order
+            latency = faults.latency.sample(self.rng) * faults.latency_scale
+            timed_out = self.rng.random() < faults.timeout_rate
+            network_error = self.rng.random() < faults.network_error_rate
+            roll = self.rng.random()
+
+        if timed_out or latency > faults.timeout:
+            self.sleep(faults.timeout)
+            raise InjectedTimeout(f"Injected timeout of {endpoint} after {faults.timeout:.2f} s")
+        self.sleep(latency)
+        if network_error:
+            raise InjectedNetworkError(f"Injected network error in {endpoint}")
+        if self.token_expired:
+            return 401
+        for status, rate in sorted(faults.http_errors.items()):
+            if roll < rate:
+                return status
+            roll -= rate
+        return 200
+
+
+class FaultProfile(object):
+    '''
+    Latency and failures for the mocked makeradmin and Slack clients, so that
+    development mode behaves like a slow or flaky production network.
+
+    A profile is a JSON file:
+
+        {
+          "seed": 1,
+          "makeradmin": {
+            "latency": {"distribution": "lognormal", "median": 0.15, "sigma": 0.5},
+            "timeout": 1.0,
+            "timeout_rate": 0.01,
+            "network_error_rate": 0.01,
+            "http_errors": {"500": 0.01},
+            "endpoints": {"post_label": {"latency": {"distribution": "uniform", "min": 0.2, "max": 0.8}}},
+            "windows": [{"from": "17:30", "to": "19:00", "latency_scale": 5, "http_errors": {"503": 0.1}}],
+            "token": {"valid_for": 3600, "expired_for": 60}
+          },
+          "slack": {"latency": {"distribution": "exponential", "mean": 0.3}, "network_error_rate": 0.05}
+        }
+
+    Endpoint settings and the windows that are active at the time of the request
+    are applied on top of the service settings, in that order.
+    '''
+
+    def __init__(self, data: dict[str, Any], **injector_kwargs: Any) -> None:
+        self.data = data
+        self.seed = data.get("seed")
+        self.injector_kwargs = injector_kwargs
+
+    @classmethod
+    def load(cls, path: str, **injector_kwargs: Any) -> 'FaultProfile':
+        with open(path) as f:
+            profile = cls(json.load(f), **injector_kwargs)
+        logger.warning(f"Injecting faults into the mocked services from {path}")
+        return profile
+
+    def injector(self, service: str) -> FaultInjector | None:
+        '''
+        The injector for service, e.g. "makeradmin" or "slack", or None if the profile does not mention it
+        '''
+        settings = self.data.get(service)
+        if settings is None:
+            return None
+        # Each service gets its own random sequence, so adding faults to one does not change the other
+        seed = None if self.seed is None else self.seed + zlib.crc32(service.encode())
+        return FaultInjector(settings, seed, **self.injector_kwargs)
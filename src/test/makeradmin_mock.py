@@ -1,7 +1,11 @@
 from typing import Any
 
 from src.backend.label_data import LabelType
-from src.backend.makeradmin import UploadedLabel
+from src.backend.makeradmin import IncorrectPinCode, NetworkError, UploadedLabel
+from src.test.fault_injection import FaultInjector, InjectedNetworkError
+from src.util.logger import get_logger
+
+logger = get_logger()
 
 
 response = {
@@ -22,6 +26,26 @@ response = {
             'membership_end': '2025-12-31',
             'special_labaccess_active': False,
             'special_labaccess_end': None
+        },
+        'permissions': []
+    },
+    'status': 'ok'
+}
+
+label_response = {
+    'data': {
+        'public_url': 'https://api.makerspace.se/L/1234567890123',
+        'public_observation_url': 'HTTP://API.MAKERSPACE.SE/L/1234567890123',
+        'label': {
+            'id': 1234567890123,
+            'created_by_member_number': 9999,
+            'member_number': 9999,
+            'member_name': 'Firstname Lastname',
+            'created_at': '2025-05-01T18:30:00',
+            'version': 3,
+            'description': 'Half finished bookshelf',
+            'expires_at': '2025-06-30',
+            'type': 'TemporaryStorageLabel'
         }
     },
     'status': 'ok'
@@ -29,23 +53,47 @@ response = {
 
 
 class MakerAdminClient(object):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        pass
+    def __init__(self, *args: Any, faults: FaultInjector | None = None, **kwargs: Any) -> None:
+        self.faults = faults
+
+    def _request(self, endpoint: str) -> int:
+        '''
+        The status code the backend answers with. Raises NetworkError like the real client.
+        '''
+        if self.faults is None:
+            return 200
+        try:
+            return self.faults.request(endpoint)
+        except InjectedNetworkError as e:
+            logger.error(f"An exception was raised while trying to send request to makeradmin: {e}")
+            raise NetworkError()
 
     @property
     def configured(self):
-        return True
+        return self.faults is None or not self.faults.token_expired
 
     def is_logged_in(self) -> bool:
-        return True
+        return self.configured
 
-    def get_tag_info(self, tagid: int) -> dict[str, Any]:
+    def get_tag_info(self, tagid: int | str) -> dict[str, Any]:
+        status = self._request("get_tag_info")
+        if status == 404:
+            return dict(data=None)
+        if status >= 300:
+            raise Exception("Could not get a response... from server")
         return response
 
     def get_member_with_pin(self, member_number: int, pin_code: str) -> dict[str, Any]:
+        status = self._request("get_member_with_pin")
+        if status == 404:
+            raise IncorrectPinCode(member_number)
+        if status >= 300:
+            raise Exception("Bad response from backend")
         return response
 
     def get_member_number_info(self, member_number: int) -> dict[str, Any]:
+        if self._request("get_member_number_info") >= 300:
+            raise Exception("Could not get a response... from server")
         return response
     
     def has_permission(self, permission: str) -> bool:
@@ -55,4 +103,8 @@ class MakerAdminClient(object):
         return True
     
     def post_label(self, label: LabelType) -> UploadedLabel:
-        return UploadedLabel(f"https://mock.com/l/{label.base.id}", label)
+        status = self._request("post_label")
+        if status >= 300:
+            logger.error(f"Failed to upload label: injected status {status}")
+            raise NetworkError("Could not upload label to makeradmin")
+        return UploadedLabel(f"https://mock.com/l/{label.base.id}", f"https://mock.com/l/{label.base.id}/observe", label)
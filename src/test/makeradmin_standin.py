@@ -0,0 +1,430 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter as CountOf
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from src.backend import label_data
+from src.backend.makeradmin import MakerAdminClient, decode_uploaded_label
+from src.backend.member import Member
+from src.test.fault_injection import FaultInjector, InjectedNetworkError
+from src.test.makeradmin_mock import response as mock_member_response
+from src.util.logger import get_logger
+from src.util.tracing import percentile
+
+logger = get_logger()
+
+FIRST_NAMES = ["Alva", "Anders", "Astrid", "Björn", "Elin", "Erik", "Freja", "Gustav", "Hanna", "Ida", "Johan",
+               "Karin", "Lars", "Linnea", "Magnus", "Maja", "Nils", "Oskar", "Sara", "Sofia", "Tove", "Viktor"]
+LAST_NAMES = ["Andersson", "Berg", "Dahl", "Ek", "Eriksson", "Holm", "Johansson", "Karlsson", "Lind", "Lundqvist",
+              "Nilsson", "Nyström", "Persson", "Sandberg", "Svensson", "Wallin", "von Hohenzollern-Sigmaringen"]
+
+# The endpoint names of the mocked client, so that a fault profile applies to both
+ROUTES = [
+    ("GET", re.compile(r"^/permission/authenticated$"), "is_logged_in"),
+    ("GET", re.compile(r"^/multiaccess/memberbooth/tag/(?P<tag>[^/]+)$"), "get_tag_info"),
+    ("GET", re.compile(r"^/multiaccess/memberbooth/member/(?P<member_number>\d+)$"), "get_member_number_info"),
+    ("POST", re.compile(r"^/multiaccess/memberbooth/pin-login$"), "get_member_with_pin"),
+    ("POST", re.compile(r"^/multiaccess/memberbooth/label$"), "post_label"),
+]
+STATS_PATH = "/_standin/stats"
+
+
+class MemberDatabase(object):
+    '''
+    Members generated from a seed, so that a soak test can pick valid and invalid
+    tags and pin codes without asking the server. The first member is the one
+    the in-process mock answers with.
+    '''
+
+    def __init__(self, size: int = 1000, seed: int = 1, today: date | None = None) -> None:
+        rng = random.Random(seed)
+        today = today or date.today()
+        self.members: dict[int, dict[str, Any]] = {}
+        self.pin_codes: dict[int, str] = {}
+        self.tags: dict[str, int] = {}
+        self.member_tags: dict[int, str] = {}
+
+        first = mock_member_response["data"]
+        self._add(first, "1234")  # type: ignore
+        for member_number in range(1000, 1000 + size - 1):
+            tag = str(rng.randrange(10**8, 10**10))
+            while tag in self.tags:
+                tag = str(rng.randrange(10**8, 10**10))
+            membership_end = today + timedelta(days=rng.randint(-365, 365))
+            labaccess_end = today + timedelta(days=rng.randint(-180, 180))
+            self._add({
+                "firstname": rng.choice(FIRST_NAMES),
+                "lastname": rng.choice(LAST_NAMES),
+                "keys": [{"key_id": member_number, "rfid_tag": tag}],
+                "member_id": member_number,
+                "member_number": member_number,
+                "membership_data": {
+                    "effective_labaccess_active": labaccess_end >= today,
+                    "effective_labaccess_end": labaccess_end.isoformat(),
+                    "labaccess_active": labaccess_end >= today,
+                    "labaccess_end": labaccess_end.isoformat(),
+                    "membership_active": membership_end >= today,
+                    "membership_end": membership_end.isoformat(),
+                    "special_labaccess_active": False,
+                    "special_labaccess_end": None,
+                },
+                "permissions": [],
+            }, f"{rng.randrange(10000):04d}")
+
+    def _add(self, data: dict[str, Any], pin_code: str) -> None:
+        member_number = data["member_number"]
+        self.members[member_number] = data
+        self.pin_codes[member_number] = pin_code
+        for key in data["keys"]:
+            self.tags[str(key["rfid_tag"])] = member_number
+            self.member_tags[member_number] = str(key["rfid_tag"])
+
+    def response(self, member_number: int) -> dict[str, Any] | None:
+        data = self.members.get(member_number)
+        return None if data is None else dict(data=data, status="ok")
+
+
+class RateLimiter(object):
+    '''
+    Lets through at most rate requests per second on average, and burst at once.
+    Requests over the limit wait, like requests queueing in front of a busy backend.
+    '''
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.interval = 1 / rate
+        self.burst = burst
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Unused capacity is kept for at most burst requests
+            self._next = max(self._next, now - (self.burst - 1) * self.interval)
+            slot = self._next
+            self._next += self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class StandinStats(object):
+    def __init__(self) -> None:
+        self.connections = 0
+        self.requests: CountOf[tuple[str, int]] = CountOf()  # By endpoint and status
+        self.dropped = 0  # Connections closed without an answer, for injected network errors
+        self.abandoned = 0  # Answers the client did not wait for, e.g. after its timeout
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def connection_opened(self) -> int:
+        with self._lock:
+            self.connections += 1
+            return self.connections
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finished(self, endpoint: str, status: int | None, abandoned: bool = False) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.abandoned += abandoned
+            if status is None:
+                self.dropped += 1
+            else:
+                self.requests[(endpoint, status)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            total = sum(self.requests.values()) + self.dropped
+            return dict(connections=self.connections, requests=total, dropped=self.dropped, abandoned=self.abandoned,
+                        requests_per_connection=total / self.connections if self.connections else 0.0,
+                        max_in_flight=self.max_in_flight,
+                        by_endpoint={f"{endpoint} {status}": count for (endpoint, status), count in sorted(self.requests.items())})
+
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open, so that clients that reuse them can be told apart from clients that do not
+    protocol_version = "HTTP/1.1"
+    server: '_StandinHTTPServer'
+
+    def setup(self) -> None:
+        super().setup()
+        self.connection_id = self.server.standin.stats.connection_opened()
+
+    def do_GET(self) -> None:
+        self.server.standin.handle(self)
+
+    def do_POST(self) -> None:
+        self.server.standin.handle(self)
+
+    def send_json(self, status: int, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Requests are logged by MakerAdminStandin.handle, with their timings
+        pass
+
+
+class _StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    standin: 'MakerAdminStandin'
+
+
+class MakerAdminStandin(object):
+    '''
+    A local HTTP server with the makeradmin endpoints that MakerAdminClient uses,
+    so that the real client, with requests and JSON encoding, can be load and soak
+    tested without the real backend. Latency and failures come from a FaultInjector,
+    and max_rate and max_concurrent limit the throughput like a busy backend.
+    Every request is logged, and written as a JSON line to request_log if given.
+    '''
+
+    def __init__(self, port: int = 0, host: str = "127.0.0.1", token: str = "standin-token",
+                 database: MemberDatabase | None = None, faults: FaultInjector | None = None,
+                 max_rate: float | None = None, max_concurrent: int | None = None,
+                 request_log: str | None = None) -> None:
+        self.host = host
+        self.token = token
+        self.database = database or MemberDatabase()
+        self.faults = faults
+        self.rate_limiter = RateLimiter(max_rate, max(1, int(max_rate))) if max_rate else None
+        self.concurrency = threading.BoundedSemaphore(max_concurrent) if max_concurrent else None
+        self.stats = StandinStats()
+        self._request_log = open(request_log, "a") if request_log is not None else None
+        self._request_log_lock = threading.Lock()
+        self.server = _StandinHTTPServer((host, port), _StandinHandler)
+        self.server.standin = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="makeradmin-standin", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'MakerAdminStandin':
+        self.thread.start()
+        logger.info(f"Serving the makeradmin stand-in at {self.base_url} with {len(self.database.members)} members")
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._request_log is not None:
+            self._request_log.close()
+
+    def route(self, method: str, path: str) -> tuple[str, dict[str, str]] | None:
+        for route_method, pattern, endpoint in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                return endpoint, match.groupdict()
+        return None
+
+    def handle(self, request: _StandinHandler) -> None:
+        received = time.monotonic()
+        path = request.path.split("?")[0]
+        # Read even when it is not used, so that the next request on the connection starts at the right place
+        body = request.read_body()
+        if path == STATS_PATH:
+            request.send_json(200, self.stats.to_dict())
+            return
+
+        route = self.route(request.command, path)
+        endpoint = route[0] if route is not None else "unknown"
+        self.stats.started()
+        status: int | None = None
+        queued = 0.0
+        abandoned = False
+        try:
+            if self.concurrency is not None:
+                self.concurrency.acquire()
+            try:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.wait()
+                queued = time.monotonic() - received
+                status, data = self.answer(request, route, body)
+            finally:
+                if self.concurrency is not None:
+                    self.concurrency.release()
+            request.send_json(status, data)
+        except ConnectionError:
+            request.close_connection = True
+            abandoned = True
+        except InjectedNetworkError as e:
+            # Like a connection reset: no answer at all
+            request.close_connection = True
+            logger.debug(f"Dropping {request.command} {path}: {e}")
+        finally:
+            self.stats.finished(endpoint, status, abandoned)
+            self.log_request(request, endpoint, status, queued, time.monotonic() - received, abandoned)
+
+    def answer(self, request: _StandinHandler, route: tuple[str, dict[str, str]] | None, body: bytes) -> tuple[int, Any]:
+        if request.headers.get("Authorization") != f"Bearer {self.token}":
+            return 401, dict(message="Unauthorized", status="error")
+        if route is None:
+            return 404, dict(message="Not found", status="error")
+        endpoint, parameters = route
+
+        if self.faults is not None:
+            status = self.faults.request(endpoint)
+            if status >= 300:
+                return status, dict(message=f"Injected status {status}", status="error")
+
+        try:
+            return self.answer_endpoint(endpoint, parameters, json.loads(body) if body else None)
+        except (ValueError, KeyError, TypeError) as e:
+            # Not JSON, or without the fields the endpoint needs
+            return 400, dict(message=f"Bad request: {e!r}", status="error")
+
+    def answer_endpoint(self, endpoint: str, parameters: dict[str, str], body: Any) -> tuple[int, Any]:
+        if endpoint == "is_logged_in":
+            return 200, dict(data=["memberbooth"], status="ok")
+        if endpoint == "get_tag_info":
+            member_number = self.database.tags.get(parameters["tag"])
+            if member_number is None:
+                return 404, dict(data=None, status="error")
+            return 200, self.database.response(member_number)
+        if endpoint == "get_member_number_info":
+            member = self.database.response(int(parameters["member_number"]))
+            return (200, member) if member is not None else (404, dict(data=None, status="error"))
+        if endpoint == "get_member_with_pin":
+            member_number = int(body["member_number"])
+            if self.database.pin_codes.get(member_number) != body["pin_code"]:
+                return 404, dict(message="Wrong member number or pin code", status="error")
+            return 200, self.database.response(member_number)
+        if endpoint == "post_label":
+            label_id = body.get("id") if isinstance(body, dict) else None
+            data = dict(public_url=f"{self.base_url}/L/{label_id}", public_observation_url=f"{self.base_url}/L/{label_id}".upper(),
+                        label=body)
+            try:
+                decode_uploaded_label(data)
+            except Exception as e:
+                return 422, dict(message=f"Invalid label: {e}", status="error")
+            return 200, dict(data=data, status="ok")
+        raise AssertionError(f"No handler for {endpoint}")
+
+    def log_request(self, request: _StandinHandler, endpoint: str, status: int | None, queued: float, seconds: float,
+                    abandoned: bool) -> None:
+        logger.info(f"{request.command} {request.path} {status if status is not None else 'dropped'} "
+                    f"{seconds * 1000:.1f} ms (queued {queued * 1000:.1f} ms, connection {request.connection_id})"
+                    f"{', abandoned by the client' if abandoned else ''}")
+        if self._request_log is None:
+            return
+        entry = dict(ts=round(time.time(), 4), method=request.command, path=request.path, endpoint=endpoint, status=status,
+                     ms=round(seconds * 1000, 3), queued_ms=round(queued * 1000, 3), connection=request.connection_id,
+                     abandoned=abandoned)
+        with self._request_log_lock:
+            self._request_log.write(json.dumps(entry) + "\n")
+            self._request_log.flush()
+
+
+SOAK_OPERATIONS = ("tag", "pin", "member_number", "label", "is_logged_in")
+
+
+class SoakTest(object):
+    '''
+    Calls the real MakerAdminClient from a number of threads, with a mix of valid
+    and invalid tags and pin codes, and keeps the latency of every call. The
+    database must be generated with the same seed and size as the server's.
+    '''
+
+    def __init__(self, base_url: str, token: str, database: MemberDatabase, threads: int = 4, seed: int = 1,
+                 invalid_rate: float = 0.1, weights: dict[str, float] | None = None) -> None:
+        self.base_url = base_url
+        self.token = token
+        self.database = database
+        self.threads = threads
+        self.seed = seed
+        self.invalid_rate = invalid_rate
+        self.weights = weights or dict(tag=4, pin=2, member_number=2, label=1, is_logged_in=1)
+        self.member_numbers = list(database.members)
+        self.latencies: dict[str, list[float]] = {operation: [] for operation in SOAK_OPERATIONS}
+        self.errors: CountOf[tuple[str, str]] = CountOf()  # By operation and exception
+        self._lock = threading.Lock()
+
+    def client(self) -> MakerAdminClient:
+        return MakerAdminClient(self.base_url, token_path="/nonexistent", token=self.token)
+
+    def call(self, client: MakerAdminClient, operation: str, rng: random.Random) -> None:
+        member_number = rng.choice(self.member_numbers)
+        invalid = rng.random() < self.invalid_rate
+        if operation == "tag":
+            tag = "1" if invalid else self.database.member_tags[member_number]
+            client.get_tag_info(tag)
+        elif operation == "pin":
+            pin_code = "x" if invalid else self.database.pin_codes[member_number]
+            client.get_member_with_pin(member_number, pin_code)
+        elif operation == "member_number":
+            client.get_member_number_info(1 if invalid else member_number)
+        elif operation == "label":
+            member = Member.from_response(self.database.response(member_number))  # type: ignore
+            assert member is not None
+            client.post_label(label_data.BoxLabel.from_member(member))
+        else:
+            client.is_logged_in()
+
+    def _worker(self, index: int, stop: threading.Event) -> None:
+        rng = random.Random(self.seed * 1000 + index)
+        client = self.client()
+        operations, weights = zip(*self.weights.items())
+        while not stop.is_set():
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            try:
+                self.call(client, operation, rng)
+                error = None
+            except Exception as e:
+                error = type(e).__name__
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.latencies[operation].append(seconds)
+                if error is not None:
+                    self.errors[(operation, error)] += 1
+
+    def run(self, duration: float, report_interval: float | None = None,
+            report: Callable[['SoakTest'], None] | None = None) -> None:
+        stop = threading.Event()
+        workers = [threading.Thread(target=self._worker, args=(i, stop), name=f"soak-{i}", daemon=True)
+                   for i in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        end = time.monotonic() + duration
+        while (remaining := end - time.monotonic()) > 0:
+            time.sleep(min(remaining, report_interval or remaining))
+            if report is not None and time.monotonic() < end:
+                report(self)
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    def summary(self) -> list[dict[str, Any]]:
+        rows = []
+        with self._lock:
+            for operation, latencies in self.latencies.items():
+                if not latencies:
+                    continue
+                values = sorted(latencies)
+                rows.append(dict(operation=operation, count=len(values),
+                                 errors=sum(n for (o, _), n in self.errors.items() if o == operation),
+                                 p50=percentile(values, 50) * 1000, p95=percentile(values, 95) * 1000,
+                                 p99=percentile(values, 99) * 1000, max=values[-1] * 1000))
+        return rows
@@ -0,0 +1,278 @@
+import gc
+import json
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from collections import Counter as CountOf
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+from unittest import mock
+
+import config
+from src.backend import label_data
+from src.gui.event import Event, GuiEvent, MemberLoginData
+from src.gui.headless import HeadlessMaster, HeadlessScreen, HeadlessScreenManager
+from src.gui.states import Application, WaitingState
+from src.label import creator as label_creator
+from src.label import printer as label_printer
+from src.test.fault_injection import FaultInjector
+from src.test.makeradmin_mock import MakerAdminClient as MockedMakerAdminClient
+from src.test.slack_client_mock import MockSlackClient
+from src.util.key_reader import TagRead
+from src.util.logger import get_logger
+from src.util.slack_aggregator import SlackAggregator
+from src.util.tracing import percentile
+
+logger = get_logger()
+
+# A step is [action, *arguments]. The actions are the methods of SessionDriver called do_<action>.
+Script = list[list[Any]]
+
+LOGIN = ["login", "9999", "1234"]
+SCENARIOS: dict[str, Script] = {
+    "box_label": [LOGIN, ["print", "box"], ["logout"]],
+    "name_tag_twice": [LOGIN, ["print", "name_tag"], ["print", "name_tag"], ["logout"]],
+    "storage_label": [LOGIN, ["choose", "storage"], ["preview", "Half finished bookshelf"],
+                      ["describe", "Half finished bookshelf"], ["logout"]],
+    "rotating_label": [LOGIN, ["choose", "rotating"], ["describe", "Plywood offcuts"], ["logout"]],
+    "drying_label": [LOGIN, ["choose", "drying"], ["preview", 8], ["print", "drying", 8], ["logout"]],
+    "too_short_description": [LOGIN, ["choose", "storage"], ["describe", "abc"], ["cancel"], ["logout"]],
+    "timeout_while_editing": [LOGIN, ["choose", "storage"], ["timeout"]],
+    "tag_login": [["tag", "0123456789"], ["print", "fire_safety"], ["timeout"]],
+    "invalid_member_number": [["login", "abcd", "1234"]],
+}
+
+# Like the buttons of MemberInformation and DryingLabel
+LABEL_BUILDERS: dict[str, Callable[..., label_data.LabelType]] = {
+    "box": label_data.BoxLabel.from_member,
+    "fire_safety": lambda member: label_data.FireSafetyLabel.from_member(
+        member, (datetime.now() + timedelta(days=label_creator.FIRE_BOX_STORAGE_LENGTH)).date()),
+    "3d_printer": label_data.Printer3DLabel.from_member,
+    "meetup": label_data.MeetupNameTag.from_member,
+    "name_tag": label_data.NameTag.from_member,
+    "warning": lambda member: label_data.WarningLabel.from_member(member, None, (datetime.now() + timedelta(days=30)).date()),
+    "drying": lambda member, hours: label_data.DryingLabel.from_member(member, int(hours)),
+}
+CHOICES = {
+    "storage": GuiEvent.DRAW_STORAGE_LABEL_GUI,
+    "rotating": GuiEvent.DRAW_ROTATING_LABEL_GUI,
+    "drying": GuiEvent.DRAW_DRYING_LABEL_GUI,
+}
+LOGIN_SCREEN_ACTIONS = ("login", "tag", "wait")  # Steps that make sense on the login screen
+PRINTER_MODEL = "QL-800"
+TASK_POLL_PERIOD_MS = 1  # Finished tasks are picked up this soon, so that the latencies are not rounded up to the 50 ms of the GUI
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No /proc, e.g. on macOS. Only the peak is available there, in bytes.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@dataclass
+class MemorySample:
+    sessions: int
+    rss: int
+    traced: int | None
+    objects: int
+    threads: int
+    pending_callbacks: int
+
+
+class SessionDriver(object):
+    '''
+    Runs the states of the application without a display, with the screens and
+    the Tk main loop replaced by headless.py, and feeds them scripted sessions.
+    The time from each step until the application is idle again is kept per
+    transition, e.g. "WaitingState --login--> MemberIdentified". Labels are
+    converted for the printer but not sent to one.
+    '''
+
+    def __init__(self, makeradmin_client: Any = None, slack: SlackAggregator | None = None,
+                 step_timeout: float = config.print_timeout + 5, print_seconds: float = 0.0) -> None:
+        self.makeradmin_client = makeradmin_client or MockedMakerAdminClient()
+        self.slack = slack or SlackAggregator(MockSlackClient(config.slack_token_filename, None), start_timer=False)
+        self.step_timeout = step_timeout
+        self.print_seconds = print_seconds
+        self.master = HeadlessMaster()
+        self.application = Application(self.makeradmin_client, self.slack, master=self.master,  # type: ignore
+                                       screens=HeadlessScreenManager(self.master), task_poll_period_ms=TASK_POLL_PERIOD_MS)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.stuck: CountOf[str] = CountOf()
+        self.error_messages: CountOf[str] = CountOf()
+        self.sessions = 0
+        self.abandoned = 0  # Sessions that were back at the login screen before the script ended, e.g. after a failed login
+        self.memory: list[MemorySample] = []
+
+    @property
+    def screen(self) -> HeadlessScreen:
+        screen = self.application.screens.current
+        assert isinstance(screen, HeadlessScreen)
+        return screen
+
+    def idle(self) -> bool:
+        return not self.application.tasks.running and not self.master.due()
+
+    def start(self) -> None:
+        # The application starts by checking the makeradmin token once a second
+        if not self.master.run_until(lambda: isinstance(self.application.state, WaitingState), self.step_timeout):
+            raise RuntimeError(f"The application is still in {self.application.state} instead of logged in to makeradmin")
+
+    def close(self) -> None:
+        self.application.tasks.shutdown()
+        self.application.prerenderer.cancel()
+        self.application.tag_index.stop()
+        self.slack.close(timeout=1)
+        self.master.destroy()
+
+    def print_label(self, label: Any) -> dict[str, Any]:
+        '''
+        Does what printer.print_label does, except talking to the printer
+        '''
+        label_printer.convert_label(label_printer.resize_for_printer(label), PRINTER_MODEL)
+        time.sleep(self.print_seconds)
+        return dict(did_print=True, printer_state=dict(errors=[]))
+
+    def step(self, action: str, *arguments: Any) -> None:
+        before = str(self.application.state)
+        self.screen.error_messages = []
+        start = time.perf_counter()
+        getattr(self, f"do_{action}")(*arguments)
+        settled = self.master.run_until(self.idle, self.step_timeout)
+        seconds = time.perf_counter() - start
+
+        transition = f"{before} --{action}--> {self.application.state}"
+        self.latencies[transition].append(seconds)
+        if not settled:
+            logger.warning(f"The application was not idle {self.step_timeout} s after {transition}")
+            self.stuck[transition] += 1
+        for message in self.screen.error_messages:
+            self.error_messages[message] += 1
+
+    def run_session(self, script: Script) -> None:
+        for i, (action, *arguments) in enumerate(script):
+            if i > 0 and isinstance(self.application.state, WaitingState) and action not in LOGIN_SCREEN_ACTIONS:
+                self.abandoned += 1
+                break
+            self.step(action, *arguments)
+        # Whatever the script did, the next session starts from the login screen
+        for _ in range(3):
+            if isinstance(self.application.state, WaitingState):
+                break
+            self.step("timeout")
+        self.sessions += 1
+
+    def run(self, scripts: dict[str, Script], sessions: int, seed: int | None = None, sample_every: int = 100,
+            trace_memory: bool = False, progress: Callable[['SessionDriver'], None] | None = None) -> None:
+        '''
+        Runs sessions scripts, picked at random with seed, or in turn if seed is None
+        '''
+        names = list(scripts)
+        rng = random.Random(seed)
+        if trace_memory:
+            tracemalloc.start()
+        with mock.patch.object(config, "no_printer", False), \
+                mock.patch.object(label_printer, "print_label", self.print_label):
+            self.start()
+            self.sample_memory()
+            for i in range(sessions):
+                name = rng.choice(names) if seed is not None else names[i % len(names)]
+                self.run_session(scripts[name])
+                if self.sessions % sample_every == 0:
+                    self.sample_memory()
+                    if progress is not None:
+                        progress(self)
+
+    def sample_memory(self) -> MemorySample:
+        gc.collect()
+        sample = MemorySample(self.sessions, rss_bytes(), tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+                              len(gc.get_objects()), threading.active_count(), self.master.pending())
+        self.memory.append(sample)
+        return sample
+
+    def summary(self) -> list[dict[str, Any]]:
+        rows = []
+        for transition, latencies in sorted(self.latencies.items()):
+            values = sorted(latencies)
+            rows.append(dict(transition=transition, count=len(values), stuck=self.stuck[transition],
+                             p50=percentile(values, 50) * 1000, p95=percentile(values, 95) * 1000,
+                             p99=percentile(values, 99) * 1000, max=values[-1] * 1000))
+        return rows
+
+    def do_login(self, member_number: str, pin_code: str) -> None:
+        self.screen.gui_callback(GuiEvent(GuiEvent.LOGIN, MemberLoginData(str(member_number), str(pin_code))))
+
+    def do_tag(self, tag_id: str) -> None:
+        self.application.on_event(Event(Event.TAG_READ, TagRead(str(tag_id), "headless", time.time())))
+
+    def do_choose(self, choice: str) -> None:
+        self.screen.gui_callback(GuiEvent(CHOICES[choice]))
+
+    def do_print(self, kind: str, *arguments: Any) -> None:
+        member = self.application.state.member
+        assert member is not None, f"Can not print in {self.application.state}"
+        self.screen.gui_callback(GuiEvent(GuiEvent.PRINT_LABEL, LABEL_BUILDERS[kind](member, *arguments)))
+
+    def do_preview(self, data: Any) -> None:
+        self.screen.gui_callback(GuiEvent(GuiEvent.PREVIEW_LABEL, data))
+
+    def do_describe(self, description: str) -> None:
+        self.screen.gui_callback(GuiEvent(GuiEvent.ENTERED_DESCRIPTION, description))
+
+    def do_cancel(self) -> None:
+        self.screen.gui_callback(GuiEvent(GuiEvent.CANCEL))
+
+    def do_logout(self) -> None:
+        self.screen.gui_callback(GuiEvent(GuiEvent.LOG_OUT))
+
+    def do_timeout(self) -> None:
+        # Like GuiTemplate.timeout_timer_expired
+        screen = self.screen
+        self.master.after_idle(lambda: screen.gui_callback(GuiEvent(GuiEvent.TIMEOUT_TIMER_EXPIRED)))
+
+    def do_wait(self, seconds: float) -> None:
+        self.master.run_until(lambda: False, float(seconds))
+
+
+def load_scripts(path: str) -> dict[str, Script]:
+    '''
+    A JSON object of scripts by name, in the format of SCENARIOS
+    '''
+    with open(path) as f:
+        scripts = json.load(f)
+    for name, script in scripts.items():
+        for action, *_ in script:
+            if not hasattr(SessionDriver, f"do_{action}"):
+                raise ValueError(f"Unknown action '{action}' in script {name}")
+    return scripts
+
+
+def memory_growth(samples: list[MemorySample]) -> Iterator[tuple[str, float]]:
+    '''
+    Growth per 1000 sessions from the second sample, after the first sessions warmed up caches, to the last
+    '''
+    if len(samples) < 3:
+        return
+    first, last = samples[1], samples[-1]
+    per_thousand = 1000 / (last.sessions - first.sessions)
+    yield "rss MB", (last.rss - first.rss) / 2**20 * per_thousand
+    if first.traced is not None and last.traced is not None:
+        yield "traced MB", (last.traced - first.traced) / 2**20 * per_thousand
+    yield "objects", (last.objects - first.objects) * per_thousand
+    yield "threads", (last.threads - first.threads) * per_thousand
+    yield "pending callbacks", (last.pending_callbacks - first.pending_callbacks) * per_thousand
+
+
+def create_driver(makeradmin_faults: FaultInjector | None = None, slack_faults: FaultInjector | None = None,
+                  **kwargs: Any) -> SessionDriver:
+    makeradmin_client = MockedMakerAdminClient(faults=makeradmin_faults)
+    slack = SlackAggregator(MockSlackClient(config.slack_token_filename, None, faults=slack_faults), start_timer=False)
+    return SessionDriver(makeradmin_client, slack, **kwargs)
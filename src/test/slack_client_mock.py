@@ -1,14 +1,34 @@
+from src.test.fault_injection import FaultInjector, InjectedNetworkError
 from src.util.logger import get_logger
-from src.util.slack_client import SlackClient
+from src.util.slack_client import SlackClient, SlackDispatcher, SlackTokenExpiredError
 
 logger = get_logger()
 
 
 class MockSlackClient(SlackClient):
-    def __init__(self, token_path: str, channel_id: str | None, token: str | None = None) -> None:
+    def __init__(self, token_path: str, channel_id: str | None, token: str | None = None, max_queue_size: int = 100,
+                 faults: FaultInjector | None = None) -> None:
         self.token_path = token_path
         self.channel_id = channel_id or "<no-channel>"
         self.token = None
+        self.faults = faults
+        self.dispatcher = SlackDispatcher(self._send_message, max_queue_size)
 
-    def post_message(self, msg: str) -> None:
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def _post_message(self, msg: str) -> None:
+        if self.faults is not None:
+            # Fails the same ways as the real client
+            try:
+                status = self.faults.request("chat.postMessage")
+            except InjectedNetworkError as e:
+                logger.error(f"Could not connect to Slack backend: {e}")
+                return
+            if status == 401:
+                raise SlackTokenExpiredError("invalid_auth (injected)")
+            if status >= 300:
+                logger.error(f"Slack error, response = injected status {status}")
+                return
         logger.debug(f"Slack: '{msg}'")
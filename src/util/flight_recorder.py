@@ -0,0 +1,118 @@
+import json
+import logging
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import config
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+# (time, thread, kind, what, data). Tuples are cheap to create, the formatting is done when dumping.
+Entry = tuple[float, str, str, str, Any]
+
+
+class FlightRecorder(object):
+    '''
+    Keeps the last capacity state changes, GUI events, spans and debug messages
+    in memory, and writes them to a file only when something went wrong. This
+    gives the context of rare failures without writing it all to the log file.
+    '''
+
+    def __init__(self, capacity: int = config.flight_recorder_capacity,
+                 min_dump_interval: float = config.flight_recorder_min_dump_interval,
+                 max_dumps: int = config.flight_recorder_max_dumps) -> None:
+        self.min_dump_interval = min_dump_interval
+        self.max_dumps = max_dumps
+        # Appending to a deque is thread safe, so recording takes no lock
+        self._entries: deque[Entry] = deque(maxlen=capacity)
+        self._last_dump = float("-inf")
+        self._dump_lock = threading.Lock()
+
+    def record(self, kind: str, what: str, data: Any = None) -> None:
+        self._entries.append((time.time(), threading.current_thread().name, kind, what, data))
+
+    def entries(self) -> list[Entry]:
+        return list(self._entries)
+
+    def dump_path(self) -> Path:
+        return Path(f"{config.logger_name}_flight_{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.jsonl")
+
+    def dump(self, reason: str, force: bool = False, wait: bool = False) -> Path | None:
+        '''
+        Writes the recorded entries to a new file from a background thread. Dumps
+        closer than min_dump_interval apart are skipped unless forced, so that a
+        failure that repeats every second does not fill the disk.
+        '''
+        now = time.monotonic()
+        with self._dump_lock:
+            if not force and now - self._last_dump < self.min_dump_interval:
+                return None
+            self._last_dump = now
+
+        entries = self.entries()
+        path = self.dump_path()
+        thread = threading.Thread(target=self._write, args=(path, reason, entries), name="flight-recorder", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return path
+
+    def _write(self, path: Path, reason: str, entries: list[Entry]) -> None:
+        try:
+            with open(path, "w") as f:
+                f.write(json.dumps(dict(reason=reason, dumped=time.time(), entries=len(entries))) + "\n")
+                for ts, thread, kind, what, data in entries:
+                    entry: dict[str, Any] = dict(ts=round(ts, 4), thread=thread, kind=kind, what=what)
+                    if data is not None:
+                        entry["data"] = data
+                    f.write(json.dumps(entry, default=str) + "\n")
+            for old in sorted(path.parent.glob(Path(config.logger_name).name + "_flight_*.jsonl"))[:-self.max_dumps]:
+                old.unlink()
+        except OSError as e:
+            # Not logger.exception, which would trigger another dump
+            logger.error(f"Could not write the flight recorder to {path}: {e}")
+            return
+        logger.warning(f"Wrote the last {len(entries)} flight recorder entries to {path}. Reason: {reason}")
+
+
+class FlightRecorderHandler(logging.Handler):
+    '''
+    Records every log message, and dumps the recorder when an exception is logged
+    '''
+
+    def __init__(self, recorder: FlightRecorder) -> None:
+        super().__init__(logging.DEBUG)
+        self.recorder = recorder
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.recorder.record("log", record.levelname, record.getMessage())
+        except Exception:
+            self.handleError(record)
+            return
+        if record.exc_info is not None and record.levelno >= logging.ERROR:
+            exc_type = record.exc_info[0]
+            self.recorder.dump(f"{exc_type.__name__ if exc_type else 'Exception'} logged: {record.getMessage()}")
+
+
+recorder = FlightRecorder()
+
+
+def record(kind: str, what: str, data: Any = None) -> None:
+    recorder.record(kind, what, data)
+
+
+def init_flight_recorder(dump_signal: int | None = getattr(signal, "SIGUSR1", None)) -> None:
+    '''
+    Records the log messages of the application, and dumps the recorder on
+    dump_signal, e.g. `kill -USR1 <pid>`. Must be called from the main thread.
+    '''
+    logging.getLogger(config.logger_name).addHandler(FlightRecorderHandler(recorder))
+    if dump_signal is not None:
+        signal.signal(dump_signal, lambda signum, frame: recorder.dump(f"Signal {signal.Signals(signum).name}", force=True))
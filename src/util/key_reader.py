@@ -1,13 +1,22 @@
-from config import LIST_ARDUINO_SERIAL_DEVICES_PATH
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
 from src.util.logger import get_logger
 from .parser import ArgparseEnum
-import subprocess
+import os
+import queue
 import serial
 import re
-import termios
+import threading
+import time
 
 logger = get_logger()
 
+TAG_LINE_PATTERN = re.compile(r"^DECODED: MANCHESTER=(0x[a-fA-F0-9]{10})$")
+ARDUINO_VENDOR_IDS = {"2341"}
+SYSFS_ROOT = "/sys"
+
 
 class InputMethods(ArgparseEnum):
     EM4100 = "EM4100"
@@ -15,6 +24,11 @@ class InputMethods(ArgparseEnum):
     KEYBOARD = "Keyboard"
 
 
+class ReaderState(Enum):
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+
+
 class NoReaderFound(OSError):
     pass
 
@@ -27,6 +41,92 @@ class KeyReaderNeedsRebootError(IOError):
     pass
 
 
+def aptus_tag_id(tag_id: str) -> str:
+    aptus_tag_number = int(tag_id, 16) % int(1e9)
+    return f"{aptus_tag_number:09}"
+
+
+@dataclass(frozen=True)
+class TagRead:
+    tag_id: str
+    device: str
+    timestamp: float
+
+    @property
+    def aptus_tag_id(self) -> str:
+        return aptus_tag_id(self.tag_id)
+
+
+class LineFramer(object):
+    '''
+    Splits a stream of bytes into lines. Incomplete lines are kept until the rest
+    of the line arrives, so a line split over two reads is not lost.
+    '''
+
+    def __init__(self, max_line_length: int = 1024) -> None:
+        self.max_line_length = max_line_length
+        self._buffer = b""
+
+    def feed(self, data: bytes) -> list[str]:
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+        if len(self._buffer) > self.max_line_length:
+            # Garbage without line breaks, e.g. wrong baudrate. Don't grow forever.
+            self._buffer = b""
+        return [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in lines]
+
+
+def _read_sysfs_attribute(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_uevent(path: str) -> dict[str, str]:
+    uevent = _read_sysfs_attribute(os.path.join(path, "uevent")) or ""
+    return dict(line.split("=", 1) for line in uevent.splitlines() if "=" in line)
+
+
+def find_usb_serial_devices(vendor_ids: set[str] = ARDUINO_VENDOR_IDS, sysfs_root: str = SYSFS_ROOT) -> list[str]:
+    '''
+    Finds the device nodes of USB devices from the given vendors by reading the
+    sysfs USB tree, the same information udevadm would report.
+    '''
+    usb_devices = os.path.join(sysfs_root, "bus", "usb", "devices")
+    try:
+        buses = sorted(name for name in os.listdir(usb_devices) if name.startswith("usb"))
+    except OSError:
+        logger.warning(f"Could not list USB devices in {usb_devices}")
+        return []
+
+    devices = []
+    for bus in buses:
+        bus_path = os.path.realpath(os.path.join(usb_devices, bus))
+        for path, dirs, files in os.walk(bus_path):
+            dirs.sort()
+            if "dev" not in files:
+                continue
+            devname = _read_uevent(path).get("DEVNAME")
+            if devname is None or devname.startswith("bus/"):
+                continue
+
+            # The vendor is an attribute of the USB device, which is a parent of the tty
+            parent = path
+            vendor_id = None
+            while vendor_id is None and parent.startswith(bus_path):
+                vendor_id = _read_sysfs_attribute(os.path.join(parent, "idVendor"))
+                parent = os.path.dirname(parent)
+            if vendor_id in vendor_ids:
+                devices.append(os.path.join("/dev", devname))
+    return devices
+
+
+def parse_tag_line(line: str) -> str | None:
+    match = TAG_LINE_PATTERN.match(line)
+    return match.group(1) if match is not None else None
+
+
 def abstract(fun):
     def abstract_wrapper(*args, **kwargs):
         raise NotImplementedError("This is only an abstract function")
@@ -50,6 +150,12 @@ class KeyReader(object):
     def close(self):
         pass
 
+    def start_reader(self, tag_queue: 'queue.Queue[TagRead]') -> None:
+        pass
+
+    def stop_reader(self) -> None:
+        pass
+
     @classmethod
     def get_reader(cls):
         key_readers = cls.get_devices()
@@ -81,7 +187,12 @@ class EM4100(KeyReader):
         com.readline()  # Just wait until it starts up and starts printing something (hopefully less than 2 second timeout)
         com.timeout = 0
         self.check_echo()
-        self.last_tag_id = None
+        self._device_node = self._stat_device_node()
+        self.read_error: Exception | None = None
+        self.last_tag_id: str | None = None
+        self.framer = LineFramer()
+        self._reader_thread: threading.Thread | None = None
+        self._stop_reader = threading.Event()
 
     def __repr__(self):
         return f"<EM4100 Key Reader tty={self.serial_device}>"
@@ -89,38 +200,79 @@ class EM4100(KeyReader):
     def flush(self):
         self.com.reset_input_buffer()
 
-    def is_open(self):
+    def _stat_device_node(self) -> tuple[int, int] | None:
         try:
-            test_com = serial.Serial(port=self.com.name, baudrate=self.com.baudrate, timeout=0)
-            test_com.close()
-            return self.com.isOpen()
-        except (serial.SerialException, termios.error):
+            st = os.stat(self.serial_device)
+        except OSError:
+            return None
+        return st.st_rdev, st.st_ino
+
+    def is_open(self):
+        '''
+        Checks that the reader is still connected without opening the serial port
+        again, since that resets the Arduino. A reader that is unplugged and plugged
+        in again gets a new device node, even if it has the same name.
+        '''
+        if not self.com.is_open or self.read_error is not None:
             return False
+        return self._device_node is not None and self._stat_device_node() == self._device_node
 
     def close(self):
+        self.stop_reader()
         self.com.close()
 
+    def _read_tags(self, data: bytes) -> list[str]:
+        return [tag_id for tag_id in map(parse_tag_line, self.framer.feed(data)) if tag_id is not None]
+
     def tag_was_read(self):
         try:
             if self.com.in_waiting == 0:
                 return False
-        except OSError:
+            data = self.com.read(self.com.in_waiting)
+        except OSError as e:
+            self.read_error = e
             raise KeyReaderNeedsRebootError("The key reader has been disconnected")
-        lines = self.com.read(self.com.in_waiting).decode("utf-8").split("\r\n")
-        complete_readouts = []
-        for line in lines:
-            match = re.match(r"^DECODED: MANCHESTER=(0x[a-fA-F0-9]{10})$", line)
-            if match is not None:
-                complete_readouts.append(match.group(1))
-        if len(complete_readouts) == 0:
+        tag_ids = self._read_tags(data)
+        if len(tag_ids) == 0:
             return False
-        self.last_tag_id = complete_readouts[-1]
+        self.last_tag_id = tag_ids[-1]
         return True
 
     def get_aptus_tag_id(self):
-        aptus_tag_number = int(self.last_tag_id, 16) % int(1e9)
-        aptus_tag_id = f"{aptus_tag_number:09}"
-        return aptus_tag_id
+        return aptus_tag_id(self.last_tag_id)
+
+    def start_reader(self, tag_queue: 'queue.Queue[TagRead]', read_timeout: float = 0.5) -> None:
+        '''
+        Starts a thread that blocks on the serial port and puts every tag that is
+        read on tag_queue. Use this instead of polling tag_was_read.
+        '''
+        if self._reader_thread is not None:
+            return
+        self.com.timeout = read_timeout
+        self._stop_reader.clear()
+        self._reader_thread = threading.Thread(target=self._run_reader, args=(tag_queue,), name=f"key-reader-{self.serial_device}", daemon=True)
+        self._reader_thread.start()
+
+    def stop_reader(self) -> None:
+        if self._reader_thread is None:
+            return
+        self._stop_reader.set()
+        if self._reader_thread is not threading.current_thread():
+            self._reader_thread.join()
+        self._reader_thread = None
+
+    def _run_reader(self, tag_queue: 'queue.Queue[TagRead]') -> None:
+        while not self._stop_reader.is_set():
+            try:
+                # Blocks until at least one byte arrives or the timeout passes
+                data = self.com.read(max(1, self.com.in_waiting))
+            except (OSError, serial.SerialException, TypeError) as e:
+                logger.exception(f"Reading from {self} failed. The key reader has probably been disconnected.")
+                self.read_error = e
+                return
+            for tag_id in self._read_tags(data):
+                self.last_tag_id = tag_id
+                tag_queue.put(TagRead(tag_id, self.serial_device, time.monotonic()))
 
     def check_echo(self):
         com = self.com
@@ -139,18 +291,122 @@ class EM4100(KeyReader):
         com.timeout = previous_timeout
 
     @classmethod
-    def get_devices(cls):
-        output = subprocess.check_output(LIST_ARDUINO_SERIAL_DEVICES_PATH).decode("utf-8")
-        devices = [dev for dev in output.split("\n") if len(dev) > 0]
+    def get_devices(cls, sysfs_root: str = SYSFS_ROOT, probe_timeout: float = 5):
+        '''
+        Probes all Arduinos at the same time, since each one takes a couple of
+        seconds to reset after its port is opened
+        '''
+        devices = find_usb_serial_devices(ARDUINO_VENDOR_IDS, sysfs_root)
+        if len(devices) == 0:
+            return []
+
         key_readers = []
-        for dev in devices:
+        executor = ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix="key-reader-probe")
+        futures = {dev: executor.submit(cls, dev) for dev in devices}
+        deadline = time.monotonic() + probe_timeout
+        for dev, future in futures.items():
             try:
-                key_readers.append(cls(dev))
-            except KeyReaderInitError as e:
-                logger.info(f"Could not initialize {dev} as {cls}. {e}")
+                key_readers.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+            except TimeoutError:
+                logger.warning(f"Timed out probing {dev} as {cls.__name__}")
+                future.add_done_callback(cls._close_late_reader)
+            except (KeyReaderInitError, KeyReaderNeedsRebootError) as e:
+                logger.info(f"Could not initialize {dev} as {cls.__name__}. {e}")
+        executor.shutdown(wait=False)
 
         return key_readers
 
+    @staticmethod
+    def _close_late_reader(future: Future) -> None:
+        if future.exception() is None:
+            future.result().close()
+
+
+class KeyReaderMonitor(object):
+    '''
+    Keeps a key reader connected. The reader is checked every check_period
+    seconds with KeyReader.is_open, which does not touch the serial port. When it
+    has been disconnected, connect() is called to find it again, with the delay
+    between attempts doubling up to max_backoff seconds.
+    on_state_change is called from the monitor thread once per state change.
+    '''
+
+    def __init__(self, connect: Callable[[], KeyReader], key_reader: KeyReader | None = None,
+                 check_period: float = 1.0, min_backoff: float = 1.0, max_backoff: float = 60.0) -> None:
+        self.connect = connect
+        self.key_reader = key_reader
+        self.check_period = check_period
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.tag_queue: queue.Queue[TagRead] = queue.Queue()
+        self.state = ReaderState.CONNECTED if key_reader is not None else ReaderState.DISCONNECTED
+        self.on_state_change: Callable[[ReaderState, KeyReader | None], None] | None = None
+        self._backoff = min_backoff
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _set_state(self, state: ReaderState) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        logger.info(f"Key reader is {state.value}: {self.key_reader}")
+        if self.on_state_change is not None:
+            self.on_state_change(state, self.key_reader)
+
+    def check(self) -> float:
+        '''
+        Checks the reader, or tries to connect to it. Returns the number of seconds
+        until the next check.
+        '''
+        if self.key_reader is not None:
+            if self.key_reader.is_open():
+                return self.check_period
+            logger.warning(f"Lost connection to {self.key_reader}")
+            self.key_reader.close()
+            self.key_reader = None
+            self._backoff = self.min_backoff
+            self._set_state(ReaderState.DISCONNECTED)
+
+        try:
+            key_reader = self.connect()
+        except OSError as e:
+            delay = self._backoff
+            self._backoff = min(2 * self._backoff, self.max_backoff)
+            logger.info(f"Could not connect to the key reader, retrying in {delay:.0f} s: {e!r}")
+            return delay
+
+        self.key_reader = key_reader
+        key_reader.start_reader(self.tag_queue)
+        self._backoff = self.min_backoff
+        self._set_state(ReaderState.CONNECTED)
+        return self.check_period
+
+    def _run(self) -> None:
+        delay = 0.0 if self.key_reader is None else self.check_period
+        while not self._stop.wait(delay):
+            try:
+                delay = self.check()
+            except Exception:
+                logger.exception("Key reader check failed")
+                delay = self.max_backoff
+
+    def start(self, on_state_change: Callable[[ReaderState, KeyReader | None], None] | None = None) -> None:
+        self.on_state_change = on_state_change
+        if self.key_reader is not None:
+            self.key_reader.start_reader(self.tag_queue)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="key-reader-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.key_reader is not None:
+            self.key_reader.close()
+
 
 class Aptus(KeyReader):
     @classmethod
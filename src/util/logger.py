@@ -1,32 +1,110 @@
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
+import queue
 import sys
+from datetime import datetime
 import config
 from colors import color
 
+LOG_FORMATS = ("plain", "json")
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
 
-def init_logger(logger_name: str | None = None) -> None:
+PLAIN_FORMAT = "%(asctime)s %(levelname)s [%(pathname)s:%(lineno)d]: %(message)s"
+COLOR_FORMAT = (f"{color('%(asctime)s', fg='blue')} %(levelname)s "
+                f"[{color('%(pathname)s', fg='cyan')}:{color('%(lineno)d', fg='magenta')}]: %(message)s")
+
+_listeners: list[logging.handlers.QueueListener] = []
+
+
+class JsonFormatter(logging.Formatter):
+    '''
+    One JSON object per line, for log files that are read by other programs
+    '''
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "path": record.pathname,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() merges the traceback into the message, which would
+        # end up inside the message field of JSON logs. Keep it in exc_text instead.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def start_queue_listener(logger: logging.Logger, *handlers: logging.Handler) -> logging.handlers.QueueListener:
+    '''
+    Makes logger put its records on a queue, and writes them to handlers from a
+    background thread. Logging on the Tk thread then never waits for the disk.
+    Each handler keeps its own level.
+    '''
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    logger.addHandler(_QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def stop_queue_listener(listener: logging.handlers.QueueListener) -> None:
+    '''
+    Writes the records that are still queued and stops the listener thread
+    '''
+    if listener in _listeners:
+        _listeners.remove(listener)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def stop_listeners() -> None:
+    while _listeners:
+        stop_queue_listener(_listeners[-1])
+
+
+atexit.register(stop_listeners)
+
+
+def init_logger(logger_name: str | None = None, log_format: str = "plain",
+                file_level: int | str = logging.DEBUG, stderr_level: int | str = logging.WARNING) -> None:
     if logger_name:
         config.logger_name = logger_name
     logger = logging.getLogger(config.logger_name)
-    timestr = color("%(asctime)s", fg="blue")
-    levelstr = "%(levelname)s"
-    pathstr = color("%(pathname)s", fg="cyan")
-    linestr = color("%(lineno)d", fg="magenta")
-    msgstr = "%(message)s"
-    formatter = logging.Formatter(f"{timestr} {levelstr} [{pathstr}:{linestr}]: {msgstr}")
-
-    # Logger to file with rotating backups and high verbosity
-    fh = logging.handlers.RotatingFileHandler(config.logger_name + ".log", maxBytes=10**6, backupCount=5)
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-
-    # Logger to stderr
+
+    # Logger to file with rotating backups and high verbosity. Never colored, so that it can be grepped.
+    extension = ".jsonl" if log_format == "json" else ".log"
+    fh = logging.handlers.RotatingFileHandler(config.logger_name + extension, maxBytes=10**6, backupCount=5)
+    fh.setLevel(file_level)
+    fh.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(PLAIN_FORMAT))
+
+    # Logger to stderr, colored if someone is watching
     sh = logging.StreamHandler(sys.stderr)
-    sh.setLevel(logging.WARNING)
-    sh.setFormatter(formatter)
-    logger.addHandler(sh)
+    sh.setLevel(stderr_level)
+    sh.setFormatter(logging.Formatter(COLOR_FORMAT if sys.stderr.isatty() else PLAIN_FORMAT))
+
+    start_queue_listener(logger, fh, sh)
 
 
 def get_logger() -> logging.Logger:
@@ -0,0 +1,229 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+
+import config
+from src.util.logger import get_logger
+
+logger = get_logger()
+
+LabelValues = tuple[str, ...]
+
+# Seconds. Covers everything from a cached label render to a printer that is warming up.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_metrics: list['Metric'] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(object):
+    '''
+    A metric in the Prometheus text format. Every metric that is created is
+    exposed by render(), so metrics are created once, at module level.
+    '''
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def _label_values(self, labels: dict[str, str]) -> LabelValues:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"{self.name} takes the labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _format_labels(self, values: LabelValues, extra: dict[str, str] = {}) -> str:
+        pairs = list(zip(self.labels, values)) + list(extra.items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines) + "\n"
+
+
+class _ValueMetric(Metric):
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], dict[LabelValues, float]] | None = None
+
+    def set_function(self, function: Callable[[], float | dict[LabelValues, float]]) -> None:
+        '''
+        Reads the value from function every time the metric is scraped, for values
+        that some other object keeps track of anyway, e.g. the length of a queue.
+        Metrics with labels get a dict from tuples of label values to values.
+        '''
+        def values() -> dict[LabelValues, float]:
+            value = function()
+            return value if isinstance(value, dict) else {(): value}
+        self._function = values
+
+    def get(self, **labels: str) -> float:
+        values = self._function() if self._function is not None else self._values
+        return values.get(self._label_values(labels), 0)
+
+    def samples(self) -> Iterator[str]:
+        if self._function is not None:
+            try:
+                values = self._function()
+            except Exception:
+                logger.exception(f"Could not read the value of {self.name}")
+                return
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield f"{self.name}{self._format_labels(label_values)} {_format_value(value)}"
+
+
+class Counter(_ValueMetric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for i, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        '''
+        Observes how many seconds the block took, also when it raises
+        '''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return self._counts.get(self._label_values(labels), [0])[-1]
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+        for label_values, bucket_counts in sorted(counts.items()):
+            for upper_bound, count in zip(self.buckets, bucket_counts):
+                labels = self._format_labels(label_values, {"le": _format_value(upper_bound)})
+                yield f"{self.name}_bucket{labels} {count}"
+            yield f"{self.name}_sum{self._format_labels(label_values)} {_format_value(sums[label_values])}"
+            yield f"{self.name}_count{self._format_labels(label_values)} {bucket_counts[-1]}"
+
+
+def render() -> str:
+    return "".join(metric.render() for metric in list(_metrics))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Scrapes every few seconds would drown the log
+        pass
+
+
+class MetricsServer(object):
+    '''
+    Serves the metrics at /metrics from a background thread
+    '''
+
+    def __init__(self, port: int, host: str = config.metrics_host) -> None:
+        self.host = host
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> 'MetricsServer':
+        self.thread.start()
+        logger.info(f"Serving metrics at http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+LOGINS = Counter("memberbooth_logins_total", "Login attempts by method (pin, tag or tag_index) and outcome",
+                 ("method", "outcome"))
+PRINTS = Counter("memberbooth_prints_total", "Labels printed, or saved to a file with --no-printer", ("label_type",))
+PRINT_ERRORS = Counter("memberbooth_print_errors_total", "Labels that could not be printed, by reason", ("reason",))
+BACKEND_REQUEST_SECONDS = Histogram("memberbooth_backend_request_seconds", "Time of requests to makeradmin",
+                                    ("endpoint", "status"))
+RENDER_SECONDS = Histogram("memberbooth_label_render_seconds", "Time to render a label for printing, short when it was pre-rendered",
+                           ("label_type",))
+PRERENDERED_LABELS = Counter("memberbooth_prerendered_labels_total",
+                             "Printed labels of the pre-rendered types, by whether a pre-rendered label could be used",
+                             ("result",))
+TEXT_FIT_CACHE = Counter("memberbooth_text_fit_cache_total", "Lookups in the cache of fitted label texts", ("result",))
+GUI_STALL_SECONDS = Histogram("memberbooth_gui_stall_seconds", "Times the Tk main loop was blocked for longer than the stall threshold",
+                              buckets=(1, 2, 5, 10, 30, 60))
+SLACK_QUEUE_DEPTH = Gauge("memberbooth_slack_queue_depth", "Slack messages waiting to be sent")
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable
+import config
+from src.util.logger import get_logger
+from src.util.slack_client import SlackClient
+
+logger = get_logger()
+
+
+def _format_duration(seconds: float) -> str:
+    # Short windows, and digests that are forced early, would otherwise read "0 min"
+    if seconds < 60:
+        return f"{max(round(seconds), 1)} s"
+    return f"{round(seconds / 60)} min"
+
+
+@dataclass
+class RepeatedError:
+    first_seen: float
+    repeats: int = 0
+
+
+class SlackAggregator(object):
+    '''
+    Sits in front of a SlackClient to keep the channel readable:
+    * Alerts and info messages are posted right away.
+    * An error is posted the first time it happens. Identical errors within
+      error_window seconds are only counted, and posted as one message with the
+      count when the window ends.
+    * Printed labels are counted per label type and posted as a digest every
+      digest_interval seconds.
+    '''
+
+    def __init__(self, slack_client: SlackClient, error_window: float = config.slack_error_window,
+                 digest_interval: float = config.slack_digest_interval, clock: Callable[[], float] = time.monotonic,
+                 start_timer: bool = True) -> None:
+        self.slack_client = slack_client
+        self.error_window = error_window
+        self.digest_interval = digest_interval
+        self.clock = clock
+        self._errors: dict[str, RepeatedError] = {}
+        self._printed: Counter[str] = Counter()
+        self._digest_started = clock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._timer: threading.Thread | None = None
+        if start_timer:
+            self._timer = threading.Thread(target=self._run_timer, name="slack-aggregator", daemon=True)
+            self._timer.start()
+
+    def _run_timer(self) -> None:
+        tick = max(min(self.error_window, self.digest_interval) / 10, 0.1)
+        while not self._stop.wait(tick):
+            self.flush_due()
+
+    def post_message_info(self, msg: str) -> None:
+        self.slack_client.post_message_info(msg)
+
+    def post_message_alert(self, msg: str) -> None:
+        self.slack_client.post_message_alert(msg)
+
+    def post_message_error(self, msg: str) -> None:
+        now = self.clock()
+        with self._lock:
+            previous = self._errors.get(msg)
+            if previous is not None and now - previous.first_seen < self.error_window:
+                previous.repeats += 1
+                return
+            self._errors[msg] = RepeatedError(now)
+
+        if previous is not None and previous.repeats > 0:
+            self._post_repeated_error(msg, previous)
+        self.slack_client.post_message_error(msg)
+
+    def post_label_printed(self, label_type: str) -> None:
+        with self._lock:
+            self._printed[label_type] += 1
+
+    def _post_repeated_error(self, msg: str, error: RepeatedError) -> None:
+        self.slack_client.post_message_error(f"{msg} ×{error.repeats + 1} in the last {_format_duration(self.error_window)}")
+
+    def flush_due(self, force: bool = False) -> None:
+        '''
+        Posts the counts of repeated errors whose window has ended, and the label
+        digest if it is due. With force, everything pending is posted.
+        '''
+        now = self.clock()
+        with self._lock:
+            expired = [(msg, error) for msg, error in self._errors.items() if force or now - error.first_seen >= self.error_window]
+            for msg, _ in expired:
+                del self._errors[msg]
+
+            printed: Counter[str] = Counter()
+            if force or now - self._digest_started >= self.digest_interval:
+                printed = self._printed
+                self._printed = Counter()
+                digest_duration = _format_duration(now - self._digest_started)
+                self._digest_started = now
+
+        for msg, error in expired:
+            if error.repeats > 0:
+                self._post_repeated_error(msg, error)
+
+        if printed:
+            counts = ", ".join(f"{label_type} ×{count}" for label_type, count in printed.most_common())
+            self.slack_client.post_message_info(f"Printed in the last {digest_duration}: {counts}")
+
+    def close(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush_due(force=True)
+        self.slack_client.close(timeout)
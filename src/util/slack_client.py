@@ -1,8 +1,13 @@
+from collections import deque
+from typing import Callable
 from src.util.logger import get_logger
+from src.util.tracing import span
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError, SlackClientError
 import config
 import socket
+import threading
+import time
 from src.util.token_config import TokenConfiguredClient, TokenExpiredError
 import urllib.error
 
@@ -16,11 +21,94 @@ class SlackTokenExpiredError(TokenExpiredError):
     pass
 
 
+class SlackDispatcher(object):
+    '''
+    Sends messages from a background thread, so that posting to Slack never blocks
+    the GUI. Messages wait in a bounded queue. When it is full the oldest message
+    is dropped, since a fresh error is more useful than a stale one.
+    Messages are sent at least min_interval seconds apart to stay within Slack's
+    rate limit of about one message per second and channel.
+    '''
+
+    def __init__(self, send: Callable[[str], None], max_queue_size: int = 100, min_interval: float = 0) -> None:
+        self.send = send
+        self.max_queue_size = max_queue_size
+        self.min_interval = min_interval
+        self.dropped = 0
+        self._last_sent = float("-inf")
+        self._queue: deque[str] = deque()
+        self._sending = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def qsize(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def submit(self, msg: str) -> None:
+        with self._condition:
+            if self._closed:
+                logger.warning(f"Slack dispatcher is closed. Dropping message '{msg}'")
+                return
+            if len(self._queue) >= self.max_queue_size:
+                dropped_msg = self._queue.popleft()
+                self.dropped += 1
+                logger.warning(f"Slack queue is full. Dropping message '{dropped_msg}'")
+            self._queue.append(msg)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slack-dispatcher", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._sending = False
+                self._condition.notify_all()
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                msg = self._queue.popleft()
+                self._sending = True
+
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self.send(msg)
+            except Exception:
+                logger.exception(f"Failed to send Slack message '{msg}'")
+            self._last_sent = time.monotonic()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        '''
+        Waits until all queued messages have been sent. Returns False on timeout.
+        '''
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._sending, timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        '''
+        Sends the remaining messages and stops the thread
+        '''
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Gave up sending {self.qsize()} Slack messages at shutdown")
+
+
 class SlackClient(TokenConfiguredClient):
-    def __init__(self, token_path: str, channel_id: str, timeout: int = 1, token: str | None = None):
+    def __init__(self, token_path: str, channel_id: str, timeout: int = 1, token: str | None = None, max_queue_size: int = 100,
+                 min_interval: float = config.slack_min_post_interval):
         self.client = WebClient(token, timeout=timeout)
         self.token_path = token_path
         self.channel_id = channel_id
+        self.dispatcher = SlackDispatcher(self._send_message, max_queue_size, min_interval)
         if token:
             self.configure_client(token)
 
@@ -46,12 +134,20 @@ class SlackClient(TokenConfiguredClient):
             logger.error(f"Could not connect to Slack backend: {e}")
 
     @TokenConfiguredClient.require_configured_factory()
-    def post_message(self, msg: str) -> None:
+    def _send_message(self, msg: str) -> None:
         try:
-            self._post_message(msg)
+            with span("slack.post"):
+                self._post_message(msg)
         except SlackTokenExpiredError:
             logger.exception("Slack token is not valid anymore")
 
+    def post_message(self, msg: str) -> None:
+        # Returns immediately. The message is sent by the dispatcher thread.
+        self.dispatcher.submit(msg)
+
+    def close(self, timeout: float | None = None) -> None:
+        self.dispatcher.close(timeout)
+
     def post_message_info(self, msg: str) -> None:
         self.post_message(msg)
 
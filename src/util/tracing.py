@@ -0,0 +1,166 @@
+import functools
+import json
+import logging
+import logging.handlers
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+import config
+from src.util import flight_recorder
+from src.util.logger import start_queue_listener, stop_queue_listener
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# The member session that the current code runs on behalf of. Worker threads get
+# it from the thread that submitted the work, see TaskRunner.
+_session: ContextVar[str | None] = ContextVar("trace_session", default=None)
+_attributes: ContextVar[dict[str, Any]] = ContextVar("trace_attributes", default={})
+
+_trace_logger = logging.getLogger(config.logger_name + ".trace")
+_trace_logger.propagate = False
+_enabled = False
+_listener: logging.handlers.QueueListener | None = None
+
+
+def trace_path() -> str:
+    return config.logger_name + "_trace.jsonl"
+
+
+def init_tracing(path: str | None = None, max_bytes: int = 10**6, backup_count: int = 5) -> None:
+    '''
+    Writes a JSON line for every finished span to path, with rotating backups
+    like the normal log file. The file is written from a background thread.
+    '''
+    global _enabled, _listener
+    handler = logging.handlers.RotatingFileHandler(path or trace_path(), maxBytes=max_bytes, backupCount=backup_count)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _trace_logger.setLevel(logging.INFO)
+    _listener = start_queue_listener(_trace_logger, handler)
+    _enabled = True
+
+
+def stop_tracing() -> None:
+    '''
+    Writes the spans that are still queued and stops tracing
+    '''
+    global _enabled, _listener
+    _enabled = False
+    if _listener is not None:
+        stop_queue_listener(_listener)
+        _listener = None
+    for handler in list(_trace_logger.handlers):
+        _trace_logger.removeHandler(handler)
+
+
+def new_session() -> str:
+    '''
+    Starts a new session, e.g. when a member logs in. Spans from then on carry its id.
+    '''
+    session = uuid.uuid4().hex[:12]
+    _session.set(session)
+    return session
+
+
+def end_session() -> None:
+    _session.set(None)
+
+
+def set_trace_attributes(**attributes: Any) -> None:
+    '''
+    Adds attributes to all spans that end later in the current context
+    '''
+    _attributes.set({**_attributes.get(), **attributes})
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    start_time = time.time()
+    start = time.perf_counter()
+    error: str | None = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        ms = round((time.perf_counter() - start) * 1000, 2)
+        # Spans always go to the flight recorder, which is cheap, and to the trace file if it is enabled
+        flight_recorder.record("span", name, (ms, error) if error is not None else ms)
+        if _enabled:
+            _write_span(name, start_time, ms, error, attributes)
+
+
+def _write_span(name: str, start_time: float, ms: float, error: str | None, attributes: dict[str, Any]) -> None:
+    record = {
+        "ts": round(start_time, 3),
+        "span": name,
+        "ms": ms,
+        "session": _session.get(),
+        **_attributes.get(),
+        **attributes,
+    }
+    if error is not None:
+        record["error"] = error
+    _trace_logger.info(json.dumps(record, default=str))
+
+
+def traced(name: str) -> Callable[[F], F]:
+    def decorator(fun: F) -> F:
+        @functools.wraps(fun)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fun(*args, **kwargs)
+        return wrapper  # type: ignore
+    return decorator
+
+
+def read_spans(paths: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def trace_files(path: str) -> list[str]:
+    '''
+    The trace file and its rotated backups, oldest first
+    '''
+    base = Path(path)
+    backups = sorted(base.parent.glob(base.name + ".*"), key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0, reverse=True)
+    return [str(p) for p in backups if p.suffix[1:].isdigit()] + ([str(base)] if base.exists() else [])
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    # Nearest rank
+    if not sorted_values:
+        return math.nan
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(spans: Iterable[dict[str, Any]], by_label_type: bool = False) -> list[dict[str, Any]]:
+    durations: dict[tuple[str, str], list[float]] = {}
+    errors: dict[tuple[str, str], int] = {}
+    for s in spans:
+        key = (s["span"], str(s.get("label_type", "-")) if by_label_type else "-")
+        durations.setdefault(key, []).append(float(s["ms"]))
+        if "error" in s:
+            errors[key] = errors.get(key, 0) + 1
+
+    rows = []
+    for (name, label_type), values in sorted(durations.items()):
+        values.sort()
+        rows.append(dict(span=name, label_type=label_type, count=len(values), errors=errors.get((name, label_type), 0),
+                         p50=percentile(values, 50), p95=percentile(values, 95), p99=percentile(values, 99), max=values[-1]))
+    return rows
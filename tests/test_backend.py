@@ -1,5 +1,7 @@
 import unittest
-from src.backend import member, makeradmin
+from src.backend import member, makeradmin, decoding, tag_index
+import datetime
+import serde
 from src.test import makeradmin_mock
 from unittest.mock import patch
 import copy
@@ -28,3 +30,110 @@ class TestMock(unittest.TestCase):
         with self.assertRaises(member.NoMatchingMemberNumber), patch_deep_copy("src.test.makeradmin_mock.response", makeradmin_mock.response) as response:
             response["data"] = None
             m = member.Member.from_member_number(self.client, 1000)
+
+
+class CountingMakerAdminClient(makeradmin_mock.MakerAdminClient):
+    def __init__(self):
+        self.calls = 0
+
+    def get_member_number_info(self, member_number):
+        self.calls += 1
+        response = copy.deepcopy(makeradmin_mock.response)
+        response["data"]["member_number"] = member_number
+        return response
+
+
+class TestMemberCache(unittest.TestCase):
+    def setUp(self):
+        self.client = CountingMakerAdminClient()
+
+    def test_repeated_lookup_hits_cache(self):
+        cache = member.MemberCache(self.client)
+        first = cache.get(1000)
+        second = cache.get(1000)
+        self.assertIs(first, second)
+        self.assertEqual(self.client.calls, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_cached_under_the_requested_member_number(self):
+        # The mock answers with member number 9999 whatever number is asked for
+        client = makeradmin_mock.MakerAdminClient()
+        cache = member.MemberCache(client)
+        first = cache.get(1000)
+        self.assertNotEqual(first.member_number, 1000)
+        self.assertIs(cache.get(1000), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_expired_entries_are_refetched(self):
+        cache = member.MemberCache(self.client, ttl=0)
+        cache.get(1000)
+        cache.get(1000)
+        self.assertEqual(self.client.calls, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = member.MemberCache(self.client, max_size=2)
+        cache.get(1)
+        cache.get(2)
+        cache.get(1)
+        cache.get(3)
+        self.assertEqual(len(cache), 2)
+        cache.get(1)
+        self.assertEqual(self.client.calls, 3)
+        cache.get(2)
+        self.assertEqual(self.client.calls, 4)
+
+    def test_prefetch(self):
+        cache = member.MemberCache(self.client, max_workers=3)
+        members = cache.prefetch([1, 2, 3, 2])
+        self.assertEqual(sorted(members), [1, 2, 3])
+        self.assertEqual(self.client.calls, 3)
+        cache.get(3)
+        self.assertEqual(self.client.calls, 3)
+
+
+class TestDecoding(unittest.TestCase):
+    def test_parse_iso_date(self):
+        self.assertEqual(decoding.parse_iso_date("2025-12-31"), datetime.date(2025, 12, 31))
+        self.assertEqual(decoding.parse_iso_date("2025-12-31T10:00:00"), datetime.date(2025, 12, 31))
+        self.assertEqual(decoding.parse_iso_date("31 Dec 2025"), datetime.date(2025, 12, 31))
+        with self.assertRaises(ValueError):
+            decoding.parse_iso_date("Not a date")
+
+    def test_decode_uploaded_label(self):
+        data = makeradmin_mock.label_response["data"]
+        self.assertEqual(makeradmin.decode_uploaded_label(data), serde.from_dict(makeradmin.UploadedLabel, data))
+
+    def test_decode_uploaded_label_rejects_unknown_type(self):
+        data = copy.deepcopy(makeradmin_mock.label_response["data"])
+        data["label"]["type"] = "NotALabel"
+        with self.assertRaises(ValueError):
+            makeradmin.decode_uploaded_label(data)
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self):
+        self.client = makeradmin_mock.MakerAdminClient()
+        self.index = tag_index.TagIndex(self.client)
+
+    def test_member_tags_are_parsed(self):
+        m = member.Member.from_member_number(self.client, 1000)
+        self.assertEqual(m.rfid_tags, ("123456789",))
+
+    def test_lookup_after_login(self):
+        self.assertIsNone(self.index.lookup("123456789"))
+        self.index.add_member(member.Member.from_member_number(self.client, 1000))
+        self.assertEqual(self.index.lookup("123456789").member_number, makeradmin_mock.response["data"]["member_number"])
+        self.assertEqual((self.index.hits, self.index.misses), (1, 1))
+
+    def test_verify_removes_unknown_tags(self):
+        self.index.add_member(member.Member.from_member_number(self.client, 1000))
+        with patch.object(self.client, "get_tag_info", return_value=dict(data=None)):
+            self.assertIsNone(self.index.verify("123456789"))
+        self.assertIsNone(self.index.lookup("123456789"))
+
+    def test_stale_entries_are_refreshed(self):
+        self.index.ttl = 0
+        self.index.add_member(member.Member.from_member_number(self.client, 1000))
+        with patch.object(self.client, "get_tag_info", wraps=self.client.get_tag_info) as get_tag_info:
+            self.index.refresh_stale()
+        get_tag_info.assert_called_once_with("123456789")
@@ -0,0 +1,46 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from src.label.batch_input import RejectWriter, read_label_jobs
+
+
+class TestBatchInput(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.rejects_path = os.path.join(self.dir.name, "rejects.jsonl")
+        self.rejects = RejectWriter(self.rejects_path)
+
+    def tearDown(self):
+        self.rejects.close()
+        self.dir.cleanup()
+
+    def rejected_rows(self):
+        self.rejects.close()
+        with open(self.rejects_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_csv_rows(self):
+        stream = io.StringIO("member_number,type,description,copies\n1001,box,,\n1002,temp,Old bike,2\n1003,,,\n")
+        jobs = list(read_label_jobs(stream, "csv", self.rejects, default_type="name"))
+        self.assertEqual([(j.member_number, j.label_type, j.description, j.copies) for j in jobs],
+                         [(1001, "box", None, 1), (1002, "temp", "Old bike", 2), (1003, "name", None, 1)])
+
+    def test_bad_rows_are_rejected(self):
+        stream = io.StringIO('{"member_number": 1001, "type": "3d"}\n'
+                             'not json\n'
+                             '{"member_number": "abc"}\n'
+                             '{"member_number": 1002, "type": "temp"}\n'
+                             '{"member_number": 1003, "type": "warning"}\n'
+                             '{"member_number": 1004, "copies": 0}\n'
+                             '{"member_number": 1005, "type": "box", "copies": 3}\n')
+        jobs = list(read_label_jobs(stream, "jsonl", self.rejects))
+        self.assertEqual([(j.member_number, j.line) for j in jobs], [(1001, 1), (1005, 7)])
+        self.assertEqual([row["line"] for row in self.rejected_rows()], [2, 3, 4, 5, 6])
+
+    def test_rows_are_read_lazily(self):
+        stream = io.StringIO('{"member_number": 1001}\n{"member_number": 1002}\n')
+        jobs = read_label_jobs(stream, "jsonl", self.rejects)
+        next(jobs)
+        self.assertEqual(stream.readline(), '{"member_number": 1002}\n')
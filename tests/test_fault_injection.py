@@ -0,0 +1,156 @@
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from src.backend import makeradmin
+from src.backend.member import Member
+from src.test import makeradmin_mock
+from src.test.fault_injection import FaultInjector, FaultProfile, InjectedNetworkError, InjectedTimeout, Latency
+from src.test.slack_client_mock import MockSlackClient
+from src.util.slack_client import SlackTokenExpiredError
+
+PROFILE_DIR = Path(makeradmin_mock.__file__).parent / "fault_profiles"
+
+
+class FakeTime(object):
+    def __init__(self, now: datetime = datetime(2025, 1, 2, 12, 0)):
+        self.now = now
+        self.elapsed = 0.0
+        self.slept: list[float] = []
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.elapsed += seconds
+
+    def injector(self, settings, seed=1):
+        return FaultInjector(settings, seed, clock=lambda: self.now, monotonic=lambda: self.elapsed, sleep=self.sleep)
+
+
+def outcomes(injector, endpoint="get_tag_info", n=200):
+    result = []
+    for _ in range(n):
+        try:
+            result.append(injector.request(endpoint))
+        except InjectedNetworkError as e:
+            result.append(type(e).__name__)
+    return result
+
+
+class TestFaultInjector(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+
+    def test_no_faults(self):
+        injector = self.time.injector({})
+        self.assertEqual(outcomes(injector, n=10), [200] * 10)
+        self.assertEqual(self.time.slept, [0.0] * 10)
+
+    def test_same_seed_gives_same_faults(self):
+        settings = dict(latency=dict(distribution="lognormal", median=0.1, sigma=1), network_error_rate=0.2,
+                        http_errors={"500": 0.1})
+        first = outcomes(self.time.injector(settings, seed=7))
+        first_sleeps = self.time.slept
+        self.time.slept = []
+        self.assertEqual(outcomes(self.time.injector(settings, seed=7)), first)
+        self.assertEqual(self.time.slept, first_sleeps)
+        self.assertIn(500, first)
+        self.assertIn("InjectedNetworkError", first)
+
+    def test_latency_above_timeout_times_out(self):
+        injector = self.time.injector(dict(latency=dict(value=2.5), timeout=1.0))
+        with self.assertRaises(InjectedTimeout):
+            injector.request("post_label")
+        self.assertEqual(self.time.slept, [1.0])
+
+    def test_endpoint_settings(self):
+        injector = self.time.injector(dict(endpoints=dict(post_label=dict(http_errors={"503": 1.0}))))
+        self.assertEqual(injector.request("get_tag_info"), 200)
+        self.assertEqual(injector.request("post_label"), 503)
+
+    def test_window_applies_at_its_time_of_day(self):
+        injector = self.time.injector(dict(latency=dict(value=0.1),
+                                           windows=[{"from": "17:30", "to": "19:00", "latency_scale": 5}]))
+        injector.request("get_tag_info")
+        self.time.now = datetime(2025, 1, 2, 18, 0)
+        injector.request("get_tag_info")
+        self.assertAlmostEqual(self.time.slept[0], 0.1)
+        self.assertAlmostEqual(self.time.slept[1], 0.5)
+
+    def test_window_over_midnight(self):
+        injector = self.time.injector(dict(windows=[{"from": "23:00", "to": "01:00", "http_errors": {"500": 1.0}}]))
+        self.time.now = datetime(2025, 1, 2, 0, 30)
+        self.assertEqual(injector.request("get_tag_info"), 500)
+        self.time.now = datetime(2025, 1, 2, 1, 30)
+        self.assertEqual(injector.request("get_tag_info"), 200)
+
+    def test_token_expires_periodically(self):
+        injector = self.time.injector(dict(token=dict(valid_for=10, expired_for=5)))
+        self.assertFalse(injector.token_expired)
+        self.time.elapsed = 12
+        self.assertTrue(injector.token_expired)
+        self.assertEqual(injector.request("get_tag_info"), 401)
+        self.time.elapsed = 16
+        self.assertFalse(injector.token_expired)
+
+    def test_unknown_settings_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.time.injector(dict(latnecy=dict(value=1)))
+        with self.assertRaises(ValueError):
+            Latency.from_dict(dict(distribution="pareto"))
+        with self.assertRaises(ValueError):
+            self.time.injector(dict(token=dict(valid_for=0)))
+
+    def test_example_profiles_load(self):
+        for path in PROFILE_DIR.glob("*.json"):
+            profile = FaultProfile.load(str(path), sleep=self.time.sleep)
+            for service in ("makeradmin", "slack"):
+                injector = profile.injector(service)
+                self.assertIsNotNone(injector, path)
+                outcomes(injector, n=20)
+
+    def test_services_have_separate_sequences(self):
+        profile = FaultProfile(dict(seed=1, makeradmin=dict(network_error_rate=0.5), slack=dict(network_error_rate=0.5)),
+                               sleep=self.time.sleep)
+        self.assertNotEqual(outcomes(profile.injector("makeradmin"), n=50), outcomes(profile.injector("slack"), n=50))
+        self.assertIsNone(FaultProfile(dict(seed=1)).injector("slack"))
+
+
+class TestMocksWithFaults(unittest.TestCase):
+    def setUp(self):
+        self.time = FakeTime()
+
+    def client(self, settings):
+        return makeradmin_mock.MakerAdminClient(faults=self.time.injector(settings))
+
+    def test_network_error(self):
+        client = self.client(dict(network_error_rate=1.0))
+        with self.assertRaises(makeradmin.NetworkError):
+            Member.from_tag(client, "123456789")
+
+    def test_unknown_tag(self):
+        client = self.client(dict(http_errors={"404": 1.0}))
+        self.assertIsNone(client.get_tag_info(1)["data"])
+
+    def test_wrong_pin(self):
+        client = self.client(dict(http_errors={"404": 1.0}))
+        with self.assertRaises(makeradmin.IncorrectPinCode):
+            client.get_member_with_pin(9999, "1234")
+
+    def test_failed_upload(self):
+        client = self.client(dict(endpoints=dict(post_label=dict(http_errors={"500": 1.0}))))
+        with self.assertRaises(makeradmin.NetworkError):
+            client.post_label(None)  # type: ignore
+
+    def test_expired_token(self):
+        client = self.client(dict(token=dict(valid_for=10, expired_for=5)))
+        self.assertTrue(client.configured)
+        self.time.elapsed = 12
+        self.assertFalse(client.is_logged_in())
+
+    def test_slack(self):
+        slack = MockSlackClient("token", None, faults=self.time.injector(dict(network_error_rate=1.0)))
+        with self.assertLogs(level="ERROR"):
+            slack._post_message("hello")
+        slack = MockSlackClient("token", None, faults=self.time.injector(dict(token=dict(valid_for=0, expired_for=5))))
+        with self.assertRaises(SlackTokenExpiredError):
+            slack._post_message("hello")
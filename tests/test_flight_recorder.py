@@ -0,0 +1,63 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+import config
+from src.util.flight_recorder import FlightRecorder, FlightRecorderHandler
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.logger_name = config.logger_name
+        config.logger_name = os.path.join(self.dir.name, "test")
+        self.recorder = FlightRecorder(capacity=3, min_dump_interval=60, max_dumps=2)
+
+    def tearDown(self):
+        config.logger_name = self.logger_name
+        self.dir.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_keeps_the_last_entries(self):
+        for i in range(5):
+            self.recorder.record("event", f"event {i}")
+        self.assertEqual([e[3] for e in self.recorder.entries()], ["event 2", "event 3", "event 4"])
+
+    def test_dump(self):
+        self.recorder.record("state", "WaitingState", 1234)
+        header, entry = self.read(self.recorder.dump("test", wait=True))
+        self.assertEqual(header["reason"], "test")
+        self.assertEqual((entry["kind"], entry["what"], entry["data"]), ("state", "WaitingState", 1234))
+
+    def test_dumps_are_rate_limited_and_old_ones_removed(self):
+        self.assertIsNotNone(self.recorder.dump("first", wait=True))
+        self.assertIsNone(self.recorder.dump("second", wait=True))
+        for reason in ("third", "fourth"):
+            self.assertIsNotNone(self.recorder.dump(reason, force=True, wait=True))
+        self.assertEqual(len([f for f in os.listdir(self.dir.name) if "_flight_" in f]), 2)
+
+    def test_logged_exception_dumps(self):
+        logger = logging.getLogger("memberbooth_test_flight_recorder")
+        logger.propagate = False
+        handler = FlightRecorderHandler(self.recorder)
+        logger.addHandler(handler)
+        try:
+            logger.warning("No exception here")
+            self.assertEqual(os.listdir(self.dir.name), [])
+            try:
+                raise ValueError("broken")
+            except ValueError:
+                logger.exception("Something failed")
+        finally:
+            logger.removeHandler(handler)
+        self.assertEqual([e[3] for e in self.recorder.entries()], ["WARNING", "ERROR"])
+        self.assertTrue(any(e[2] == "log" and e[4] == "Something failed" for e in self.recorder.entries()))
+        deadline = time.monotonic() + 2
+        while not os.listdir(self.dir.name) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(os.listdir(self.dir.name)), 1)
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from PIL import Image, ImageDraw
+from src.label import golden
+
+
+class TestGoldenImages(unittest.TestCase):
+    '''
+    The golden images are rendered with the font that 'make init-font' installs,
+    see golden_labels.py. Once there is a manifest, every label needs a golden image.
+    '''
+
+    def test_labels_match_goldens(self):
+        if golden.read_manifest() is None:
+            self.skipTest("No golden images. Render them with golden_labels.py accept")
+        mismatch = golden.environment_mismatch()
+        if mismatch is not None:
+            self.skipTest(mismatch)
+        for name, uploaded_label in golden.golden_labels().items():
+            with self.subTest(name):
+                self.assertTrue(golden.golden_path(name).exists(), f"No golden image for {name}. Render it with golden_labels.py accept {name}")
+                diff = golden.check(name, golden.render(uploaded_label))
+                self.assertTrue(diff.matches(), f"{name}: {diff}")
+
+    def test_fast_path_matches_reference(self):
+        for name, uploaded_label in golden.golden_labels().items():
+            with self.subTest(name):
+                reference = golden.render(uploaded_label, reference=True)
+                diff = golden.diff_images(reference, golden.render(uploaded_label))
+                self.assertTrue(diff.matches(), f"{name}: {diff}")
+
+
+class TestImageDiff(unittest.TestCase):
+    def setUp(self):
+        self.expected = Image.new("RGB", (100, 50), "white")
+        self.actual = self.expected.copy()
+        ImageDraw.Draw(self.actual).rectangle((0, 0, 9, 9), fill=(250, 250, 250))
+        self.actual.putpixel((50, 25), (0, 0, 0))
+
+    def test_exact_and_tolerance(self):
+        exact = golden.diff_images(self.expected, self.actual)
+        self.assertEqual((exact.differing_pixels, exact.max_difference), (101, 255))
+        tolerant = golden.diff_images(self.expected, self.actual, tolerance=10)
+        self.assertEqual(tolerant.differing_pixels, 1)
+        self.assertTrue(tolerant.matches(max_differing_fraction=0.001))
+        self.assertFalse(golden.diff_images(self.expected, Image.new("RGB", (100, 51), "white")).matches())
+
+    def test_check_writes_diff_and_accept_replaces_golden(self):
+        with tempfile.TemporaryDirectory() as d:
+            golden_dir = Path(d)
+            golden.accept("test", self.expected, golden_dir)
+            self.assertTrue(golden.check("test", self.expected, golden_dir).matches())
+            self.assertFalse(golden.check("test", self.actual, golden_dir).matches())
+            self.assertTrue(os.path.exists(golden_dir / "test.diff.png"))
+            golden.accept("test", self.actual, golden_dir)
+            self.assertFalse(os.path.exists(golden_dir / "test.diff.png"))
+            self.assertTrue(golden.check("test", self.actual, golden_dir).matches())
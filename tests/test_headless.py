@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+
+import config
+from src.gui.design import EditDescription, MemberInformation
+from src.gui.headless import HeadlessMaster
+from src.gui.states import EditTemporaryStorageLabel, MemberIdentified, WaitingState
+from src.label import printer as label_printer
+from src.test.fault_injection import FaultInjector
+from src.test.session_driver import SCENARIOS, create_driver, memory_growth
+
+
+class TestHeadlessMaster(unittest.TestCase):
+    def test_runs_callbacks_in_order(self):
+        master = HeadlessMaster()
+        calls = []
+        master.after(20, calls.append, "late")
+        master.after_idle(calls.append, "idle")
+        cancelled = master.after(0, calls.append, "cancelled")
+        master.after_cancel(cancelled)
+        self.assertTrue(master.run_until(lambda: len(calls) == 2, timeout=1))
+        self.assertEqual(calls, ["idle", "late"])
+        self.assertFalse(master.due())
+
+    def test_reports_exceptions(self):
+        master = HeadlessMaster()
+        reported = []
+        master.report_callback_exception = lambda *exc_info: reported.append(exc_info[1])  # type: ignore
+        master.after_idle(lambda: 1 / 0)
+        master.update()
+        self.assertIsInstance(reported[0], ZeroDivisionError)
+        self.assertEqual(master.callback_errors, 1)
+
+
+class TestSessionDriver(unittest.TestCase):
+    def setUp(self):
+        self.driver = create_driver(step_timeout=10)
+
+    def tearDown(self):
+        self.driver.close()
+
+    def test_screens_have_the_real_types(self):
+        self.driver.start()
+        self.driver.step(*SCENARIOS["storage_label"][0])
+        self.assertIsInstance(self.driver.application.state, MemberIdentified)
+        self.assertIsInstance(self.driver.screen, MemberInformation)
+        self.driver.step("choose", "storage")
+        self.assertIsInstance(self.driver.application.state, EditTemporaryStorageLabel)
+        self.assertIsInstance(self.driver.screen, EditDescription)
+
+    def test_progress_bar_is_shown_while_printing(self):
+        with mock.patch.object(config, "no_printer", False), \
+                mock.patch.object(label_printer, "print_label", self.driver.print_label):
+            self.driver.start()
+            self.driver.step(*SCENARIOS["box_label"][0])
+            self.driver.do_print("box")
+            self.assertTrue(self.driver.screen.progress_bar)
+            self.assertFalse(self.driver.screen.buttons_active)
+            self.assertTrue(self.driver.master.run_until(self.driver.idle, 10))
+            self.assertFalse(self.driver.screen.progress_bar)
+
+    def test_all_scenarios(self):
+        self.driver.run(SCENARIOS, sessions=len(SCENARIOS), sample_every=3)
+        self.assertIsInstance(self.driver.application.state, WaitingState)
+        transitions = {row["transition"]: row for row in self.driver.summary()}
+        self.assertIn("WaitingState --login--> MemberIdentified", transitions)
+        self.assertIn("EditTemporaryStorageLabel --describe--> MemberIdentified", transitions)
+        self.assertIn("EditDryingLabel --print--> MemberIdentified", transitions)
+        self.assertEqual(sum(row["stuck"] for row in transitions.values()), 0)
+        self.assertEqual(self.driver.error_messages["You have to add a description of at least 5 letters"], 1)
+        self.assertEqual(self.driver.master.callback_errors, 0)
+        self.assertEqual(self.driver.abandoned, 0)
+        self.assertEqual(len(self.driver.memory), 4)
+        self.assertIn("objects", dict(memory_growth(self.driver.memory)))
+
+    def test_network_errors_are_shown(self):
+        self.driver.close()
+        self.driver = create_driver(FaultInjector(dict(network_error_rate=1.0)), step_timeout=10)
+        self.driver.run({"box_label": SCENARIOS["box_label"]}, sessions=1)
+        self.assertEqual(self.driver.error_messages["Network error, please try again"], 1)
+        self.assertEqual(self.driver.abandoned, 1)
+        self.assertIn("WaitingState --login--> WaitingState", dict((row["transition"], row) for row in self.driver.summary()))
@@ -0,0 +1,210 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+import tty
+import unittest
+from src.util.key_reader import EM4100, KeyReader, KeyReaderInitError, KeyReaderMonitor, LineFramer, NoReaderFound, ReaderState, aptus_tag_id, find_usb_serial_devices, parse_tag_line
+
+
+class FakeArduino(object):
+    '''
+    Acts as an Arduino running the EM4100 reader sketch on the other side of a pty pair
+    '''
+
+    def __init__(self):
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        time.sleep(0.2)
+        self.write(b"EM4100 Reader booting\r\n")
+        while not self.stopped.is_set():
+            try:
+                data = os.read(self.master_fd, 1024)
+            except OSError:
+                return
+            if b"?" in data:
+                self.write(b"EM4100 Reader v1\r\n")
+
+    def write(self, data):
+        os.write(self.master_fd, data)
+
+    def unplug(self):
+        # Wake up the thread reading the master side, so that closing it really hangs up the pty
+        self.stopped.set()
+        os.write(self.slave_fd, b"\n")
+        self.thread.join()
+        os.close(self.master_fd)
+        self.master_fd = None
+
+    def close(self):
+        self.stopped.set()
+        if self.master_fd is not None:
+            os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+
+class TestLineFramer(unittest.TestCase):
+    def test_keeps_partial_lines(self):
+        framer = LineFramer()
+        self.assertEqual(framer.feed(b"DECODED: MANCHES"), [])
+        self.assertEqual(framer.feed(b"TER=0x0123456789\r\nDECO"), ["DECODED: MANCHESTER=0x0123456789"])
+        self.assertEqual(framer.feed(b"DED\r\n"), ["DECODED"])
+
+    def test_parse_tag_line(self):
+        self.assertEqual(parse_tag_line("DECODED: MANCHESTER=0x0123456789"), "0x0123456789")
+        self.assertIsNone(parse_tag_line("DECODED: MANCHESTER=0x01234"))
+        self.assertEqual(aptus_tag_id("0x0123456789"), "886718345")
+
+
+class TestEM4100(unittest.TestCase):
+    def setUp(self):
+        self.arduino = FakeArduino()
+        self.reader = EM4100(self.arduino.port)
+
+    def tearDown(self):
+        self.reader.close()
+        self.arduino.close()
+
+    def test_reader_thread_puts_tags_on_queue(self):
+        tags = queue.Queue()
+        self.reader.start_reader(tags, read_timeout=0.1)
+        self.arduino.write(b"DECODED: MANCHES")
+        time.sleep(0.2)
+        self.arduino.write(b"TER=0x0123456789\r\nnoise\r\nDECODED: MANCHESTER=0x00000000ff\r\n")
+        self.assertEqual(tags.get(timeout=2).tag_id, "0x0123456789")
+        self.assertEqual(tags.get(timeout=2).aptus_tag_id, "000000255")
+
+    def test_disconnect_is_detected_without_reopening(self):
+        self.reader.start_reader(queue.Queue(), read_timeout=0.1)
+        self.assertTrue(self.reader.is_open())
+        self.arduino.unplug()
+        time.sleep(0.3)
+        self.assertFalse(self.reader.is_open())
+
+    def test_polling_keeps_partial_lines(self):
+        self.arduino.write(b"DECODED: MANCHES")
+        time.sleep(0.2)
+        self.assertFalse(self.reader.tag_was_read())
+        self.arduino.write(b"TER=0x0123456789\r\n")
+        time.sleep(0.2)
+        self.assertTrue(self.reader.tag_was_read())
+        self.assertEqual(self.reader.last_tag_id, "0x0123456789")
+
+
+def write_sysfs_device(root, path, attributes):
+    path = os.path.join(root, "devices", "pci0000:00", path)
+    os.makedirs(path, exist_ok=True)
+    for name, value in attributes.items():
+        with open(os.path.join(path, name), "w") as f:
+            f.write(value + "\n")
+
+
+class TestFindUsbSerialDevices(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        root = self.dir.name
+        write_sysfs_device(root, "usb1", dict(idVendor="1d6b", dev="189:0", uevent="DEVNAME=bus/usb/001/001"))
+        write_sysfs_device(root, "usb1/1-1", dict(idVendor="2341", dev="189:1", uevent="DEVNAME=bus/usb/001/002"))
+        write_sysfs_device(root, "usb1/1-1/1-1:1.0/tty/ttyACM0", dict(dev="166:0", uevent="MAJOR=166\nDEVNAME=ttyACM0"))
+        write_sysfs_device(root, "usb1/1-2", dict(idVendor="046d"))
+        write_sysfs_device(root, "usb1/1-2/1-2:1.0/hidraw/hidraw0", dict(dev="240:0", uevent="DEVNAME=hidraw0"))
+        write_sysfs_device(root, "usb1/1-3", dict(idVendor="2341"))
+        write_sysfs_device(root, "usb1/1-3/1-3:1.0/tty/ttyACM1", dict(dev="166:1", uevent="DEVNAME=ttyACM1"))
+        os.makedirs(os.path.join(root, "bus", "usb", "devices"))
+        os.symlink(os.path.join(root, "devices", "pci0000:00", "usb1"), os.path.join(root, "bus", "usb", "devices", "usb1"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_finds_arduinos(self):
+        self.assertEqual(find_usb_serial_devices(sysfs_root=self.dir.name), ["/dev/ttyACM0", "/dev/ttyACM1"])
+
+    def test_missing_sysfs(self):
+        self.assertEqual(find_usb_serial_devices(sysfs_root=os.path.join(self.dir.name, "missing")), [])
+
+
+class SlowEM4100(EM4100):
+    boot_seconds = {"/dev/ttyACM0": 0.5, "/dev/ttyACM1": 0.5, "/dev/ttyACM2": 0.5}
+
+    def __init__(self, serial_device):
+        self.serial_device = serial_device
+        time.sleep(self.boot_seconds[serial_device])
+        if serial_device == "/dev/ttyACM2":
+            raise KeyReaderInitError("Wrong response from reader")
+
+    def close(self):
+        pass
+
+
+class TestProbeDevices(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        for i in range(3):
+            write_sysfs_device(self.dir.name, f"usb1/1-{i}", dict(idVendor="2341"))
+            write_sysfs_device(self.dir.name, f"usb1/1-{i}/1-{i}:1.0/tty/ttyACM{i}", dict(dev=f"166:{i}", uevent=f"DEVNAME=ttyACM{i}"))
+        os.makedirs(os.path.join(self.dir.name, "bus", "usb", "devices"))
+        os.symlink(os.path.join(self.dir.name, "devices", "pci0000:00", "usb1"), os.path.join(self.dir.name, "bus", "usb", "devices", "usb1"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_devices_are_probed_concurrently(self):
+        start = time.monotonic()
+        readers = SlowEM4100.get_devices(sysfs_root=self.dir.name)
+        self.assertLess(time.monotonic() - start, 1.2)
+        self.assertEqual([r.serial_device for r in readers], ["/dev/ttyACM0", "/dev/ttyACM1"])
+
+    def test_probe_timeout(self):
+        readers = SlowEM4100.get_devices(sysfs_root=self.dir.name, probe_timeout=0.1)
+        self.assertEqual(readers, [])
+
+
+class FakeKeyReader(KeyReader):
+    def __init__(self):
+        self.open = True
+        self.closed = False
+
+    def is_open(self):
+        return self.open
+
+    def close(self):
+        self.closed = True
+
+
+class TestKeyReaderMonitor(unittest.TestCase):
+    def setUp(self):
+        self.connect_results = []
+        self.state_changes = []
+        self.monitor = KeyReaderMonitor(self.connect, FakeKeyReader(), check_period=1, min_backoff=1, max_backoff=4)
+        self.monitor.on_state_change = lambda state, key_reader: self.state_changes.append(state)
+
+    def connect(self):
+        result = self.connect_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def test_connected_reader_is_left_alone(self):
+        self.assertEqual(self.monitor.check(), 1)
+        self.assertEqual(self.state_changes, [])
+
+    def test_reconnects_with_backoff(self):
+        old_reader = self.monitor.key_reader
+        old_reader.open = False
+        new_reader = FakeKeyReader()
+        self.connect_results = [NoReaderFound(), NoReaderFound(), NoReaderFound(), NoReaderFound(), new_reader]
+
+        self.assertEqual([self.monitor.check() for _ in range(4)], [1, 2, 4, 4])
+        self.assertTrue(old_reader.closed)
+        self.assertEqual(self.monitor.state, ReaderState.DISCONNECTED)
+
+        self.assertEqual(self.monitor.check(), 1)
+        self.assertIs(self.monitor.key_reader, new_reader)
+        self.assertEqual(self.state_changes, [ReaderState.DISCONNECTED, ReaderState.CONNECTED])
@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from src.util.logger import JsonFormatter, PLAIN_FORMAT, start_queue_listener, stop_queue_listener
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "test.log")
+        self.logger = logging.getLogger("memberbooth_test_logger")
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.dir.cleanup()
+
+    def log(self, formatter, level=logging.DEBUG):
+        handler = logging.FileHandler(self.path)
+        handler.setFormatter(formatter)
+        handler.setLevel(level)
+        listener = start_queue_listener(self.logger, handler)
+        self.logger.debug("debug %s", "message")
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            self.logger.exception("Something failed")
+        stop_queue_listener(listener)
+        with open(self.path) as f:
+            return f.read()
+
+    def test_plain_file_has_no_color_codes(self):
+        text = self.log(logging.Formatter(PLAIN_FORMAT))
+        self.assertNotIn("\x1b[", text)
+        self.assertIn("DEBUG", text)
+        self.assertIn("debug message", text)
+        self.assertIn("ValueError: broken", text)
+
+    def test_json_lines(self):
+        entries = [json.loads(line) for line in self.log(JsonFormatter()).splitlines()]
+        self.assertEqual([e["message"] for e in entries], ["debug message", "Something failed"])
+        self.assertEqual(entries[1]["level"], "ERROR")
+        self.assertIn("ValueError: broken", entries[1]["exception"])
+
+    def test_handler_level(self):
+        text = self.log(logging.Formatter(PLAIN_FORMAT), level=logging.ERROR)
+        self.assertNotIn("debug message", text)
+        self.assertIn("Something failed", text)
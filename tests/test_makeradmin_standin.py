@@ -0,0 +1,97 @@
+import time
+import unittest
+from datetime import date
+
+import requests
+
+from src.backend import label_data, makeradmin
+from src.backend.member import Member
+from src.test.fault_injection import FaultInjector
+from src.test.makeradmin_standin import STATS_PATH, MakerAdminStandin, MemberDatabase, RateLimiter, SoakTest
+
+TODAY = date(2025, 1, 2)
+
+
+class TestMakerAdminStandin(unittest.TestCase):
+    def setUp(self):
+        self.database = MemberDatabase(size=20, seed=3, today=TODAY)
+        self.standin = MakerAdminStandin(database=self.database).start()
+        self.client = makeradmin.MakerAdminClient(self.standin.base_url, token_path="/nonexistent", token=self.standin.token)
+
+    def tearDown(self):
+        self.standin.stop()
+
+    def test_database_is_seeded(self):
+        self.assertEqual(MemberDatabase(size=20, seed=3, today=TODAY).members, self.database.members)
+        self.assertNotEqual(MemberDatabase(size=20, seed=4, today=TODAY).members, self.database.members)
+        self.assertEqual(len(self.database.members), 20)
+
+    def test_logged_in(self):
+        self.assertTrue(self.client.is_logged_in())
+        wrong_token = makeradmin.MakerAdminClient(self.standin.base_url, token_path="/nonexistent", token="wrong")
+        self.assertFalse(wrong_token.is_logged_in())
+
+    def test_tag(self):
+        member_number = 1005
+        member = Member.from_tag(self.client, self.database.member_tags[member_number])
+        assert member is not None
+        self.assertEqual(member.member_number, member_number)
+        self.assertIsNone(Member.from_tag(self.client, "1"))
+
+    def test_pin_code(self):
+        member = Member.from_member_number_and_pin(self.client, 9999, "1234")
+        assert member is not None
+        self.assertEqual(member.member_number, 9999)
+        with self.assertRaises(makeradmin.IncorrectPinCode):
+            self.client.get_member_with_pin(9999, "0000")
+
+    def test_member_number(self):
+        self.assertEqual(Member.from_member_number(self.client, 1001).member_number, 1001)
+        with self.assertRaises(Exception):
+            self.client.get_member_number_info(1)
+
+    def test_post_label(self):
+        member = Member.from_member_number(self.client, 1001)
+        label = label_data.TemporaryStorageLabel.from_member(member, "Plywood", TODAY)
+        uploaded = self.client.post_label(label)
+        self.assertTrue(uploaded.label.approximately_equal(label))
+        self.assertIn(str(label.base.id), uploaded.public_url)
+
+    def test_injected_network_error(self):
+        self.standin.faults = FaultInjector(dict(endpoints=dict(get_tag_info=dict(network_error_rate=1.0))), seed=1)
+        with self.assertLogs(level="ERROR"), self.assertRaises(makeradmin.NetworkError):
+            self.client.get_tag_info("1")
+        self.assertEqual(self.standin.stats.dropped, 1)
+
+    def test_bad_request(self):
+        url = self.standin.base_url + "/multiaccess/memberbooth/pin-login"
+        headers = {"Authorization": f"Bearer {self.standin.token}"}
+        self.assertEqual(requests.post(url, headers=headers, timeout=5).status_code, 400)
+        self.assertEqual(requests.post(url, headers=headers, data=b"{not json", timeout=5).status_code, 400)
+        self.assertEqual(requests.post(url, headers=headers, json=dict(member_number="abc", pin_code="1"), timeout=5).status_code, 400)
+        self.assertEqual(self.standin.stats.requests[("get_member_with_pin", 400)], 3)
+        self.assertEqual(self.standin.stats.dropped, 0)
+
+    def test_stats(self):
+        self.client.is_logged_in()
+        self.client.get_tag_info("1")
+        stats = requests.get(self.standin.base_url + STATS_PATH, timeout=5).json()
+        self.assertEqual(stats["by_endpoint"]["get_tag_info 404"], 1)
+        self.assertEqual(stats["requests"], sum(stats["by_endpoint"].values()))
+
+    def test_soak(self):
+        soak = SoakTest(self.standin.base_url, self.standin.token, self.database, threads=2)
+        soak.run(0.5)
+        rows = {row["operation"]: row for row in soak.summary()}
+        self.assertIn("tag", rows)
+        self.assertGreater(rows["tag"]["count"], 0)
+        self.assertFalse([error for (_, error) in soak.errors if error not in ("IncorrectPinCode", "Exception")])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_limits_rate(self):
+        limiter = RateLimiter(rate=100, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
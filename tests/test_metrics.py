@@ -0,0 +1,50 @@
+import unittest
+import urllib.request
+from src.backend.makeradmin import metrics_endpoint
+from src.util import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counter(self):
+        counter = metrics.Counter("test_logins_total", "Logins", ("outcome",))
+        counter.inc(outcome="ok")
+        counter.inc(2, outcome="ok")
+        counter.inc(outcome='bad "pin"')
+        self.assertEqual(counter.get(outcome="ok"), 3)
+        self.assertIn('test_logins_total{outcome="ok"} 3\n', counter.render())
+        self.assertIn('test_logins_total{outcome="bad \\"pin\\""} 1\n', counter.render())
+        with self.assertRaises(ValueError):
+            counter.inc(result="ok")
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("test_render_seconds", "Render time", ("label_type",), buckets=(0.1, 1))
+        histogram.observe(0.05, label_type="NameTag")
+        histogram.observe(0.5, label_type="NameTag")
+        histogram.observe(5, label_type="NameTag")
+        lines = histogram.render().splitlines()
+        self.assertIn('test_render_seconds_bucket{label_type="NameTag",le="0.1"} 1', lines)
+        self.assertIn('test_render_seconds_bucket{label_type="NameTag",le="1"} 2', lines)
+        self.assertIn('test_render_seconds_bucket{label_type="NameTag",le="+Inf"} 3', lines)
+        self.assertIn('test_render_seconds_sum{label_type="NameTag"} 5.55', lines)
+        self.assertIn('test_render_seconds_count{label_type="NameTag"} 3', lines)
+
+    def test_gauge_function(self):
+        gauge = metrics.Gauge("test_queue_depth", "Queue depth")
+        gauge.set_function(lambda: 7)
+        self.assertIn("test_queue_depth 7\n", gauge.render())
+
+    def test_endpoint_without_ids(self):
+        self.assertEqual(metrics_endpoint("/multiaccess/memberbooth/tag/123456"), "/multiaccess/memberbooth/tag/{id}")
+        self.assertEqual(metrics_endpoint("/multiaccess/memberbooth/label"), "/multiaccess/memberbooth/label")
+
+    def test_server(self):
+        metrics.PRINTS.inc(label_type="NameTag")
+        server = metrics.MetricsServer(0).start()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                body = response.read().decode()
+        finally:
+            server.stop()
+        self.assertIn("# TYPE memberbooth_prints_total counter", body)
+        self.assertIn('memberbooth_prints_total{label_type="NameTag"}', body)
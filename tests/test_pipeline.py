@@ -0,0 +1,62 @@
+import os
+import tempfile
+import threading
+import unittest
+from src.backend import label_data
+from src.backend.member import MemberCache
+from src.label.pipeline import Checkpoint, LabelJob, LabelPipeline, render_label
+from src.test import makeradmin_mock
+
+
+def render_or_crash(uploaded_label):
+    # Box labels kill the render process, which breaks the whole process pool
+    if isinstance(uploaded_label.label, label_data.BoxLabel):
+        os._exit(1)
+    return render_label(uploaded_label)
+
+
+class TestLabelPipeline(unittest.TestCase):
+    def setUp(self):
+        self.client = makeradmin_mock.MakerAdminClient()
+        self.printed = []
+
+    def output(self, job, image):
+        self.printed.append(job.index)
+
+    def run_pipeline(self, jobs, checkpoint=None, **kwargs):
+        pipeline = LabelPipeline(self.client, MemberCache(self.client), self.output, upload_workers=3,
+                                 render_processes=2, queue_size=2, checkpoint=checkpoint, progress_stream=None, **kwargs)
+        return pipeline.run(jobs)
+
+    def test_prints_in_input_order(self):
+        result = self.run_pipeline(LabelJob(i, 1000 + i, "3d") for i in range(6))
+        self.assertEqual(self.printed, list(range(6)))
+        self.assertEqual(result.printed, 6)
+
+    def test_failed_jobs_do_not_stop_the_run(self):
+        result = self.run_pipeline([LabelJob(0, 1000, "3d"), LabelJob(1, 1000, "temp"), LabelJob(2, 1000, "3d")])
+        self.assertEqual(self.printed, [0, 2])
+        self.assertEqual(result.failed, 1)
+
+    def test_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "checkpoint.jsonl")
+            jobs = [LabelJob(i, 1000, "3d") for i in range(4)]
+            self.run_pipeline(jobs[:2], checkpoint=Checkpoint(path))
+            self.printed.clear()
+            result = self.run_pipeline(jobs, checkpoint=Checkpoint(path))
+            self.assertEqual(self.printed, [2, 3])
+            self.assertEqual(result.skipped, 2)
+
+    def test_broken_render_pool_fails_the_remaining_jobs(self):
+        jobs = [LabelJob(i, 1000, "box" if i == 3 else "3d") for i in range(12)]
+        results = []
+        run = threading.Thread(target=lambda: results.append(self.run_pipeline(jobs, render=render_or_crash)), daemon=True)
+        with self.assertLogs(level="ERROR"):
+            run.start()
+            run.join(timeout=60)
+        self.assertFalse(run.is_alive(), "The pipeline did not finish after the render pool broke")
+        result = results[0]
+        self.assertNotIn(3, self.printed)
+        self.assertEqual(self.printed, sorted(self.printed))
+        self.assertEqual(result.printed + result.failed, len(jobs))
@@ -0,0 +1,53 @@
+import datetime
+import unittest
+from src.backend import label_data
+from src.backend.makeradmin import UploadedLabel
+from src.backend.member import Member
+from src.label import creator
+from src.label.prerender import LabelPrerenderer, PLACEHOLDER_URL, render_preview
+from src.test import makeradmin_mock
+from src.util import metrics
+
+
+class TestPrerender(unittest.TestCase):
+    def setUp(self):
+        self.member = Member.from_member_number(makeradmin_mock.MakerAdminClient(), 1000)
+        self.prerenderer = LabelPrerenderer()
+
+    def test_prerendered_label_is_used(self):
+        self.prerenderer.start(self.member)
+        self.prerenderer._thread.join()
+        label = label_data.NameTag.from_member(self.member)
+        rendered = self.prerenderer.create_label(UploadedLabel("", "", label))
+        self.assertEqual(rendered.label.size, creator.create_name_tag(label).label.size)
+        self.assertEqual((self.prerenderer.hits, self.prerenderer.misses), (1, 0))
+
+    def test_cancelled_labels_are_not_used(self):
+        self.prerenderer.start(self.member)
+        self.prerenderer._thread.join()
+        self.prerenderer.cancel()
+        self.prerenderer.create_label(UploadedLabel("", "", label_data.NameTag.from_member(self.member)))
+        self.assertEqual((self.prerenderer.hits, self.prerenderer.misses), (0, 1))
+
+    def test_only_printed_labels_are_timed(self):
+        before = metrics.RENDER_SECONDS.count(label_type="NameTag")
+        self.prerenderer.start(self.member)
+        self.prerenderer._thread.join()
+        render_preview(label_data.NameTag.from_member(self.member))
+        self.assertEqual(metrics.RENDER_SECONDS.count(label_type="NameTag"), before)
+        self.prerenderer.create_label(UploadedLabel("", "", label_data.NameTag.from_member(self.member)))
+        self.assertEqual(metrics.RENDER_SECONDS.count(label_type="NameTag"), before + 1)
+
+    def test_fitted_text_is_cached(self):
+        first = creator.LabelString(self.member.get_name())
+        hits = creator.fit_text.cache_info().hits
+        second = creator.LabelString(self.member.get_name())
+        self.assertEqual(creator.fit_text.cache_info().hits, hits + 1)
+        self.assertEqual((first.font_size, first.width, first.height), (second.font_size, second.width, second.height))
+
+    def test_preview_matches_printed_label(self):
+        label = label_data.TemporaryStorageLabel.from_member(self.member, "A box of screws and some wood", datetime.date(2030, 1, 1))
+        printed = creator.create_label(UploadedLabel(PLACEHOLDER_URL, PLACEHOLDER_URL, label)).label
+        preview = render_preview(label, (200, 200))
+        self.assertLessEqual(max(preview.size), 200)
+        self.assertAlmostEqual(preview.size[0] / preview.size[1], printed.size[0] / printed.size[1], places=1)
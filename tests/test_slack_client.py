@@ -0,0 +1,120 @@
+import threading
+import time
+import unittest
+from src.test.slack_client_mock import MockSlackClient
+from src.util.slack_aggregator import SlackAggregator
+from src.util.slack_client import SlackDispatcher
+
+
+class TestSlackDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def blocking_send(self, msg):
+        self.release.wait()
+        self.sent.append(msg)
+
+    def test_submit_does_not_block(self):
+        dispatcher = SlackDispatcher(self.blocking_send)
+        start = time.monotonic()
+        dispatcher.submit("first")
+        dispatcher.submit("second")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.release.set()
+        dispatcher.close(timeout=5)
+        self.assertEqual(self.sent, ["first", "second"])
+
+    def test_drops_oldest_when_full(self):
+        dispatcher = SlackDispatcher(self.blocking_send, max_queue_size=2)
+        dispatcher.submit("in flight")
+        while dispatcher.qsize() > 0:
+            time.sleep(0.01)
+        for msg in ["a", "b", "c"]:
+            dispatcher.submit(msg)
+        self.assertEqual(dispatcher.dropped, 1)
+        self.release.set()
+        self.assertTrue(dispatcher.flush(timeout=5))
+        self.assertEqual(self.sent, ["in flight", "b", "c"])
+
+    def test_send_errors_do_not_stop_the_dispatcher(self):
+        def send(msg):
+            if msg == "bad":
+                raise RuntimeError(msg)
+            self.sent.append(msg)
+
+        dispatcher = SlackDispatcher(send)
+        dispatcher.submit("bad")
+        dispatcher.submit("good")
+        dispatcher.close(timeout=5)
+        self.assertEqual(self.sent, ["good"])
+
+
+class TestMockSlackClient(unittest.TestCase):
+    def test_messages_go_through_the_dispatcher(self):
+        client = MockSlackClient(token_path="", channel_id=None)
+        sent = []
+        client._post_message = sent.append
+        client.post_message_info("hello")
+        client.post_message_error("oops")
+        client.close(timeout=5)
+        self.assertEqual(sent, ["hello", "*Error*: oops"])
+
+
+class RecordingSlackClient(MockSlackClient):
+    def __init__(self):
+        super().__init__(token_path="", channel_id=None)
+        self.posted = []
+
+    def post_message(self, msg):
+        self.posted.append(msg)
+
+
+class TestSlackAggregator(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.client = RecordingSlackClient()
+        self.aggregator = SlackAggregator(self.client, error_window=600, digest_interval=3600,
+                                          clock=lambda: self.now, start_timer=False)
+
+    def test_identical_errors_are_coalesced(self):
+        for _ in range(14):
+            self.aggregator.post_message_error("printer not found")
+        self.assertEqual(self.client.posted, ["*Error*: printer not found"])
+        self.now = 600
+        self.aggregator.flush_due()
+        self.assertEqual(self.client.posted[1:], ["*Error*: printer not found ×14 in the last 10 min"])
+        self.aggregator.flush_due()
+        self.assertEqual(len(self.client.posted), 2)
+
+    def test_different_errors_are_posted(self):
+        self.aggregator.post_message_error("printer not found")
+        self.aggregator.post_message_error("out of paper")
+        self.assertEqual(len(self.client.posted), 2)
+
+    def test_alerts_are_posted_immediately(self):
+        self.aggregator.post_message_alert("started")
+        self.aggregator.post_message_alert("started")
+        self.assertEqual(len(self.client.posted), 2)
+
+    def test_printed_labels_digest(self):
+        for label_type in ["BoxLabel", "NameTag", "BoxLabel"]:
+            self.aggregator.post_label_printed(label_type)
+        self.aggregator.flush_due()
+        self.assertEqual(self.client.posted, [])
+        self.now = 3600
+        self.aggregator.flush_due()
+        self.assertEqual(self.client.posted, ["Printed in the last 60 min: BoxLabel ×2, NameTag ×1"])
+
+    def test_early_digest_is_counted_in_seconds(self):
+        self.aggregator.post_label_printed("BoxLabel")
+        self.now = 20
+        self.aggregator.flush_due(force=True)
+        self.assertEqual(self.client.posted, ["Printed in the last 20 s: BoxLabel ×1"])
+
+    def test_close_flushes_everything(self):
+        self.aggregator.post_message_error("printer not found")
+        self.aggregator.post_message_error("printer not found")
+        self.aggregator.post_label_printed("BoxLabel")
+        self.aggregator.close(timeout=5)
+        self.assertEqual(len(self.client.posted), 3)
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from src.gui.task_runner import TaskRunner, TaskTimeout
+
+
+class TestTaskRunner(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.scheduled = []
+        self.runner = TaskRunner(self.events.append, lambda ms, fn: self.scheduled.append(fn))
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def poll_until_idle(self, timeout=2):
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            self.scheduled.pop()()
+            time.sleep(0.01)
+
+    def test_result_is_posted_as_event(self):
+        self.runner.submit("login", lambda task: 42, "done")
+        self.poll_until_idle()
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0].event, "done")
+        self.assertEqual(self.events[0].data.get(), 42)
+
+    def test_error_is_raised_by_get(self):
+        def fail(task):
+            raise ValueError("no")
+        self.runner.submit("login", fail, "done")
+        self.poll_until_idle()
+        with self.assertRaises(ValueError):
+            self.events[0].data.get()
+
+    def test_duplicate_submissions_are_ignored(self):
+        release = threading.Event()
+        self.assertIsNotNone(self.runner.submit("print", lambda task: release.wait(2), "done"))
+        self.assertIsNone(self.runner.submit("print", lambda task: None, "done"))
+        release.set()
+        self.poll_until_idle()
+        self.assertEqual(len(self.events), 1)
+        self.assertIsNotNone(self.runner.submit("print", lambda task: None, "done"))
+
+    def test_cancelled_task_posts_nothing(self):
+        release = threading.Event()
+        self.runner.submit("print", lambda task: release.wait(2), "done")
+        self.runner.cancel_all()
+        release.set()
+        time.sleep(0.1)
+        self.poll_until_idle()
+        self.assertEqual(self.events, [])
+
+    def test_cancelled_task_keeps_its_name_until_it_returns(self):
+        release = threading.Event()
+        self.runner.submit("print", lambda task: release.wait(2), "done")
+        self.runner.cancel_all()
+        # The worker is still printing
+        self.assertTrue(self.runner.is_running("print"))
+        self.assertIsNone(self.runner.submit("print", lambda task: None, "done"))
+        release.set()
+        self.poll_until_idle()
+        self.assertFalse(self.runner.is_running("print"))
+        self.assertIsNotNone(self.runner.submit("print", lambda task: 1, "done"))
+        self.poll_until_idle()
+        self.assertEqual([event.data.get() for event in self.events], [1])
+
+    def test_replaced_task_posts_nothing(self):
+        release = threading.Event()
+        self.runner.submit("preview", lambda task: release.wait(2) and 1, "done")
+        self.assertIsNotNone(self.runner.submit("preview", lambda task: 2, "done", replace=True))
+        release.set()
+        time.sleep(0.1)
+        self.poll_until_idle()
+        self.assertEqual([event.data.get() for event in self.events], [2])
+
+    def test_timeout(self):
+        release = threading.Event()
+        self.runner.submit("print", lambda task: release.wait(2), "done", timeout=0.05)
+        deadline = time.monotonic() + 1
+        while not self.events and time.monotonic() < deadline:
+            self.scheduled.pop()()
+            time.sleep(0.01)
+        self.assertEqual(len(self.events), 1)
+        with self.assertRaises(TaskTimeout):
+            self.events[0].data.get()
+
+        # The worker is still printing, so the name is taken until it returns
+        self.runner.cancel_all()
+        self.assertIsNone(self.runner.submit("print", lambda task: None, "done"))
+        release.set()
+        self.poll_until_idle()
+        self.assertEqual(len(self.events), 1)
+        self.assertIsNotNone(self.runner.submit("print", lambda task: None, "done"))
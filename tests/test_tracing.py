@@ -0,0 +1,47 @@
+import contextvars
+import json
+import os
+import tempfile
+import unittest
+from src.util import tracing
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "trace.jsonl")
+        tracing.init_tracing(self.path)
+
+    def tearDown(self):
+        tracing.stop_tracing()
+        self.dir.cleanup()
+
+    def read(self):
+        tracing.stop_tracing()
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_spans_carry_session_and_attributes(self):
+        def work():
+            session = tracing.new_session()
+            tracing.set_trace_attributes(label_type="BoxLabel")
+            with tracing.span("label.create", printer_model="QL-800"):
+                pass
+            with self.assertRaises(ValueError), tracing.span("printer.send"):
+                raise ValueError()
+            return session
+
+        session = contextvars.copy_context().run(work)
+        spans = self.read()
+        self.assertEqual([s["span"] for s in spans], ["label.create", "printer.send"])
+        self.assertTrue(all(s["session"] == session and s["label_type"] == "BoxLabel" for s in spans))
+        self.assertEqual(spans[0]["printer_model"], "QL-800")
+        self.assertEqual(spans[1]["error"], "ValueError")
+
+    def test_summarize(self):
+        spans = [dict(span="print", ms=float(ms), label_type="NameTag") for ms in range(1, 101)]
+        spans.append(dict(span="print", ms=5.0, label_type="BoxLabel", error="NetworkError"))
+        rows = tracing.summarize(spans, by_label_type=True)
+        self.assertEqual([(r["label_type"], r["count"], r["errors"]) for r in rows], [("BoxLabel", 1, 1), ("NameTag", 100, 0)])
+        self.assertEqual((rows[1]["p50"], rows[1]["p95"], rows[1]["p99"]), (50.0, 95.0, 99.0))
+        self.assertEqual(len(tracing.summarize(spans)), 1)
@@ -0,0 +1,62 @@
+import queue
+import threading
+import time
+import unittest
+from src.gui.watchdog import StallWatchdog
+
+
+def blocking_call(seconds):
+    time.sleep(seconds)
+
+
+class FakeMainLoop(object):
+    '''
+    Runs scheduled callbacks on its own thread, like master.after and mainloop
+    '''
+
+    def __init__(self):
+        self.callbacks = queue.Queue()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def after(self, ms, callback):
+        threading.Timer(ms / 1000, self.callbacks.put, args=(callback,)).start()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.callbacks.get(timeout=0.05)()
+            except queue.Empty:
+                pass
+
+
+class TestStallWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.loop = FakeMainLoop()
+        self.stalls = []
+        self.watchdog = StallWatchdog(self.loop.after, self.stalls.append, lambda: "WaitingState",
+                                      threshold=0.2, heartbeat_period_ms=20)
+        self.loop.callbacks.put(self.watchdog.start)
+        self.loop.thread.start()
+
+    def tearDown(self):
+        self.watchdog.stop()
+        self.loop.stopped.set()
+        self.loop.thread.join()
+
+    def test_no_stall(self):
+        time.sleep(0.3)
+        self.assertEqual(self.stalls, [])
+
+    def test_stall_is_reported_with_stack(self):
+        time.sleep(0.1)
+        self.loop.callbacks.put(lambda: blocking_call(0.5))
+        deadline = time.monotonic() + 3
+        while not self.stalls and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(self.stalls), 1)
+        stall = self.stalls[0]
+        self.assertGreater(stall.duration, 0.3)
+        self.assertEqual(stall.context, "WaitingState")
+        self.assertIn("blocking_call", stall.stack)
+        self.assertIn("in blocking_call", stall.location)
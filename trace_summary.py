@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from src.util.tracing import read_spans, summarize, trace_files, trace_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize how long each stage of logging in and printing takes, from the trace files written by memberbooth.py")
+    parser.add_argument("files", nargs="*",
+                        help="Trace files to read. Defaults to the trace file of memberbooth.py and its backups.")
+    parser.add_argument("--by-label-type", action="store_true",
+                        help="Show the stages of printing separately for each label type")
+    parser.add_argument("--session",
+                        help="Show every span of one session in order, instead of a summary")
+    ns = parser.parse_args()
+
+    files = ns.files or trace_files(trace_path())
+    if not files:
+        print(f"No trace files found at {trace_path()}", file=sys.stderr)
+        sys.exit(1)
+
+    if ns.session is not None:
+        for s in sorted((s for s in read_spans(files) if s.get("session") == ns.session), key=lambda s: s["ts"]):
+            error = f" ({s['error']})" if "error" in s else ""
+            print(f"{s['ts']:.3f} {s['span']:<36} {s['ms']:>10.1f} ms{error}")
+        return
+
+    rows = summarize(read_spans(files), by_label_type=ns.by_label_type)
+    print(f"{'span':<36} {'label type':<22} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in rows:
+        print(f"{row['span']:<36} {row['label_type']:<22} {row['count']:>7} {row['errors']:>7} "
+              f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()